@@ -0,0 +1,65 @@
+"""
+Benchmark: row-wise vs vectorized feature engineering.
+
+    python analysis/benchmark_cleaning.py --sizes 500 50000 1000000
+
+Builds synthetic job tables by sampling the raw columns of the cleaned
+dataset, runs clean_jobs_rowwise (up to --legacy-max rows) and clean_jobs,
+and checks both produce the same CSV where both ran. A single row with every
+raw field missing (as in a small streaming batch) is checked first.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from data_cleaning import clean_jobs, clean_jobs_rowwise
+
+RAW_COLUMNS = 10
+
+
+def synthetic_jobs(source, n, seed=0):
+    return source.sample(n, replace=True, random_state=seed).reset_index(drop=True)
+
+
+def missing_row(source):
+    """One job with every raw field missing, held in object columns."""
+    return pd.DataFrame([[None] * len(source.columns)], columns=source.columns, dtype=object)
+
+
+def same_output(df):
+    return clean_jobs_rowwise(df).to_csv(index=False) == clean_jobs(df).to_csv(index=False)
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    out = func(df)
+    return out, time.perf_counter() - start
+
+
+def run(sizes, legacy_max, source_path):
+    source = pd.read_csv(source_path).iloc[:, :RAW_COLUMNS]
+    print(f"Source: {len(source)} rows from {source_path}")
+    print(f"All-missing row: same output {'✅' if same_output(missing_row(source)) else '❌'}\n")
+    print(f"{'rows':>10} {'row-wise (s)':>14} {'vectorized (s)':>16} {'speedup':>9}  same output")
+
+    for n in sizes:
+        df = synthetic_jobs(source, n)
+        fast, fast_s = timed(clean_jobs, df)
+
+        if n <= legacy_max:
+            slow, slow_s = timed(clean_jobs_rowwise, df)
+            same = slow.to_csv(index=False) == fast.to_csv(index=False)
+            print(f"{n:>10} {slow_s:>14.2f} {fast_s:>16.2f} {slow_s / fast_s:>8.1f}x  {'✅' if same else '❌'}")
+        else:
+            print(f"{n:>10} {'-':>14} {fast_s:>16.2f} {'-':>9}  -")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark row-wise vs vectorized cleaning")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 50_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=50_000, help="largest size run with the row-wise engine")
+    parser.add_argument("--source", default="data/processed/job_details_cleaned.csv")
+    args = parser.parse_args()
+
+    run(args.sizes, args.legacy_max, args.source)
@@ -0,0 +1,118 @@
+"""
+Benchmark: MinHash/LSH near-duplicate detection at scale.
+
+    python analysis/benchmark_dedup.py --rows 100000
+
+Builds synthetic postings from the real descriptions: every posting has half
+of its words replaced, so postings are distinct, and a share of them are
+re-listed (new URL, sometimes a staffing agency as company, 2% of words
+edited). Reports time per step, candidate pairs against the n^2/2 pairs a
+pairwise comparison would need, and how many planted re-listings were found,
+also among those whose exact Jaccard similarity reaches the threshold.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dedup import (
+    THRESHOLD, candidate_pairs, connected_components, estimated_jaccard, minhash,
+    posting_text, shingle_hashes,
+)
+
+
+def mutate(codes, rate, vocab, rng):
+    codes = codes.copy()
+    replace = rng.random(len(codes)) < rate
+    codes[replace] = rng.integers(len(vocab), size=replace.sum())
+    return codes
+
+
+def synthetic_postings(source, rows, relist_share, seed=0):
+    """(postings, original row position of each re-listing or -1)."""
+    rng = np.random.default_rng(seed)
+    descriptions = [d.split() for d in source["job_description"].dropna() if len(d.split()) > 20]
+    vocab = np.array(sorted({w for d in descriptions for w in d}), dtype=object)
+    position = {w: i for i, w in enumerate(vocab)}
+    descriptions = [np.array([position[w] for w in d]) for d in descriptions]
+
+    n_relists = int(rows * relist_share)
+    n_base = rows - n_relists
+    picks = rng.integers(len(source), size=n_base)
+    base_codes = [mutate(descriptions[i], 0.5, vocab, rng) for i in rng.integers(len(descriptions), size=n_base)]
+    originals = rng.integers(n_base, size=n_relists)
+    relist_codes = [mutate(base_codes[i], 0.02, vocab, rng) for i in originals]
+
+    postings = pd.DataFrame({
+        "job_title": source["job_title"].to_numpy()[np.concatenate([picks, picks[originals]])],
+        "company": source["company"].to_numpy()[np.concatenate([picks, picks[originals]])],
+        "job_description": [" ".join(vocab[c]) for c in base_codes + relist_codes],
+    })
+    agency = np.concatenate([np.zeros(n_base, dtype=bool), rng.random(n_relists) < 0.3])
+    postings.loc[agency, "company"] = "Staffing Agency"
+    postings["job_url"] = [f"https://example.com/job-{i}" for i in range(len(postings))]
+    original_of = np.concatenate([np.full(n_base, -1), originals])
+    return postings, original_of
+
+
+def true_jaccard(shingles, doc, pairs):
+    """Exact Jaccard similarity of the shingle sets of each pair."""
+    bounds = np.searchsorted(doc, np.arange(doc.max() + 2))
+    result = np.zeros(len(pairs))
+    for n, (i, j) in enumerate(pairs):
+        a = np.unique(shingles[bounds[i]:bounds[i + 1]])
+        b = np.unique(shingles[bounds[j]:bounds[j + 1]])
+        union = len(np.union1d(a, b))
+        result[n] = len(np.intersect1d(a, b, assume_unique=True)) / union if union else 0.0
+    return result
+
+
+def run(rows, relist_share):
+    source = pd.read_csv("data/processed/job_details_cleaned.csv")
+    postings, original_of = synthetic_postings(source, rows, relist_share)
+    n = len(postings)
+    print(f"{n} postings, {(original_of >= 0).sum()} planted re-listings\n")
+
+    timings = {}
+    start = time.perf_counter()
+    shingles, doc = shingle_hashes(posting_text(postings).tolist())
+    timings["shingles"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    signatures = minhash(shingles, doc, n)
+    timings["minhash"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = candidate_pairs(signatures)
+    edges = pairs[estimated_jaccard(signatures, pairs) >= THRESHOLD]
+    timings["lsh + verify"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusters = connected_components(n, edges)
+    timings["clusters"] = time.perf_counter() - start
+
+    for step, seconds in timings.items():
+        print(f"{step:>14}: {seconds:6.2f}s")
+    print(f"{'total':>14}: {sum(timings.values()):6.2f}s\n")
+
+    relisted = np.flatnonzero(original_of >= 0)
+    planted = np.stack([original_of[relisted], relisted], axis=1)
+    similar = true_jaccard(shingles, doc, planted) >= THRESHOLD
+    found = clusters[planted[:, 0]] == clusters[planted[:, 1]]
+    base = np.flatnonzero(original_of < 0)
+    merged_wrongly = len(base) - len(np.unique(clusters[base]))
+
+    print(f"candidate pairs: {len(pairs):,} (pairwise: {n * (n - 1) // 2:,})")
+    print(f"re-listings found: {found.mean():.1%} "
+          f"({found[similar].mean():.1%} of the {similar.sum()} with true Jaccard >= {THRESHOLD})")
+    print(f"distinct postings merged into another cluster: {merged_wrongly}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH near-duplicate detection")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--relist-share", type=float, default=0.1, help="share of postings that are re-listings")
+    args = parser.parse_args()
+
+    run(args.rows, args.relist_share)
@@ -0,0 +1,77 @@
+"""
+Benchmark: full vs incremental cleaning of a growing history.
+
+    python analysis/benchmark_incremental.py --rows 50000 --churn 0.01
+
+Builds a synthetic raw history by sampling the raw columns of the cleaned
+dataset (each row with its own job_url and description, as scraped
+postings have) and cleans it once to save the state. Then a day's churn
+arrives (a share of rows with a changed salary or description, as many
+new postings, as many dropped), and the new raw table is cleaned both
+with clean_jobs and with clean_jobs_incremental, checking that both give
+the same rows.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark_cleaning import RAW_COLUMNS, synthetic_jobs
+from data_cleaning import clean_jobs, clean_jobs_incremental
+
+
+def history(source, rows, seed=0):
+    df = synthetic_jobs(source, rows, seed)
+    df["job_url"] = df["job_url"] + "?copy=" + df.index.astype(str)
+    df["job_description"] = df["job_description"].fillna("") + " Ref " + df["job_url"].str[-12:] + "."
+    return df
+
+
+def next_day(df, churn, seed=1):
+    """df after a day: churn x rows changed, as many added and as many removed."""
+    rng = np.random.default_rng(seed)
+    n = max(1, int(len(df) * churn))
+    df = df.copy()
+    changed = rng.choice(len(df), n, replace=False)
+    df.loc[changed[: n // 2], "salary"] = "10-15 Lacs PA"
+    df.loc[changed[n // 2:], "job_description"] = df["job_description"].iloc[changed[n // 2:]].fillna("") + " Updated."
+    new = history(df, n, seed).assign(job_url=lambda d: d["job_url"] + "&day=2")
+    return pd.concat([df.drop(index=df.index[:n]), new], ignore_index=True)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    out = func(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def run(rows, churn, source_path):
+    source = pd.read_csv(source_path).iloc[:, :RAW_COLUMNS]
+    df = history(source, rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = os.path.join(tmp, "cleaning")
+        _, first_s = timed(clean_jobs_incremental, df, state)
+        day = next_day(df, churn)
+
+        full, full_s = timed(clean_jobs, day)
+        (incremental, reused), incremental_s = timed(clean_jobs_incremental, day, state)
+
+    same = full.to_csv(index=False) == incremental.to_csv(index=False)
+    print(f"{rows} rows, {churn:.1%} churn (first run, saving the state: {first_s:.2f}s)")
+    print(f"  full clean:        {full_s:8.2f}s")
+    print(f"  incremental clean: {incremental_s:8.2f}s  ({len(day) - reused} rows cleaned, {reused} reused)")
+    print(f"  speedup {full_s / incremental_s:.1f}x, same output {'✅' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full vs incremental cleaning")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--churn", type=float, default=0.01, help="share of rows changed, added and removed")
+    parser.add_argument("--source", default="data/processed/job_details_cleaned.csv")
+    args = parser.parse_args()
+
+    run(args.rows, args.churn, args.source)
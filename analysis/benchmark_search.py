@@ -0,0 +1,113 @@
+"""
+Benchmark: search index queries vs str.contains scans of the cleaned dataset.
+
+    python analysis/benchmark_search.py --postings 1000000
+
+Indexes a synthetic cleaned dataset (rows sampled from the real one, each
+with its own job_url) in batches of BUILD_BATCH, as the pipeline would,
+and times each query through SearchIndex.search (p50/p95 over `--repeat`
+runs, after one warm-up) and as the case-insensitive str.contains scan over
+the description and key skills it replaces (frame already in memory,
+scanned SCAN_CHUNK rows at a time to bound memory).
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from search_index import BUILD_BATCH, STOPWORDS, SearchIndex, build_index
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from storage import load_dataset
+
+SCAN_CHUNK = 50000
+
+# (query, filters, mode)
+QUERIES = [
+    ("snowflake python", {}, "and"),
+    ("sql power bi", {"location": "Hyderabad"}, "and"),
+    ("machine learning", {"experience": "Senior", "min_salary": 10}, "and"),
+    ("tableau", {}, "and"),
+    ("dbt snowflake", {}, "or"),
+    ("", {"location": "Bengaluru", "min_salary": 15}, "and"),
+]
+
+
+def synthetic(rows, source="job_details_cleaned"):
+    df = load_dataset(source).sample(rows, replace=True, random_state=0).reset_index(drop=True)
+    df["job_url"] = df["job_url"] + "?copy=" + df.index.astype(str)
+    return df
+
+
+def scan(df, query, filters, mode):
+    """The query as str.contains over the text and comparisons on the columns."""
+    words = [w for w in query.lower().split() if w not in STOPWORDS]
+    mask = pd.Series(True, index=df.index)
+    if words:
+        for start in range(0, len(df), SCAN_CHUNK):
+            chunk = df.iloc[start:start + SCAN_CHUNK]
+            text = (chunk["job_description"].fillna("") + "\n" + chunk["key_skills"].fillna("").astype(str)).str.lower()
+            hits = [text.str.contains(w, regex=False) for w in words]
+            mask.iloc[start:start + SCAN_CHUNK] = (np.logical_and.reduce(hits) if mode == "and"
+                                                   else np.logical_or.reduce(hits))
+    if "location" in filters:
+        mask &= df["location_clean"] == filters["location"]
+    if "experience" in filters:
+        mask &= df["experience_level"] == filters["experience"]
+    if "min_salary" in filters:
+        mask &= df["salary_lpa_min"] >= filters["min_salary"]
+    return int(mask.sum())
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, times
+
+
+def run(postings, repeat):
+    df = synthetic(postings)
+    path = tempfile.mkdtemp(prefix="search_index_")
+    try:
+        start = time.perf_counter()
+        build_index(df, path, BUILD_BATCH)
+        build_s = time.perf_counter() - start
+
+        index = SearchIndex(path)
+        print(f"{postings} postings: built in {build_s:.1f}s, {index.stats()}\n")
+
+        rows = []
+        for query, filters, mode in QUERIES:
+            index.search(query, mode=mode, **filters)
+            result, times = timed(lambda: index.search(query, mode=mode, **filters), repeat)
+            hits, scan_times = timed(lambda: scan(df, query, filters, mode), 1)
+            rows.append({
+                "query": query or "(filters only)",
+                "filters": ", ".join(f"{k}={v}" for k, v in filters.items()) or "-",
+                "mode": mode,
+                "hits": result.attrs["hits"],
+                "scan_hits": hits,
+                "index_p50_ms": round(float(np.percentile(times, 50)), 2),
+                "index_p95_ms": round(float(np.percentile(times, 95)), 2),
+                "scan_ms": round(scan_times[0], 1),
+            })
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time index queries against str.contains scans")
+    parser.add_argument("--postings", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(run(args.postings, args.repeat).to_string(index=False))
@@ -0,0 +1,90 @@
+"""
+Benchmark: loading the cleaned dataset from CSV, Parquet and Arrow IPC.
+
+    python analysis/benchmark_storage.py --rows 100000
+
+Writes a synthetic cleaned dataset (rows sampled from the real one) in each
+format and loads it back in a fresh process per format, reporting file size,
+load time and peak memory. "read_csv" is the old path (plain pd.read_csv,
+lists left as strings); the other rows go through load_dataset.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from storage import load_dataset, save_dataset
+
+FORMATS = ["read_csv", "csv", "parquet", "arrow"]
+
+
+def peak_rss_mb():
+    # VmHWM starts fresh in every process; ru_maxrss keeps the parent's peak across exec
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    try:
+        import resource
+    except ImportError:
+        # Windows: peak working set of this process
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_once(fmt, base, repeat):
+    """Runs in the child process: load `repeat` times, print seconds and peak MB."""
+    before = peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if fmt == "read_csv":
+            df = pd.read_csv(base + ".csv")
+        else:
+            df = load_dataset(base, fmt)
+        times.append(time.perf_counter() - start)
+        frame_mb = df.memory_usage(deep=True).sum() / 2**20
+        del df
+    print(min(times), peak_rss_mb() - before, frame_mb)
+
+
+def run(rows, repeat, source):
+    df = load_dataset(source).sample(rows, replace=True, random_state=0).reset_index(drop=True)
+    print(f"{rows} rows, {df.shape[1]} columns\n")
+    print(f"{'format':>10} {'file (MB)':>10} {'load (s)':>9} {'peak (MB)':>10} {'frame (MB)':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "job_details_cleaned")
+        sizes = {}
+        for fmt in ["csv", "parquet", "arrow"]:
+            sizes[fmt] = os.path.getsize(save_dataset(df, base, fmt)) / 2**20
+        sizes["read_csv"] = sizes["csv"]
+
+        for fmt in FORMATS:
+            out = subprocess.run(
+                [sys.executable, __file__, "--load", fmt, base, "--repeat", str(repeat)],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            seconds, peak, frame = map(float, out[-3:])
+            print(f"{fmt:>10} {sizes[fmt]:>10.1f} {seconds:>9.2f} {peak:>10.0f} {frame:>11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dataset load time, size and memory per format")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--source", default="job_details_cleaned", help="dataset to sample rows from")
+    parser.add_argument("--load", nargs=2, metavar=("FORMAT", "BASE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load_once(*args.load, args.repeat)
+    else:
+        run(args.rows, args.repeat, args.source)
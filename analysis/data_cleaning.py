@@ -1,9 +1,80 @@
 import pandas as pd
 import numpy as np
-import re
+import pyarrow as pa
+import pyarrow.feather as feather
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import skill_matcher
+from dedup import add_canonical_ids
+from skill_matcher import SkillMatcher
+
+# dataset storage is shared with the scraper
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+import text_parsing
+from storage import load_dataset, save_dataset
+from text_parsing import DIGIT, SKILL_SEPARATOR, experience_range, keyword_matcher, salary_range
 
-df = pd.read_csv("data/processed/job_details.csv")
-print("Initial shape:", df.shape)
+# ================= SKILL TAXONOMY =================
+
+ROLE_TERMS = ["data analysis","data analytics","analytics","data analyst"]
+
+CORE_SKILLS = ["sql","python","excel"]
+BI_SKILLS = ["power bi","tableau"]
+ADVANCED_SKILLS = ["machine learning","statistics"]
+CLOUD_SKILLS = ["aws","azure","gcp"]
+
+SKILL_BLACKLIST = [
+    "terms & conditions","employer home","summons/notices",
+    "website","http","https"
+]
+
+# junk fragments dropped from scraped key skills
+SKILL_JUNK = [
+    "terms & conditions",
+    "terms and conditions",
+    "employer home",
+    "summons/notices",
+    "notices",
+    "website",
+    "http",
+    "https"
+]
+SKILL_JUNK_MATCHER = keyword_matcher(SKILL_JUNK)
+
+SKILL_ALIASES = {
+    "data analyst": "data analysis",
+    "data analytics": "data analysis",
+    "analytics": "data analysis",
+    "bi": "power bi",
+}
+
+# binary tool column -> keywords matched as substrings of any cleaned skill
+SKILL_FLAGS = {
+    "SQL": ["sql"],
+    "Python": ["python"],
+    "Excel": ["excel"],
+    "Power BI": ["power bi"],
+    "Tableau": ["tableau"],
+    "Machine Learning": ["machine learning"],
+    "Statistics": ["statistics"],
+    "AWS": ["aws"],
+    "Azure": ["azure"],
+    "Data visualization": ["data visualization","visualization","dashboard","reporting"],
+}
+
+SCORES = {
+    "core_tools_score": ["SQL","Python","Excel"],
+    "bi_tools_score": ["Power BI","Tableau"],
+    "advanced_score": ["Machine Learning","Statistics"],
+    "cloud_score": ["AWS","Azure"],
+}
+
+# taxonomy matcher over job_description + key_skills (see skill_matcher.py)
+SKILL_MATCHER = SkillMatcher()
 
 # ================= LOCATION =================
 def normalize_location(loc):
@@ -20,19 +91,17 @@ def normalize_location(loc):
         return "Mumbai"
     return "Other"
 
-df["location_clean"] = df["location"].apply(normalize_location)
-
 # ================= EXPERIENCE =================
-def extract_experience(exp):
+def experience_bounds(exp):
     if pd.isna(exp):
-        return None
-    match = re.search(r"(\d+)", exp)
-    return int(match.group(1)) if match else None
+        return None, None
+    return experience_range(str(exp))
 
-df["experience_min"] = df["experience"].apply(extract_experience)
+def extract_experience(exp):
+    return experience_bounds(exp)[0]
 
 def exp_bucket(x):
-    if x is None:
+    if pd.isna(x):
         return "Unknown"
     if x <= 2:
         return "Entry"
@@ -40,47 +109,15 @@ def exp_bucket(x):
         return "Mid"
     return "Senior"
 
-df["experience_level"] = df["experience_min"].apply(exp_bucket)
-
 # ================= SALARY =================
-def extract_salary(sal):
+def salary_bounds(sal):
+    """(min, max) in lakhs per annum (see text_parsing.salary_range)."""
     if pd.isna(sal):
-        return None
-    
-    sal = str(sal).lower()
-
-    if 'not disclosed' in sal:
-        return None
-
-    parts = sal.split('\n')
-
-    for part in parts:
-        part = part.strip()
-
-        if 'years' in part and 'lacs' not in part and 'lpa' not in part:
-            continue
+        return None, None
+    return salary_range(str(sal))
 
-        match = re.search(r'(\d+)(?:\s*[-–]\s*\d+)?\s*(?:lacs?|lakhs?|lpa)', part)
-        if match:
-            return int(match.group(1))
-
-    return None
-
-df["salary_lpa_min"] = df["salary"].apply(extract_salary)
-
-# ================= SKILL TAXONOMY =================
-
-ROLE_TERMS = ["data analysis","data analytics","analytics","data analyst"]
-
-CORE_SKILLS = ["sql","python","excel"]
-BI_SKILLS = ["power bi","tableau"]
-ADVANCED_SKILLS = ["machine learning","statistics"]
-CLOUD_SKILLS = ["aws","azure","gcp"]
-
-SKILL_BLACKLIST = [
-    "terms & conditions","employer home","summons/notices",
-    "website","http","https"
-]
+def extract_salary(sal):
+    return salary_bounds(sal)[0]
 
 # ================= CLEAN SKILL LIST =================
 def clean_skill_list(skill_text):
@@ -90,7 +127,7 @@ def clean_skill_list(skill_text):
     raw = str(skill_text).lower()
 
     # split by comma + newline
-    parts = re.split(r"[,\n]+", raw)
+    parts = SKILL_SEPARATOR.split(raw)
 
     cleaned = []
 
@@ -101,7 +138,7 @@ def clean_skill_list(skill_text):
             continue
 
         # 🚨 remove anything containing digits ANYWHERE
-        if re.search(r"\d", p):
+        if DIGIT.search(p):
             continue
 
         # remove phrases like "1259 reviews"
@@ -109,24 +146,11 @@ def clean_skill_list(skill_text):
             continue
 
         # blacklist junk
-        if any(b in p for b in [
-            "terms & conditions",
-            "terms and conditions",
-            "employer home",
-            "summons/notices",
-            "notices",
-            "website",
-            "http",
-            "https"
-        ]):
+        if SKILL_JUNK_MATCHER.search(p):
             continue
 
         # normalize aliases
-        if p in ["data analyst","data analytics","analytics"]:
-            p = "data analysis"
-
-        if p == "bi":
-            p = "power bi"
+        p = SKILL_ALIASES.get(p, p)
 
         # remove very short junk
         if len(p) < 2:
@@ -134,21 +158,11 @@ def clean_skill_list(skill_text):
 
         cleaned.append(p)
 
-    # remove duplicates
-    cleaned = list(set(cleaned))
+    # remove duplicates (sorted so the output is stable between runs)
+    cleaned = sorted(set(cleaned))
 
     return cleaned
 
-
-
-df["skill_list"] = df["key_skills"].apply(clean_skill_list)
-
-# overwrite key_skills with cleaned version
-df["key_skills"] = df["skill_list"].apply(
-    lambda x: ", ".join(sorted(x)) if x else None
-)
-
-
 # ================= ROLE FLAG =================
 def check_role(skills):
     for s in skills:
@@ -156,8 +170,6 @@ def check_role(skills):
             return 1
     return 0
 
-df["is_data_role"] = df["skill_list"].apply(check_role)
-
 # ================= BINARY TOOL COLUMNS =================
 def has_skill(skill_list, keywords):
     for s in skill_list:
@@ -166,35 +178,303 @@ def has_skill(skill_list, keywords):
                 return 1
     return 0
 
-df["SQL"] = df["skill_list"].apply(lambda x: has_skill(x, ["sql"]))
-df["Python"] = df["skill_list"].apply(lambda x: has_skill(x, ["python"]))
-df["Excel"] = df["skill_list"].apply(lambda x: has_skill(x, ["excel"]))
 
-df["Power BI"] = df["skill_list"].apply(lambda x: has_skill(x, ["power bi"]))
-df["Tableau"] = df["skill_list"].apply(lambda x: has_skill(x, ["tableau"]))
+def _text(value):
+    return "" if pd.isna(value) else str(value)
+
 
-df["Machine Learning"] = df["skill_list"].apply(lambda x: has_skill(x, ["machine learning"]))
-df["Statistics"] = df["skill_list"].apply(lambda x: has_skill(x, ["statistics"]))
+# ================= ROW-WISE ENGINE =================
+def clean_jobs_rowwise(df):
+    """Reference implementation: every derived column computed row by row with .apply."""
+    df = df.copy()
 
-df["AWS"] = df["skill_list"].apply(lambda x: has_skill(x, ["aws"]))
-df["Azure"] = df["skill_list"].apply(lambda x: has_skill(x, ["azure"]))
+    df["location_clean"] = df["location"].apply(normalize_location)
+    # float64 whatever the batch holds, so missing bounds are NaN even when all are missing
+    df["experience_min"] = df["experience"].apply(extract_experience).astype("float64")
+    df["experience_max"] = df["experience"].apply(lambda x: experience_bounds(x)[1]).astype("float64")
+    df["experience_level"] = df["experience_min"].apply(exp_bucket)
+    df["salary_lpa_min"] = df["salary"].apply(extract_salary).astype("float64")
+    df["salary_lpa_max"] = df["salary"].apply(lambda x: salary_bounds(x)[1]).astype("float64")
 
-df["Data visualization"] = df["skill_list"].apply(
-    lambda x: has_skill(x, ["data visualization","visualization","dashboard","reporting"])
-)
+    df["matched_skills"] = df.apply(
+        lambda r: ", ".join(
+            SKILL_MATCHER.skills[i]
+            for i in SKILL_MATCHER.find(f"{_text(r['job_description'])}\n{_text(r['key_skills'])}")
+        ) or None,
+        axis=1,
+    )
+
+    df["skill_list"] = df["key_skills"].apply(clean_skill_list)
+
+    # overwrite key_skills with cleaned version
+    df["key_skills"] = df["skill_list"].apply(
+        lambda x: ", ".join(sorted(x)) if x else None
+    )
 
-df["Data Analysis"] = df["skill_list"].apply(
-    lambda x: 1 if any(s in x for s in ["data analysis"]) else 0
-)
+    df["is_data_role"] = df["skill_list"].apply(check_role)
+
+    for col, keywords in SKILL_FLAGS.items():
+        df[col] = df["skill_list"].apply(lambda x: has_skill(x, keywords))
+
+    df["Data Analysis"] = df["skill_list"].apply(
+        lambda x: 1 if any(s in x for s in ["data analysis"]) else 0
+    )
 
-# ================= SCORES =================
-df["core_tools_score"] = df[["SQL","Python","Excel"]].sum(axis=1)
-df["bi_tools_score"] = df[["Power BI","Tableau"]].sum(axis=1)
-df["advanced_score"] = df[["Machine Learning","Statistics"]].sum(axis=1)
-df["cloud_score"] = df[["AWS","Azure"]].sum(axis=1)
+    for col, flags in SCORES.items():
+        df[col] = df[flags].sum(axis=1)
 
-# ================= SAVE =================
-df.to_csv("data/processed/job_details_cleaned.csv", index=False)
+    return df
+
+
+# ================= VECTORIZED ENGINE =================
+# Scraped text repeats a lot (salary strings, locations, individual skills),
+# so each transform runs once per distinct value and is broadcast back with
+# the factorized codes.
+
+def _per_unique(series, func):
+    """Apply a vectorized func to the distinct values of series and map the result back."""
+    codes, uniques = pd.factorize(series)
+    values = np.asarray(func(pd.Series(uniques, dtype=object)), dtype=object)
+    out = np.empty(len(series), dtype=object)
+    out[:] = None
+    out[codes >= 0] = values[codes[codes >= 0]]
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def _any_substring(series, keywords):
+    return series.str.contains(keyword_matcher(keywords))
+
+
+def _location_clean(loc):
+    loc = loc.astype(str).str.lower()
+    return np.select(
+        [
+            loc.str.contains("hyderabad", regex=False),
+            loc.str.contains("bangalore|bengaluru", regex=True),
+            loc.str.contains("chennai", regex=False),
+            loc.str.contains("mumbai", regex=False),
+        ],
+        ["Hyderabad", "Bengaluru", "Chennai", "Mumbai"],
+        default="Other",
+    )
+
+
+def _bound(series, parse, i):
+    """Bound i (0 = min, 1 = max) of parse() for every value, parsed once per distinct value."""
+    return _per_unique(series, lambda values: [parse(str(v))[i] for v in values]).astype("float64")
+
+
+def _experience_level(experience_min):
+    choice = np.select(
+        [experience_min.isna(), experience_min <= 2, experience_min <= 5],
+        ["Unknown", "Entry", "Mid"],
+        default="Senior",
+    )
+    return pd.Series(choice, index=experience_min.index, dtype=object)
 
-print("Final shape:", df.shape)
-print("Cleaned file saved.")
+
+def _clean_skill_vocab(vocab):
+    """Cleaned form of each raw skill fragment (None when the fragment is dropped)."""
+    vocab = vocab.astype(str).str.strip()
+    keep = (
+        (vocab != "")
+        & ~vocab.str.contains(DIGIT)
+        & ~vocab.str.contains("review", regex=False)
+        & ~vocab.str.contains(SKILL_JUNK_MATCHER)
+    )
+    vocab = vocab.replace(SKILL_ALIASES)
+    keep &= vocab.str.len() >= 2
+    return vocab.where(keep, None)
+
+
+def _skill_table(key_skills):
+    """
+    Exploded skill table: one (row position, skill code) pair per cleaned,
+    de-duplicated skill, sorted by row then skill. Codes index into the
+    returned vocabulary, which is in alphabetical order.
+    """
+    key_skills = key_skills.reset_index(drop=True).dropna()
+    parts = key_skills.astype(str).str.lower().str.split(SKILL_SEPARATOR).explode()
+
+    raw_codes, raw_vocab = pd.factorize(parts)
+    cleaned = _clean_skill_vocab(pd.Series(raw_vocab, dtype=object))
+    vocab_codes, vocab = pd.factorize(cleaned, sort=True)
+
+    codes = vocab_codes[raw_codes]
+    keep = codes >= 0
+    positions = parts.index.to_numpy()[keep]
+    codes = codes[keep]
+
+    key = np.unique(positions.astype(np.int64) * len(vocab) + codes)
+    return key // max(len(vocab), 1), key % max(len(vocab), 1), np.asarray(vocab, dtype=object)
+
+
+def _vocab_flags(vocab):
+    """Flag matrix (vocabulary × flag column) for every flag derived from skills."""
+    vocab = pd.Series(vocab, dtype=object)
+    flags = pd.DataFrame({"is_data_role": _any_substring(vocab, ROLE_TERMS)})
+    for col, keywords in SKILL_FLAGS.items():
+        flags[col] = _any_substring(vocab, keywords)
+    flags["Data Analysis"] = vocab == "data analysis"
+    return flags
+
+
+def clean_jobs(df):
+    """Vectorized cleaning: same columns and values as clean_jobs_rowwise."""
+    df = df.copy()
+
+    df["location_clean"] = _per_unique(df["location"], _location_clean)
+    df["experience_min"] = _bound(df["experience"], experience_range, 0)
+    df["experience_max"] = _bound(df["experience"], experience_range, 1)
+    df["experience_level"] = _experience_level(df["experience_min"])
+    df["salary_lpa_min"] = _bound(df["salary"], salary_range, 0)
+    df["salary_lpa_max"] = _bound(df["salary"], salary_range, 1)
+
+    # taxonomy skills mentioned anywhere in the description or raw key skills
+    matched = SKILL_MATCHER.match(df["job_description"], df["key_skills"]).skill_lists()
+    df["matched_skills"] = matched.map(lambda x: ", ".join(x) if x else None).astype(object)
+
+    # skills are cleaned once per distinct key_skills text (code -1 is missing)
+    text_codes, texts = pd.factorize(df["key_skills"])
+    text_codes = np.where(text_codes < 0, len(texts), text_codes)
+    n = len(texts) + 1
+
+    positions, codes, vocab = _skill_table(pd.Series(texts, dtype=object))
+    rows, starts = np.unique(positions, return_index=True)
+
+    # per-text skill lists, straight from the sorted table
+    skill_list = [[] for _ in range(n)]
+    for row, skills in zip(rows, np.split(vocab[codes], starts[1:])):
+        skill_list[row] = skills.tolist()
+    joined = np.array([", ".join(x) if x else None for x in skill_list], dtype=object)
+
+    df["skill_list"] = pd.Series([list(skill_list[i]) for i in text_codes], index=df.index, dtype=object)
+
+    # overwrite key_skills with cleaned version
+    df["key_skills"] = pd.Series(joined[text_codes], index=df.index, dtype=object)
+
+    # every flag at once: vocabulary flags gathered per skill, OR-reduced per text
+    vocab_flags = _vocab_flags(vocab)
+    flags = np.zeros((n, vocab_flags.shape[1]), dtype=np.int64)
+    if len(codes):
+        flags[rows] = np.logical_or.reduceat(vocab_flags.to_numpy()[codes], starts, axis=0)
+    flags = flags[text_codes]
+
+    for i, col in enumerate(vocab_flags.columns):
+        df[col] = flags[:, i]
+
+    for col, cols in SCORES.items():
+        df[col] = df[cols].sum(axis=1)
+
+    return df
+
+
+# ================= INCREMENTAL =================
+# For every row of the last run, CLEAN_STATE keeps the columns clean_jobs
+# derived for it, under the fingerprint of the raw row (a hash of its
+# job_url and raw fields). A row whose fingerprint is found there is not
+# cleaned again: its other columns are the raw ones, unchanged. The whole
+# state is dropped when the cleaning version changes: a hash of the
+# cleaning code and the skill taxonomy.
+
+CLEAN_STATE = "data/state/job_details_cleaning"   # .arrow derived columns, .json version
+CODE_FILES = [__file__, skill_matcher.__file__, text_parsing.__file__]
+REWRITTEN_COLUMNS = ["key_skills"]               # raw columns clean_jobs overwrites
+
+
+def cleaning_version():
+    digest = hashlib.sha1()
+    for path in CODE_FILES:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(SKILL_MATCHER.taxonomy, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def fingerprints(df):
+    """uint64 hash of each row's job_url and raw fields (in column name order)."""
+    # raw texts are mostly distinct, so hashing them directly beats factorizing first
+    return pd.util.hash_pandas_object(df[sorted(df.columns)], index=False, categorize=False).to_numpy()
+
+
+def load_clean_state(state=CLEAN_STATE):
+    """Derived columns of the last run with their _fingerprint, or None if missing or from another version."""
+    try:
+        with open(state + ".json", encoding="utf-8") as f:
+            version = json.load(f)["version"]
+        table = feather.read_table(state + ".arrow")
+    except (OSError, ValueError, KeyError):
+        return None
+    if version != cleaning_version():
+        return None
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = table.column(field.name).to_pylist()
+    return df
+
+
+def save_clean_state(derived, prints, state=CLEAN_STATE):
+    # the version goes last, so a half-written state is never taken for a current one
+    if os.path.exists(state + ".json"):
+        os.remove(state + ".json")
+    os.makedirs(os.path.dirname(state) or ".", exist_ok=True)
+    feather.write_feather(derived.assign(_fingerprint=prints).reset_index(drop=True), state + ".arrow",
+                          compression="lz4")
+    with open(state + ".json", "w", encoding="utf-8") as f:
+        json.dump({"version": cleaning_version(), "rows": len(derived)}, f)
+
+
+def clean_jobs_incremental(df, state=CLEAN_STATE, full=False):
+    """
+    clean_jobs(df), cleaning only the rows whose fingerprint is not in the
+    state saved by the last run (all of them with `full`), then saves the
+    new state. Returns (cleaned, number of reused rows).
+    """
+    prints = fingerprints(df)
+    previous = None if full else load_clean_state(state)
+
+    reused = np.zeros(len(df), dtype=bool)
+    if previous is not None and len(previous):
+        known = pd.Index(previous.pop("_fingerprint").to_numpy(dtype=np.uint64))
+        first = ~known.duplicated()
+        pos = known[first].get_indexer(prints)
+        reused = pos >= 0
+
+    fresh = clean_jobs(df[~reused])
+    columns = [col for col in fresh.columns if col not in df.columns or col in REWRITTEN_COLUMNS]
+    parts = [fresh[columns]]
+    if reused.any():
+        parts.insert(0, previous[first].iloc[pos[reused]][columns])
+
+    # back in input order: reused rows came first
+    order = np.argsort(np.concatenate((np.flatnonzero(reused), np.flatnonzero(~reused))), kind="stable")
+    derived = pd.concat(parts, ignore_index=True).iloc[order]
+    cleaned = df.copy()
+    for col in columns:
+        cleaned[col] = derived[col].to_numpy()
+    save_clean_state(derived, prints, state)
+    return cleaned, int(reused.sum())
+
+
+# ================= RUN =================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the scraped job details")
+    parser.add_argument("--full", action="store_true", help="clean every row again, ignoring the saved state")
+    args = parser.parse_args()
+
+    df = load_dataset("job_details")
+    print("Initial shape:", df.shape)
+
+    df, reused = clean_jobs_incremental(df, full=args.full)
+    print(f"Reused {reused} cleaned rows, cleaned {len(df) - reused}")
+
+    # ================= NEAR DUPLICATES =================
+    df = add_canonical_ids(df)
+    print("Distinct postings:", df["canonical_job_id"].nunique())
+
+    # ================= SAVE =================
+    save_dataset(df, "job_details_cleaned")
+
+    print("Final shape:", df.shape)
+    print("Cleaned file saved.")
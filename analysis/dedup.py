@@ -0,0 +1,222 @@
+"""
+Near-duplicate job postings with MinHash and LSH.
+
+The same posting is often re-listed under a new URL, in another city or by
+a staffing agency. Each posting is reduced to word shingles of its title,
+company and description, summarised as a MinHash signature, and the
+signatures are bucketed by LSH bands so that only postings sharing a bucket
+are ever compared. Candidate pairs whose estimated Jaccard similarity
+reaches the threshold are merged into clusters.
+
+canonical_job_id is the smallest job_url of each cluster (a posting with no
+near-duplicate is its own canonical posting), so it does not depend on the
+order the postings were scraped or loaded in. database/insert_mysql.py keeps
+the same ids up to date in the jobs table from stored signatures and band
+keys, comparing only newly loaded postings.
+"""
+import string
+import zlib
+
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 128
+BANDS = 16               # 16 bands x 8 rows: pairs above ~0.7 Jaccard very likely share a bucket
+SHINGLE_SIZE = 3         # words per shingle
+THRESHOLD = 0.8          # estimated Jaccard for two postings to count as duplicates
+TEXT_COLUMNS = ["job_title", "company", "job_description"]
+
+END = "\x00"            # token marking the end of a text
+# bytes.translate table: everything but [a-z0-9] and END becomes a space
+# (non-ASCII characters included, as they are never part of a token)
+TOKEN_BYTES = bytes(c if chr(c) in string.ascii_lowercase + string.digits + END else 32 for c in range(256))
+
+
+# ================= SHINGLES =================
+
+def posting_text(df, columns=TEXT_COLUMNS):
+    text = pd.Series("", index=df.index)
+    for col in columns:
+        if col in df:
+            text = text + " " + df[col].fillna("").astype(str)
+    return text.str.lower()
+
+
+def shingle_hashes(texts, k=SHINGLE_SIZE):
+    """
+    Hashed word k-shingles of every text: a flat uint64 array and the text
+    each shingle belongs to. A text shorter than k words is one shingle.
+    """
+    if not len(texts):
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+
+    # tokenize everything in one pass (a flat list of str is cheap for the GC,
+    # a list of per-text lists is not); END closes each text
+    text = (f" {END} ".join(texts) + f" {END}").encode()
+    tokens = text.translate(TOKEN_BYTES).decode("ascii").split()
+    codes, vocab = pd.factorize(pd.Series(tokens, dtype=object))
+    ends = np.flatnonzero(codes == vocab.get_loc(END))
+    lengths = np.diff(np.concatenate([[-1], ends])) - 1
+    codes = np.delete(codes, ends)
+
+    # hash each distinct word once (crc32 is stable between runs)
+    words = np.array([zlib.crc32(w.encode()) for w in vocab], dtype=np.uint64)[codes]
+
+    # a shingle starts at every token with k words left in its text,
+    # and at the first token of a shorter text
+    pos = np.arange(len(words))
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    width = np.minimum(k, starts + np.repeat(lengths, lengths) - pos)
+    keep = (width == k) | (pos == starts)
+
+    shingles = np.zeros(len(words), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            nxt = words[np.minimum(pos + j, len(words) - 1)]
+            shingles = np.where(j < width, shingles * np.uint64(1000003) + nxt, shingles)
+
+    doc = np.repeat(np.arange(len(texts)), lengths)
+    return shingles[keep], doc[keep]
+
+
+# ================= MINHASH =================
+
+def _mix64(x):
+    """splitmix64 finalizer: a fast, well-spread 64-bit hash of each value."""
+    with np.errstate(over="ignore"):
+        z = x + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def minhash(shingles, doc, n_docs, num_perm=NUM_PERM, seed=1):
+    """
+    One-permutation MinHash signatures (n_docs x num_perm, uint32).
+
+    Each shingle is hashed once; the hash picks one of num_perm bins and the
+    smallest value per (text, bin) is kept, which estimates Jaccard similarity
+    like num_perm independent permutations would at 1/num_perm of the cost.
+    Empty bins take the value of the next non-empty bin plus an offset for
+    the distance (densification). Texts without shingles keep all-max rows.
+    """
+    empty_value = np.iinfo(np.uint32).max
+    h = _mix64(shingles ^ np.uint64(seed))
+    bins = ((h >> np.uint64(32)) % np.uint64(num_perm)).astype(np.int64)
+    values = (h & np.uint64(0xFFFFFFFE)).astype(np.uint32)
+
+    signatures = np.full(n_docs * num_perm, empty_value, dtype=np.uint32)
+    np.minimum.at(signatures, doc * num_perm + bins, values)
+    signatures = signatures.reshape(n_docs, num_perm)
+
+    empty = signatures == empty_value
+    fill = empty.any(axis=1) & ~empty.all(axis=1)
+    if fill.any():
+        rows = signatures[fill]
+        # index of the next non-empty bin to the right, wrapping around
+        idx = np.where(empty[fill], 2 * num_perm, np.arange(num_perm))
+        doubled = np.concatenate([idx, idx + num_perm], axis=1)
+        nxt = np.minimum.accumulate(doubled[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        distance = (nxt - np.arange(num_perm)).astype(np.uint32)
+        with np.errstate(over="ignore"):
+            borrowed = np.take_along_axis(rows, nxt % num_perm, axis=1) + distance * np.uint32(0x9E3779B1)
+        signatures[fill] = np.where(empty[fill], borrowed & np.uint32(0xFFFFFFFE), rows)
+    return signatures
+
+
+# ================= LSH =================
+
+def band_keys(signatures, bands=BANDS):
+    """LSH bucket of every row in every band (n x bands, uint64)."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for band in range(bands):
+            block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+            key = np.zeros(n, dtype=np.uint64)
+            for j in range(rows):
+                key = key * np.uint64(0x100000001B3) + block[:, j]
+            keys[:, band] = key
+    return keys
+
+
+def empty_signatures(signatures):
+    """Rows of texts without shingles (all-max signatures); they are never duplicates of anything."""
+    return (signatures == np.iinfo(np.uint32).max).all(axis=1)
+
+
+def candidate_pairs(signatures, bands=BANDS):
+    """
+    Pairs of rows sharing at least one LSH bucket. Each bucket links its rows
+    to the bucket's first row, so the work stays linear in the number of rows.
+    """
+    n = len(signatures)
+    if n < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    keys = band_keys(signatures, bands)
+    pairs = []
+
+    for band in range(bands):
+        key = keys[:, band]
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        new_bucket = np.concatenate([[True], sorted_key[1:] != sorted_key[:-1]])
+        bucket_first = order[np.maximum.accumulate(np.where(new_bucket, np.arange(n), 0))]
+        linked = ~new_bucket
+        pairs.append(np.stack([bucket_first[linked], order[linked]], axis=1))
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def estimated_jaccard(signatures, pairs):
+    return (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+
+
+def connected_components(n, edges):
+    """Smallest row index of each row's component (label propagation with pointer jumping)."""
+    labels = np.arange(n)
+    if not len(edges):
+        return labels
+    u, v = edges[:, 0], edges[:, 1]
+    while True:
+        low = np.minimum(labels[u], labels[v])
+        before = labels.copy()
+        np.minimum.at(labels, u, low)
+        np.minimum.at(labels, v, low)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+# ================= DEDUP =================
+
+def posting_signatures(df, num_perm=NUM_PERM, columns=TEXT_COLUMNS):
+    """MinHash signature of every posting of df."""
+    texts = posting_text(df, columns).tolist()
+    shingles, doc = shingle_hashes(texts)
+    return minhash(shingles, doc, len(texts), num_perm)
+
+
+def duplicate_edges(signatures, pairs, threshold=THRESHOLD):
+    """The candidate pairs whose estimated Jaccard similarity reaches the threshold."""
+    empty = empty_signatures(signatures)
+    pairs = pairs[~empty[pairs[:, 0]] & ~empty[pairs[:, 1]]]
+    return pairs[estimated_jaccard(signatures, pairs) >= threshold]
+
+
+def near_duplicate_clusters(df, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, columns=TEXT_COLUMNS):
+    """Cluster id (the row position of its first posting) for every row of df."""
+    signatures = posting_signatures(df, num_perm, columns)
+    edges = duplicate_edges(signatures, candidate_pairs(signatures, bands), threshold)
+    return connected_components(len(signatures), edges)
+
+
+def add_canonical_ids(df, threshold=THRESHOLD):
+    """Copy of df with canonical_job_id: the smallest job_url among each posting's near-duplicates."""
+    df = df.copy()
+    clusters = near_duplicate_clusters(df, threshold)
+    df["canonical_job_id"] = df["job_url"].groupby(clusters).transform("min").to_numpy()
+    return df
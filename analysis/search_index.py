@@ -0,0 +1,597 @@
+"""
+On-disk inverted index over the cleaned job postings, ranked with BM25.
+
+    python analysis/search_index.py build
+    python analysis/search_index.py search "dbt snowflake" --location Hyderabad --min-salary 10
+
+job_description and key_skills are indexed. Text is tokenized with the
+skill taxonomy first: every alias becomes its canonical skill term
+("Power BI", "powerbi" and "dax" are all skill:power bi, and "mysql" also
+counts as skill:sql), and the rest of the text is split into words.
+Queries are tokenized the same way.
+
+The index is a list of immutable segments, one per batch of rows added
+(the pipeline adds every batch the cleaner emits), merged MERGE_FACTOR at
+a time once that many are the same size, so there are only ever a few.
+In a segment the postings of a term are stored in blocks of BLOCK docs,
+doc id gaps and term frequencies as varints, and the last doc id of every
+block is kept apart: an AND query decodes only the blocks that can hold
+its candidates. location_clean, experience_level, salary_lpa_min and the
+document lengths are stored per doc, so filters and scores never read the
+dataset. A job_url indexed again hides its older postings, which still
+count in term document frequencies (so in BM25's idf) until their segment
+is merged away, as in Lucene.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from skill_matcher import TOKEN_CHARS, SkillMatcher
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from storage import load_dataset
+
+INDEX_DIR = "data/index/jobs"
+TEXT_COLUMNS = ["job_description", "key_skills"]
+FILTER_COLUMNS = ["location_clean", "experience_level"]
+STORED_COLUMNS = ["job_url", "job_title", "company"]
+
+BLOCK = 128              # postings per block (the unit an AND query decodes)
+MERGE_FACTOR = 10        # segments merged at a time
+MERGE_POSTINGS = 2000000 # postings decoded at a time while merging
+BUILD_BATCH = 5000       # rows per segment when building from the dataset
+K1, B = 1.2, 0.75        # BM25 parameters
+
+# ================= TOKENIZER =================
+
+MATCHER = SkillMatcher()
+SKILL_TERMS = {alias: ["skill:" + MATCHER.skills[i].lower() for i in ids] for alias, ids in MATCHER.alias_ids.items()}
+WORD = re.compile(rf"[{TOKEN_CHARS}]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we will with you your".split()
+)
+MAX_TERM = 40            # longer tokens are URLs and encoded junk
+
+
+def tokenize(text):
+    """Index terms of a text: skill terms for taxonomy aliases, words for the rest."""
+    if not isinstance(text, str):
+        return []
+    text = text.lower()
+    terms, pos = [], 0
+    for match in MATCHER.pattern.finditer(text):
+        terms += WORD.findall(text, pos, match.start())
+        terms += SKILL_TERMS[match.group(1)]
+        pos = match.end()
+    terms += WORD.findall(text, pos)
+    return [t for t in terms if t not in STOPWORDS and len(t) <= MAX_TERM]
+
+
+# ================= VARINTS =================
+
+def varint_encode(values):
+    """LEB128 bytes of non-negative integers, and the number of bytes of each."""
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    starts = np.cumsum(sizes) - sizes
+    for i in range(int(sizes.max(initial=0))):
+        sel = sizes > i
+        low = (values[sel] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        more = (sizes[sel] > i + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[sel] + i] = low | more
+    return out, sizes
+
+
+def varint_decode(raw):
+    raw = np.asarray(raw, dtype=np.uint8)
+    if not (raw & 0x80).any():
+        # every value below 128: one byte each, the common case for doc gaps and tfs
+        return raw.astype(np.int64)
+    ends = raw < 0x80
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    shift = np.arange(len(raw)) - np.repeat(starts, np.diff(np.append(starts, len(raw))))
+    parts = (raw & 0x7F).astype(np.uint64) << (7 * shift).astype(np.uint64)
+    return np.add.reduceat(parts, starts).astype(np.int64)
+
+
+# ================= SEGMENTS =================
+
+class SegmentWriter:
+    """Writes one segment; terms must be added in sorted order, each with its sorted doc ids."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self.postings = open(os.path.join(folder, "postings.bin"), "wb")
+        self.terms, self.term_rows = [], []
+        self.block_last, self.block_size, self.block_bytes = [], [], []
+        self.blocks = 0
+
+    def add(self, terms, counts, docs, tfs):
+        """Postings of several terms: docs and tfs hold counts[i] entries for terms[i], in order."""
+        counts = np.asarray(counts, dtype=np.int64)
+        if not counts.sum():
+            return
+        term_starts = np.cumsum(counts) - counts
+        n_blocks = -(-counts // BLOCK)
+        first_block = np.cumsum(n_blocks) - n_blocks
+
+        # gaps restart at -1 for every term and run on across its blocks
+        pos = np.arange(len(docs)) - np.repeat(term_starts, counts)
+        gaps = docs - np.concatenate(([-1], docs[:-1]))
+        gaps[term_starts] = docs[term_starts] + 1
+        block = np.repeat(first_block, counts) + pos // BLOCK
+        sizes = np.bincount(block, minlength=int(n_blocks.sum()))
+        block_starts = np.cumsum(sizes) - sizes
+
+        # per block: its gaps, then its tfs
+        within = pos % BLOCK
+        values = np.empty(2 * len(docs), dtype=np.int64)
+        values[2 * block_starts[block] + within] = gaps
+        values[2 * block_starts[block] + sizes[block] + within] = tfs
+        encoded, value_bytes = varint_encode(values)
+        self.postings.write(encoded.tobytes())
+
+        self.terms += list(terms)
+        self.term_rows.append(np.column_stack((first_block + self.blocks, n_blocks, counts)))
+        self.block_last.append(docs[block_starts + sizes - 1])
+        self.block_size.append(sizes)
+        self.block_bytes.append(np.add.reduceat(value_bytes, 2 * block_starts))
+        self.blocks += len(sizes)
+
+    def close(self, doc_len, columns, stored):
+        self.postings.close()
+        with open(os.path.join(self.folder, "terms.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.terms))
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+        arrays = {
+            "term_rows": concat(self.term_rows, np.int64).reshape(-1, 3),
+            "block_last": concat(self.block_last, np.uint32),
+            "block_size": concat(self.block_size, np.uint8),
+            "block_offset": np.concatenate(([0], np.cumsum(concat(self.block_bytes, np.int64)))),
+            "doc_len": np.asarray(doc_len, dtype=np.uint32),
+            "salary": np.asarray(columns["salary_lpa_min"], dtype=np.float32),
+            **{col: np.asarray(columns[col], dtype=np.int16) for col in FILTER_COLUMNS},
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(self.folder, name + ".npy"), array)
+        feather.write_feather(pa.table(stored), os.path.join(self.folder, "docs.arrow"), compression="zstd")
+
+
+class Segment:
+    """Read side of a segment: arrays are memory-mapped, the term dictionary loaded on first use."""
+
+    def __init__(self, folder, base):
+        self.folder = folder
+        self.base = base
+        for name in ["term_rows", "block_last", "block_size", "block_offset", "doc_len", "salary"] + FILTER_COLUMNS:
+            setattr(self, name, np.load(os.path.join(folder, name + ".npy"), mmap_mode="r"))
+        size = os.path.getsize(os.path.join(folder, "postings.bin"))
+        self.postings = (np.memmap(os.path.join(folder, "postings.bin"), dtype=np.uint8, mode="r")
+                         if size else np.empty(0, dtype=np.uint8))
+        self.docs = len(self.doc_len)
+        self._terms = None
+        self._stored = None
+
+    @property
+    def terms(self):
+        if self._terms is None:
+            with open(os.path.join(self.folder, "terms.txt"), encoding="utf-8") as f:
+                text = f.read()
+            self._terms = {term: i for i, term in enumerate(text.split("\n"))} if text else {}
+        return self._terms
+
+    def term(self, term):
+        """(first block, blocks, doc count) of a term, or None."""
+        i = self.terms.get(term)
+        return None if i is None else tuple(int(x) for x in self.term_rows[i])
+
+    def decode(self, row, blocks=None):
+        """
+        (doc ids, tfs) of a term, from all its blocks or only the given ones
+        (block numbers relative to the term's first block, sorted).
+        """
+        first, n_blocks, _ = row
+        blocks = np.arange(n_blocks) if blocks is None else np.asarray(blocks)
+        blocks = blocks + first
+        return self._decode_blocks(blocks, blocks > first)
+
+    def decode_terms(self, lo, hi):
+        """(doc counts, doc ids, tfs) of term rows lo to hi (exclusive), postings in term order."""
+        rows = np.asarray(self.term_rows[lo:hi])
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        blocks = np.arange(rows[0, 0], rows[-1, 0] + rows[-1, 1])
+        continued = np.ones(len(blocks), dtype=bool)
+        continued[rows[:, 0] - rows[0, 0]] = False
+        return (rows[:, 2], *self._decode_blocks(blocks, continued))
+
+    def _decode_blocks(self, blocks, continued):
+        """Doc ids and tfs of sorted blocks; `continued` marks those that carry on the previous block's term."""
+        if not len(blocks):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        offsets = self.block_offset
+        if blocks[-1] - blocks[0] + 1 == len(blocks):
+            raw = self.postings[offsets[blocks[0]]:offsets[blocks[-1] + 1]]
+        else:
+            raw = np.concatenate([self.postings[offsets[b]:offsets[b + 1]] for b in blocks])
+        values = varint_decode(raw)
+
+        sizes = self.block_size[blocks].astype(np.int64)
+        n = int(sizes.sum())
+        block_starts = np.cumsum(sizes) - sizes
+        within = np.arange(n) - np.repeat(block_starts, sizes)
+        gap_at = np.repeat(2 * block_starts, sizes) + within
+        gaps, tfs = values[gap_at], values[gap_at + np.repeat(sizes, sizes)]
+
+        # gaps restart from the last doc of the previous block
+        prev = np.where(continued, self.block_last[blocks - 1].astype(np.int64), -1)
+        cum = np.cumsum(gaps)
+        docs = np.repeat(prev - (cum[block_starts] - gaps[block_starts]), sizes) + cum
+        return docs, tfs
+
+    def stored(self):
+        if self._stored is None:
+            self._stored = feather.read_table(os.path.join(self.folder, "docs.arrow"))
+        return self._stored
+
+
+def _tier(docs):
+    return int(math.log(max(docs, 1), MERGE_FACTOR))
+
+
+# ================= INDEX =================
+
+class SearchIndex:
+    """
+    Index in `path`: segment folders and index.json listing them and the
+    filter categories. Written by one process at a time; readers see the
+    segments listed when they loaded it.
+    """
+
+    def __init__(self, path=INDEX_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        manifest = os.path.join(path, "index.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"segments": [], "next": 0, "categories": {col: [] for col in FILTER_COLUMNS}}
+        self._loaded = False
+
+    def _save_manifest(self):
+        tmp = os.path.join(self.path, "index.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self.segments, base = [], 0
+        for entry in self.manifest["segments"]:
+            self.segments.append(Segment(os.path.join(self.path, entry["name"]), base))
+            base += entry["docs"]
+
+        def concat(name, dtype):
+            parts = [np.asarray(getattr(seg, name)) for seg in self.segments]
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        self.doc_len = concat("doc_len", np.uint32)
+        self.salary = concat("salary", np.float32)
+        self.codes = {col: concat(col, np.int16) for col in FILTER_COLUMNS}
+        self.live = self._live(self.segments)
+        self.avgdl = float(self.doc_len[self.live].mean()) if self.live.any() else 1.0
+        self._loaded = True
+
+    @staticmethod
+    def _live(segments):
+        """Docs of the given (consecutive, newest last) segments not indexed again in a later one."""
+        urls = [seg.stored().column("job_url").to_pandas() for seg in segments]
+        if not urls:
+            return np.empty(0, dtype=bool)
+        return ~pd.concat(urls, ignore_index=True).duplicated(keep="last").to_numpy()
+
+    def __len__(self):
+        self._load()
+        return int(self.live.sum())
+
+    # ================= WRITING =================
+
+    def _codes(self, col, values):
+        """Category codes of a filter column (-1 for missing), adding new categories to the index."""
+        categories = self.manifest["categories"][col]
+        labels = [str(v) if v == v and v is not None else None for v in values.astype(object)]
+        for label in dict.fromkeys(labels):
+            if label is not None and label not in categories:
+                categories.append(label)
+        return pd.Categorical(labels, categories=categories).codes
+
+    def _new_segment(self):
+        name = f"seg_{self.manifest['next']:06d}"
+        self.manifest["next"] += 1
+        return name, os.path.join(self.path, name)
+
+    def add(self, df):
+        """Index a batch of cleaned rows as a new segment; returns the number of rows indexed."""
+        if df.empty:
+            return 0
+        text = df[TEXT_COLUMNS[0]].fillna("").astype(str)
+        for col in TEXT_COLUMNS[1:]:
+            text = text + "\n" + df[col].fillna("").astype(str)
+
+        # each distinct document is tokenized once
+        codes, documents = pd.factorize(text)
+        vocab, per_doc = {}, []
+        for document in documents:
+            counts = Counter(tokenize(document))
+            ids = np.fromiter((vocab.setdefault(term, len(vocab)) for term in counts), np.int64, len(counts))
+            per_doc.append((ids, np.fromiter(counts.values(), np.int64, len(counts))))
+
+        lengths = np.array([len(ids) for ids, _ in per_doc], dtype=np.int64)[codes]
+        term_ids = np.concatenate([per_doc[c][0] for c in codes])
+        tfs = np.concatenate([per_doc[c][1] for c in codes])
+        docs = np.repeat(np.arange(len(df)), lengths)
+        doc_len = np.array([tf.sum() for _, tf in per_doc], dtype=np.int64)[codes]
+
+        # postings sorted by term, then doc
+        names = np.array(list(vocab), dtype=object)
+        rank = np.empty(len(names), dtype=np.int64)
+        rank[np.argsort(names)] = np.arange(len(names))
+        order = np.lexsort((docs, rank[term_ids]))
+        counts = np.bincount(rank[term_ids], minlength=len(names))
+
+        name, folder = self._new_segment()
+        writer = SegmentWriter(folder)
+        writer.add(np.sort(names), counts, docs[order], tfs[order])
+
+        columns = {col: self._codes(col, df[col]) if col in df else np.full(len(df), -1) for col in FILTER_COLUMNS}
+        columns["salary_lpa_min"] = df["salary_lpa_min"] if "salary_lpa_min" in df else np.full(len(df), np.nan)
+        stored = {col: pa.array(df[col].astype(object).where(df[col].notna(), None).tolist(), pa.string())
+                  if col in df else pa.nulls(len(df), pa.string()) for col in STORED_COLUMNS}
+        writer.close(doc_len, columns, stored)
+
+        self.manifest["segments"].append({"name": name, "docs": len(df)})
+        self._save_manifest()
+        self._maybe_merge()
+        return len(df)
+
+    def _maybe_merge(self):
+        # the newest MERGE_FACTOR segments are merged once they are all in the same size tier
+        while True:
+            tail = self.manifest["segments"][-MERGE_FACTOR:]
+            if len(tail) < MERGE_FACTOR or len({_tier(s["docs"]) for s in tail}) != 1:
+                return
+            self.merge(len(self.manifest["segments"]) - MERGE_FACTOR)
+
+    def merge(self, start=0):
+        """Merge the segments from `start` on into one, dropping the docs indexed again since."""
+        entries = self.manifest["segments"][start:]
+        if not entries:
+            return
+        segments, base = [], 0
+        for entry in entries:
+            segments.append(Segment(os.path.join(self.path, entry["name"]), base))
+            base += entry["docs"]
+        live = self._live(segments)
+        new_id = np.cumsum(live) - 1
+
+        # terms are merged MERGE_POSTINGS postings at a time: each segment's
+        # terms in a range of the merged dictionary are one run of its blocks
+        names = sorted(set().union(*(seg.terms for seg in segments)))
+        number = {term: i for i, term in enumerate(names)}
+        rows = [np.fromiter((number[t] for t in seg.terms), np.int64, len(seg.terms)) for seg in segments]
+        postings = np.zeros(len(names), dtype=np.int64)
+        for seg, ids in zip(segments, rows):
+            postings[ids] += np.asarray(seg.term_rows[:, 2])
+        bounds = np.searchsorted(np.cumsum(postings), np.arange(MERGE_POSTINGS, postings.sum(), MERGE_POSTINGS))
+        bounds = np.unique(np.concatenate(([0], bounds + 1, [len(names)])))
+
+        name, folder = self._new_segment()
+        writer = SegmentWriter(folder)
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            terms, docs, tfs = [], [], []
+            for seg, ids in zip(segments, rows):
+                first, last = np.searchsorted(ids, [lo, hi])
+                counts, seg_docs, seg_tfs = seg.decode_terms(first, last)
+                seg_docs = seg_docs + seg.base
+                keep = live[seg_docs]
+                terms.append(np.repeat(ids[first:last], counts)[keep])
+                docs.append(new_id[seg_docs[keep]])
+                tfs.append(seg_tfs[keep])
+            # segments are in doc order, so a stable sort by term keeps each term's docs sorted
+            terms = np.concatenate(terms)
+            order = np.argsort(terms, kind="stable")
+            counts = np.bincount(terms - lo, minlength=hi - lo)
+            present = counts > 0
+            writer.add([t for t, p in zip(names[lo:hi], present) if p], counts[present],
+                       np.concatenate(docs)[order], np.concatenate(tfs)[order])
+
+        def concat(attr):
+            return np.concatenate([np.asarray(getattr(seg, attr)) for seg in segments])[live]
+
+        stored = pa.concat_tables([seg.stored() for seg in segments]).filter(pa.array(live))
+        writer.close(concat("doc_len"), {**{col: concat(col) for col in FILTER_COLUMNS},
+                                         "salary_lpa_min": concat("salary")}, stored.to_pydict())
+
+        self.manifest["segments"][start:] = [{"name": name, "docs": int(live.sum())}]
+        self._save_manifest()
+        for entry in entries:
+            shutil.rmtree(os.path.join(self.path, entry["name"]), ignore_errors=True)
+
+    # ================= SEARCH =================
+
+    def _filter_mask(self, location=None, experience=None, min_salary=None, max_salary=None):
+        mask = self.live.copy()
+        for col, wanted in (("location_clean", location), ("experience_level", experience)):
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            categories = self.manifest["categories"][col]
+            # one flag per category code, the last one for missing (-1)
+            allowed = np.zeros(len(categories) + 1, dtype=bool)
+            allowed[[categories.index(w) for w in wanted if w in categories]] = True
+            mask &= allowed[self.codes[col]]
+        if min_salary is not None:
+            mask &= self.salary >= min_salary
+        if max_salary is not None:
+            mask &= self.salary <= max_salary
+        return mask
+
+    def _bm25(self, tfs, idf, docs):
+        norm = K1 * (1 - B + B * self.doc_len[docs] / self.avgdl)
+        return idf * tfs * (K1 + 1) / (tfs + norm)
+
+    def _search_segment(self, seg, terms, idf, mask, mode):
+        rows = [seg.term(t) for t in terms]
+        empty = np.empty(0, dtype=np.int64), np.empty(0)
+
+        if mode == "or":
+            parts = [(seg.decode(row), idf[t]) for t, row in zip(terms, rows) if row is not None]
+            if not parts:
+                return empty
+            docs = np.concatenate([d for (d, _), _ in parts]) + seg.base
+            scores = np.concatenate([self._bm25(tf, w, d + seg.base) for (d, tf), w in parts])
+            docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores)
+            keep = mask[docs]
+            return docs[keep], scores[keep]
+
+        if any(row is None for row in rows):
+            return empty
+        # the rarest term gives the candidates; the others only decode the blocks they could be in
+        by_df = sorted(zip(terms, rows), key=lambda item: item[1][2])
+        (term, row), rest = by_df[0], by_df[1:]
+        docs, tfs = seg.decode(row)
+        keep = mask[docs + seg.base]
+        docs = docs[keep]
+        scores = self._bm25(tfs[keep], idf[term], docs + seg.base)
+
+        for term, (first, n_blocks, _) in rest:
+            if not len(docs):
+                break
+            blocks = np.unique(np.searchsorted(seg.block_last[first:first + n_blocks], docs))
+            term_docs, term_tfs = seg.decode((first, n_blocks, 0), blocks[blocks < n_blocks])
+            pos = np.minimum(np.searchsorted(term_docs, docs), max(len(term_docs) - 1, 0))
+            found = term_docs[pos] == docs if len(term_docs) else np.zeros(len(docs), dtype=bool)
+            docs, scores = docs[found], scores[found] + self._bm25(term_tfs[pos[found]], idf[term], docs[found] + seg.base)
+        return docs + seg.base, scores
+
+    def search(self, query="", k=10, location=None, experience=None, min_salary=None, max_salary=None, mode="and"):
+        """
+        Top k postings for the query by BM25 score, among those matching the
+        filters. mode "and" needs every query term in a posting, "or" any.
+        Without query terms every posting matching the filters is a hit
+        (newest first). The number of hits is in .attrs["hits"].
+        """
+        if mode not in ("and", "or"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        self._load()
+        terms = list(dict.fromkeys(tokenize(query)))
+        mask = self._filter_mask(location, experience, min_salary, max_salary)
+
+        if not terms:
+            docs = np.flatnonzero(mask)[::-1]
+            hits, top, scores = len(docs), docs[:k], np.full(min(k, len(docs)), np.nan)
+        else:
+            n = max(len(self), 1)
+            idf = {}
+            for t in terms:
+                df = sum(row[2] for row in (seg.term(t) for seg in self.segments) if row is not None)
+                idf[t] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            found = [self._search_segment(seg, terms, idf, mask, mode) for seg in self.segments]
+            docs = np.concatenate([d for d, _ in found]) if found else np.empty(0, dtype=np.int64)
+            all_scores = np.concatenate([s for _, s in found]) if found else np.empty(0)
+            hits = len(docs)
+            best = np.argpartition(-all_scores, k - 1)[:k] if hits > k else np.arange(hits)
+            best = best[np.argsort(-all_scores[best], kind="stable")]
+            top, scores = docs[best], all_scores[best]
+
+        result = self._frame(top, scores)
+        result.attrs["hits"] = hits
+        return result
+
+    def _frame(self, docs, scores):
+        bases = [seg.base for seg in self.segments]
+        rows = []
+        for doc in docs:
+            seg = self.segments[np.searchsorted(bases, doc, side="right") - 1]
+            rows.append({col: seg.stored().column(col)[int(doc - seg.base)].as_py() for col in STORED_COLUMNS})
+        df = pd.DataFrame(rows, columns=STORED_COLUMNS)
+        for col in FILTER_COLUMNS:
+            categories = np.array(self.manifest["categories"][col] + [None], dtype=object)
+            df[col] = categories[self.codes[col][docs]] if len(docs) else []
+        df["salary_lpa_min"] = self.salary[docs] if len(docs) else []
+        df["score"] = np.round(scores, 3) if len(docs) else []
+        return df
+
+    def stats(self):
+        self._load()
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(self.path) for f in files)
+        return {"postings": len(self), "docs": len(self.live), "segments": len(self.segments),
+                "terms": sum(len(seg.terms) for seg in self.segments), "mb": round(size / 2**20, 1)}
+
+
+def build_index(df, path=INDEX_DIR, batch=BUILD_BATCH, rebuild=False):
+    """Add df to the index at path in batches (from scratch with `rebuild`)."""
+    if rebuild:
+        shutil.rmtree(path, ignore_errors=True)
+    index = SearchIndex(path)
+    for start in range(0, len(df), batch):
+        index.add(df.iloc[start:start + batch])
+    return index
+
+
+# ================= RUN =================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and search the job posting index")
+    parser.add_argument("command", choices=["build", "search", "stats"])
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--path", default=INDEX_DIR)
+    parser.add_argument("--dataset", default="job_details_cleaned")
+    parser.add_argument("--rebuild", action="store_true", help="drop the index before building")
+    parser.add_argument("--location", nargs="+")
+    parser.add_argument("--experience", nargs="+")
+    parser.add_argument("--min-salary", type=float)
+    parser.add_argument("--max-salary", type=float)
+    parser.add_argument("--mode", choices=["and", "or"], default="and")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = build_index(load_dataset(args.dataset), args.path, rebuild=args.rebuild)
+        print(f"✅ Indexed in {time.perf_counter() - start:.1f}s")
+    else:
+        index = SearchIndex(args.path)
+
+    if args.command == "search":
+        start = time.perf_counter()
+        result = index.search(args.query, args.k, args.location, args.experience,
+                              args.min_salary, args.max_salary, args.mode)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(result.to_string(index=False))
+        print(f"\n{result.attrs['hits']} postings match ({elapsed:.1f} ms)")
+    print(", ".join(f"{k}={v}" for k, v in index.stats().items()))
@@ -0,0 +1,234 @@
+"""
+Taxonomy-driven skill matcher.
+
+Every skill in SKILL_TAXONOMY is listed with its aliases. All aliases are
+compiled into one regex, factored as a prefix trie, so each document is
+scanned once from left to right no matter how many skills the taxonomy has.
+Matches only count on whole tokens: "sql" is found in "sql, python" and in
+"pl/sql" but not in "nosql" or "mysql". Dialects such as MySQL list SQL
+under "implies", so they count as SQL too.
+
+The result is a sparse job × skill matrix (one (job, skill) pair per hit).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# ================= TAXONOMY =================
+# canonical skill -> category, aliases (lowercase) and skills it implies
+
+SKILL_TAXONOMY = {
+    # core
+    "SQL": {"category": "core", "aliases": ["sql", "pl/sql", "t-sql", "tsql", "ansi sql"]},
+    "Python": {"category": "core", "aliases": ["python", "python3"]},
+    "Excel": {"category": "core", "aliases": ["excel", "ms excel", "microsoft excel", "advanced excel", "vba"]},
+    "R": {"category": "core", "aliases": ["r programming", "r language", "rstudio"]},
+    "SAS": {"category": "core", "aliases": ["sas"]},
+
+    # databases (the SQL dialects imply SQL, NoSQL stores do not)
+    "MySQL": {"category": "database", "aliases": ["mysql"], "implies": ["SQL"]},
+    "PostgreSQL": {"category": "database", "aliases": ["postgresql", "postgres"], "implies": ["SQL"]},
+    "SQL Server": {"category": "database", "aliases": ["sql server", "mssql", "ms sql"], "implies": ["SQL"]},
+    "Oracle": {"category": "database", "aliases": ["oracle", "oracle db"]},
+    "Snowflake": {"category": "database", "aliases": ["snowflake"]},
+    "BigQuery": {"category": "database", "aliases": ["bigquery", "big query"]},
+    "Redshift": {"category": "database", "aliases": ["redshift"]},
+    "NoSQL": {"category": "database", "aliases": ["nosql", "no-sql"]},
+    "MongoDB": {"category": "database", "aliases": ["mongodb", "mongo"], "implies": ["NoSQL"]},
+    "Cassandra": {"category": "database", "aliases": ["cassandra"], "implies": ["NoSQL"]},
+
+    # bi
+    "Power BI": {"category": "bi", "aliases": ["power bi", "powerbi", "dax", "power query"]},
+    "Tableau": {"category": "bi", "aliases": ["tableau"]},
+    "Looker": {"category": "bi", "aliases": ["looker", "looker studio", "google data studio"]},
+    "Qlik": {"category": "bi", "aliases": ["qlik", "qlikview", "qlik sense"]},
+    "SSRS": {"category": "bi", "aliases": ["ssrs"]},
+    "Data visualization": {
+        "category": "bi",
+        "aliases": ["data visualization", "data visualisation", "visualization", "dashboard", "dashboards",
+                    "reporting"],
+    },
+
+    # python data stack
+    "Pandas": {"category": "libraries", "aliases": ["pandas"]},
+    "NumPy": {"category": "libraries", "aliases": ["numpy"]},
+    "Matplotlib": {"category": "libraries", "aliases": ["matplotlib", "seaborn"]},
+    "Scikit-learn": {"category": "libraries", "aliases": ["scikit-learn", "scikit learn", "sklearn"]},
+
+    # advanced
+    "Machine Learning": {"category": "advanced", "aliases": ["machine learning", "ml"]},
+    "Statistics": {"category": "advanced", "aliases": ["statistics", "statistical analysis", "statistical modeling"]},
+    "Deep Learning": {"category": "advanced", "aliases": ["deep learning"]},
+    "NLP": {"category": "advanced", "aliases": ["nlp", "natural language processing"]},
+    "Predictive Modeling": {"category": "advanced", "aliases": ["predictive modeling", "predictive modelling",
+                                                                "predictive analytics"]},
+    "A/B Testing": {"category": "advanced", "aliases": ["a/b testing", "ab testing", "hypothesis testing"]},
+
+    # cloud and data engineering
+    "AWS": {"category": "cloud", "aliases": ["aws", "amazon web services"]},
+    "Azure": {"category": "cloud", "aliases": ["azure", "microsoft azure"]},
+    "GCP": {"category": "cloud", "aliases": ["gcp", "google cloud"]},
+    "Spark": {"category": "data engineering", "aliases": ["spark", "pyspark", "apache spark"]},
+    "Hadoop": {"category": "data engineering", "aliases": ["hadoop", "hive"]},
+    "Databricks": {"category": "data engineering", "aliases": ["databricks"]},
+    "Airflow": {"category": "data engineering", "aliases": ["airflow"]},
+    "ETL": {"category": "data engineering", "aliases": ["etl", "elt", "data pipeline", "data pipelines"]},
+    "Data Warehousing": {"category": "data engineering", "aliases": ["data warehousing", "data warehouse"]},
+    "SSIS": {"category": "data engineering", "aliases": ["ssis"]},
+
+    # analysis
+    "Data Analysis": {"category": "analysis", "aliases": ["data analysis", "data analytics", "data analyst",
+                                                          "analytics"]},
+    "Data Cleaning": {"category": "analysis", "aliases": ["data cleaning", "data cleansing", "data wrangling"]},
+    "Data Modeling": {"category": "analysis", "aliases": ["data modeling", "data modelling"]},
+    "Business Analysis": {"category": "analysis", "aliases": ["business analysis", "business analytics",
+                                                              "business intelligence"]},
+    "KPI": {"category": "analysis", "aliases": ["kpi", "kpis"]},
+    "Forecasting": {"category": "analysis", "aliases": ["forecasting", "time series"]},
+
+    # tools
+    "Git": {"category": "tools", "aliases": ["git", "github"]},
+    "JIRA": {"category": "tools", "aliases": ["jira"]},
+    "Google Sheets": {"category": "tools", "aliases": ["google sheets"]},
+    "SAP": {"category": "tools", "aliases": ["sap"]},
+}
+
+# characters that continue a token: "sql" inside "nosql", "c" inside "c++"
+TOKEN_CHARS = "a-z0-9+#"
+
+
+# ================= COMPILATION =================
+
+def _trie(words):
+    root = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return root
+
+
+def _trie_regex(node):
+    """Regex for a trie node: longer continuations are tried before the word ending here."""
+    ends_here = "" in node
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if ends_here:
+        return "(?:" + body + ")?"
+    return body
+
+
+def compile_taxonomy(taxonomy=SKILL_TAXONOMY):
+    """One word-bounded regex for every alias, and a map from alias to canonical skill."""
+    alias_to_skill = {}
+    for skill, entry in taxonomy.items():
+        for alias in entry["aliases"]:
+            alias = alias.lower()
+            if alias in alias_to_skill and alias_to_skill[alias] != skill:
+                raise ValueError(f"Alias '{alias}' is listed for both {alias_to_skill[alias]} and {skill}")
+            alias_to_skill[alias] = skill
+
+    body = _trie_regex(_trie(alias_to_skill))
+    pattern = re.compile(rf"(?<![{TOKEN_CHARS}])({body})(?![{TOKEN_CHARS}])")
+    return pattern, alias_to_skill
+
+
+# ================= MATRIX =================
+
+class SkillMatrix:
+    """Sparse job × skill matrix in coordinate form: job `rows[i]` has skill `skills[cols[i]]`."""
+
+    def __init__(self, rows, cols, skills, n_jobs, index=None):
+        self.rows = rows
+        self.cols = cols
+        self.skills = list(skills)
+        self.n_jobs = n_jobs
+        self.index = index if index is not None else pd.RangeIndex(n_jobs)
+
+    @property
+    def shape(self):
+        return self.n_jobs, len(self.skills)
+
+    def counts(self):
+        """Number of jobs mentioning each skill."""
+        return pd.Series(np.bincount(self.cols, minlength=len(self.skills)), index=self.skills)
+
+    def to_long(self):
+        """One row per (job, skill) hit, keyed by the original job index."""
+        return pd.DataFrame({
+            "job": self.index[self.rows],
+            "skill": np.asarray(self.skills, dtype=object)[self.cols],
+        })
+
+    def to_dense(self, skills=None):
+        """Binary int8 frame with one column per skill (all taxonomy skills by default)."""
+        skills = self.skills if skills is None else list(skills)
+        dense = np.zeros(self.shape, dtype=np.int8)
+        dense[self.rows, self.cols] = 1
+        frame = pd.DataFrame(dense, index=self.index, columns=self.skills)
+        return frame[skills]
+
+    def skill_lists(self):
+        """Matched skills per job, in taxonomy order."""
+        lists = [[] for _ in range(self.n_jobs)]
+        names = self.skills
+        for row, col in zip(self.rows.tolist(), self.cols.tolist()):
+            lists[row].append(names[col])
+        return pd.Series(lists, index=self.index, dtype=object)
+
+
+# ================= MATCHER =================
+
+class SkillMatcher:
+
+    def __init__(self, taxonomy=SKILL_TAXONOMY):
+        self.taxonomy = taxonomy
+        self.skills = list(taxonomy)
+        self.pattern, alias_to_skill = compile_taxonomy(taxonomy)
+
+        skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+        self.alias_ids = {}
+        for alias, skill in alias_to_skill.items():
+            implied = taxonomy[skill].get("implies", [])
+            self.alias_ids[alias] = [skill_ids[skill]] + [skill_ids[s] for s in implied]
+
+    def find(self, text):
+        """Sorted skill ids mentioned in one document."""
+        if not isinstance(text, str):
+            return []
+        alias_ids = self.alias_ids
+        found = set()
+        for alias in self.pattern.findall(text.lower()):
+            found.update(alias_ids[alias])
+        return sorted(found)
+
+    def match(self, *columns):
+        """
+        Match the given text columns (same index) and return a SkillMatrix.
+        A job has a skill when any of its columns mentions it.
+        """
+        index = columns[0].index
+        text = columns[0].fillna("").astype(str)
+        for col in columns[1:]:
+            text = text + "\n" + col.fillna("").astype(str)
+
+        # scan each distinct document once
+        codes, documents = pd.factorize(text)
+        found = [self.find(doc) for doc in documents]
+
+        per_job = [found[c] for c in codes]
+        lengths = np.fromiter((len(ids) for ids in per_job), dtype=np.int64, count=len(per_job))
+        rows = np.repeat(np.arange(len(per_job)), lengths)
+        cols = np.fromiter((i for ids in per_job for i in ids), dtype=np.int64, count=int(lengths.sum()))
+        return SkillMatrix(rows, cols, self.skills, len(per_job), index=index)
+
+
+def match_skills(df, columns=("job_description", "key_skills"), matcher=None):
+    """SkillMatrix for a jobs frame, matched over its description and key skills."""
+    matcher = matcher or SkillMatcher()
+    return matcher.match(*(df[c] for c in columns if c in df))
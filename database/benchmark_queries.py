@@ -0,0 +1,157 @@
+"""
+Benchmark: sql_query.sql through a loaded database vs embedded DuckDB.
+
+    python database/benchmark_queries.py --rows 20000
+
+Builds a synthetic cleaned dataset (rows sampled from the real one, each
+with its own job_url) and times every path from the dataset file to the
+results of all queries:
+  - mysql:  insert_mysql.load_jobs into a scratch MySQL database, then the
+            queries (skipped when no server answers at MYSQL_HOST)
+  - sqlite: the same load and queries on the SQLite stand-in
+  - duckdb: duckdb_queries over the CSV / Parquet file, no cache
+  - cached: duckdb_queries again over the same file (result cache hit)
+"matches" counts the queries whose results equal DuckDB's (rows compared
+unordered, numbers to 2 decimals). SQLite divides integers as integers, so
+its percentage query comes out as zeros where MySQL and DuckDB agree.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from duckdb_queries import is_view, query_jobs, read_statements
+from insert_mysql import MYSQL_CONFIG, connect, load_jobs
+from storage import load_dataset, save_dataset
+
+BENCH_DATABASE = "job_market_benchmark"
+
+
+def synthetic(rows, source="job_details_cleaned"):
+    df = load_dataset(source).sample(rows, replace=True, random_state=0).reset_index(drop=True)
+    df["job_url"] = df["job_url"] + "?copy=" + df.index.astype(str)
+    return df
+
+
+def db_statement(sql, backend):
+    """A sql_query.sql statement as run on MySQL (re-runnable views) or SQLite (no CREATE OR REPLACE)."""
+    view = re.match(r"CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+(\w+)", sql, re.I)
+    if view is None:
+        return [sql]
+    body = sql[view.end():]
+    if backend == "mysql":
+        return [f"CREATE OR REPLACE VIEW {view.group(1)}{body}"]
+    return [f"DROP VIEW IF EXISTS {view.group(1)}", f"CREATE VIEW {view.group(1)}{body}"]
+
+
+def run_db_queries(conn, backend):
+    cursor = conn.cursor()
+    results = []
+    for _, sql in read_statements():
+        for statement in db_statement(sql, backend):
+            cursor.execute(statement)
+        if not is_view(sql):
+            rows = cursor.fetchall()
+            results.append(pd.DataFrame(rows, columns=[d[0] for d in cursor.description]))
+    cursor.close()
+    return results
+
+
+def mysql_connection():
+    """Connection to a scratch database, or None without a reachable server."""
+    try:
+        import mysql.connector
+        conn = mysql.connector.connect(**{**MYSQL_CONFIG, "database": None}, connection_timeout=3)
+    except Exception as e:
+        print(f"❌ MySQL not available ({e}), skipping it")
+        return None
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {BENCH_DATABASE}")
+    cursor.execute(f"USE {BENCH_DATABASE}")
+    cursor.close()
+    return conn
+
+
+def db_path(backend, csv_path, sqlite_path):
+    """(load seconds, query seconds, results) for a database backend, from the CSV file."""
+    conn = connect("sqlite", sqlite_path) if backend == "sqlite" else mysql_connection()
+    if conn is None:
+        return None
+    try:
+        start = time.perf_counter()
+        load_jobs(load_dataset(csv_path[:-4], "csv"), conn, backend, recreate=True)
+        loaded = time.perf_counter()
+        results = run_db_queries(conn, backend)
+        done = time.perf_counter()
+        if backend == "mysql":
+            conn.cursor().execute(f"DROP DATABASE {BENCH_DATABASE}")
+    finally:
+        conn.close()
+    return loaded - start, done - loaded, results
+
+
+def normalized(df):
+    def value(v):
+        if v is None or (isinstance(v, float) and v != v):
+            return None
+        if isinstance(v, (int, float, Decimal)):
+            return round(float(v), 2)
+        return v
+    return sorted((tuple(value(v) for v in row) for row in df.itertuples(index=False, name=None)), key=str)
+
+
+def matches(results, reference):
+    return sum(len(a.columns) == len(b.columns) and normalized(a) == normalized(b)
+               for a, b in zip(results, reference))
+
+
+def run(rows):
+    df = synthetic(rows)
+    print(f"{rows} rows, {df.shape[1]} columns\n")
+    out = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "job_details_cleaned")
+        for storage in ("csv", "parquet"):
+            save_dataset(df, base, storage)
+        cache_dir = os.path.join(tmp, "cache")
+
+        reference = None
+        for storage in ("csv", "parquet"):
+            path = f"{base}.{storage}"
+            for name, cache in ((f"duckdb {storage}", None), (f"cached {storage}", cache_dir)):
+                if cache:
+                    query_jobs(path, storage, cache_dir=cache)  # fills the cache
+                start = time.perf_counter()
+                results, _ = query_jobs(path, storage, cache_dir=cache)
+                seconds = time.perf_counter() - start
+                frames = [r[3] for r in results]
+                reference = reference or frames
+                out.append({"path": name, "load_s": 0.0, "query_s": round(seconds, 4),
+                            "matches": f"{matches(frames, reference)}/{len(reference)}"})
+
+        for backend in ("mysql", "sqlite"):
+            timed = db_path(backend, f"{base}.csv", os.path.join(tmp, "bench.sqlite"))
+            if timed is None:
+                continue
+            load_s, query_s, frames = timed
+            out.append({"path": backend, "load_s": round(load_s, 3), "query_s": round(query_s, 4),
+                        "matches": f"{matches(frames, reference)}/{len(reference)}"})
+
+    result = pd.DataFrame(out)
+    result["total_s"] = result["load_s"] + result["query_s"]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time sql_query.sql on MySQL/SQLite against embedded DuckDB")
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(run(args.rows).to_string(index=False))
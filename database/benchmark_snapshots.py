@@ -0,0 +1,108 @@
+"""
+Benchmark: snapshot store vs full daily copies of the cleaned dataset.
+
+    python database/benchmark_snapshots.py --rows 20000 --days 30 --churn 0.03
+
+Builds a synthetic cleaned dataset (rows sampled from the real one, each
+with its own job_url and description, as scraped postings have) and crawls
+it once a day: every day `churn` of the postings are removed, as many new
+ones appear and a third as many change.
+Each crawl is added to a SnapshotStore and also saved as a full Parquet
+copy, and the two are compared on:
+  - disk: total size of the store vs the daily copies
+  - add:  time to add a crawl (mean)
+  - as-of: time to rebuild the state of random days vs reading their copy
+  - demand: SQL/Python demand over the whole range from demand.parquet vs
+            from every daily copy
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from snapshots import SnapshotStore
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from storage import load_dataset, save_dataset
+
+SKILLS = ["SQL", "Python"]
+
+
+def synthetic(rows, source="job_details_cleaned", seed=0):
+    df = load_dataset(source).sample(rows, replace=True, random_state=seed).reset_index(drop=True)
+    df["job_url"] = df["job_url"] + "?copy=" + str(seed) + "-" + df.index.astype(str)
+    df["job_description"] = df["job_description"].fillna("") + " Ref " + df["job_url"].str[-12:] + "."
+    return df
+
+
+def crawls(rows, days, churn):
+    """(crawl time, dataset) for every day."""
+    rng = np.random.default_rng(0)
+    df = synthetic(rows)
+    n = int(rows * churn)
+    for day in range(days):
+        if day:
+            df = df.drop(index=df.index[rng.choice(len(df), n, replace=False)])
+            df = pd.concat([df, synthetic(n, seed=day)], ignore_index=True)
+            changed = rng.choice(len(df), n // 3, replace=False)
+            df.loc[changed, "applicants"] = "100+" if day % 2 else "50+"
+        yield pd.Timestamp("2026-01-01 06:00") + pd.Timedelta(days=day), df
+
+
+def folder_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - start
+
+
+def run(rows, days, churn):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, "store"))
+        copies = os.path.join(tmp, "copies")
+        add_s = []
+        for crawled_at, df in crawls(rows, days, churn):
+            _, seconds = timed(store.add, df, crawled_at)
+            add_s.append(seconds)
+            save_dataset(df, os.path.join(copies, crawled_at.strftime("%Y%m%d")), "parquet")
+
+        rng = np.random.default_rng(1)
+        dates = [pd.Timestamp(c["crawled_at"]) for c in store.crawls]
+        sample = [dates[i] for i in rng.choice(len(dates), min(10, len(dates)), replace=False)]
+        as_of_s = [timed(store.as_of, when)[1] for when in sample]
+        copy_s = [timed(load_dataset, os.path.join(copies, when.strftime("%Y%m%d")), "parquet")[1] for when in sample]
+
+        demand, demand_s = timed(store.skill_demand, dates[0], dates[-1], SKILLS)
+
+        def replay():
+            return pd.DataFrame([load_dataset(os.path.join(copies, when.strftime("%Y%m%d")), "parquet")[SKILLS].sum()
+                                 for when in dates])
+        replayed, replay_s = timed(replay)
+        same = (demand.pivot(index="crawled_at", columns="skill", values="active")[SKILLS].to_numpy()
+                == replayed.to_numpy()).all()
+
+        print(f"{rows} postings, {days} daily crawls, {churn:.0%} churn\n")
+        print(pd.DataFrame([
+            {"measure": "disk (MB)", "snapshots": folder_size(store.path) / 2**20, "daily copies": folder_size(copies) / 2**20},
+            {"measure": "add a crawl (s)", "snapshots": np.mean(add_s), "daily copies": np.nan},
+            {"measure": "state of a day (s)", "snapshots": np.mean(as_of_s), "daily copies": np.mean(copy_s)},
+            {"measure": "demand over the range (s)", "snapshots": demand_s, "daily copies": replay_s},
+        ]).round(3).to_string(index=False))
+        print(f"\nsame demand: {'✅' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the snapshot store with full daily copies")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--churn", type=float, default=0.03)
+    args = parser.parse_args()
+
+    run(args.rows, args.days, args.churn)
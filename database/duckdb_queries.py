@@ -0,0 +1,250 @@
+"""
+Run the queries of sql_query.sql with embedded DuckDB, with no database server.
+
+    python database/duckdb_queries.py                         # cleaned dataset in STORAGE format
+    python database/duckdb_queries.py --storage parquet --no-cache
+
+`jobs` is read from the cleaned dataset file (CSV, Parquet or Arrow IPC)
+into an in-memory columnar table in one scan, with one row per job_url as
+insert_mysql.py loads it, and job_skills and skill_rollup are derived from
+it the way insert_mysql.py keeps them in MySQL. The views and queries of
+sql_query.sql then run as written, translated from MySQL (backtick
+identifiers, CREATE VIEW).
+
+Results are cached as Arrow IPC files per data version: a hash of the dataset
+file, sql_query.sql and the table definitions. Rerunning over the same data reads
+them back instead of querying.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+import duckdb
+import pyarrow.feather as feather
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from config import STORAGE
+from insert_mysql import KEY, ROLLUP_KEYS, SKILL_COLUMNS, TABLE
+from storage import dataset_path
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_query.sql")
+QUERY_CACHE = "data/cache/queries"
+CACHE_KEEP = 5           # data versions kept in the cache
+
+
+# ---------------- STATEMENTS ---------------- #
+
+def read_statements(path=SQL_FILE):
+    """
+    (label, sql) of every statement in the file except USE and CREATE
+    DATABASE; the label is the comment right above the statement, if any.
+    """
+    statements, comment, lines = [], [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("--"):
+                if not lines:
+                    comment.append(stripped[2:].strip())
+                continue
+            if stripped:
+                lines.append(line.rstrip())
+            if stripped.endswith(";"):
+                sql = "\n".join(lines).rstrip(";").strip()
+                if not re.match(r"(USE|CREATE\s+DATABASE)\b", sql, re.I):
+                    statements.append((" ".join(comment), sql))
+                comment, lines = [], []
+    return statements
+
+
+def to_duckdb(sql):
+    """MySQL statement in DuckDB's dialect."""
+    sql = sql.replace("`", '"')
+    return re.sub(r"^CREATE\s+VIEW\b", "CREATE OR REPLACE VIEW", sql, flags=re.I)
+
+
+def is_view(sql):
+    return re.match(r"CREATE\s+(OR\s+REPLACE\s+)?VIEW\b", sql, re.I) is not None
+
+
+# ---------------- TABLES ---------------- #
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def source_sql(path, storage):
+    if storage == "csv":
+        return f"read_csv('{path}', header = true)"
+    if storage == "parquet":
+        return f"read_parquet('{path}')"
+    if storage == "arrow":
+        # registered as a memory-mapped Arrow table in connect()
+        return "jobs_file"
+    raise ValueError(f"Unknown storage format: {storage}")
+
+
+def table_sql(source, columns):
+    """
+    CREATE TABLE statements for jobs, job_skills and skill_rollup from the
+    dataset `source`, given the dataset's columns.
+    """
+    skills = ", ".join(quote(c) for c in SKILL_COLUMNS if c in columns)
+    groups = ", ".join(f"COALESCE(j.{k}, 'Unknown') AS {k}" for k in ROLLUP_KEYS)
+    job_skills = (
+        f"SELECT {KEY}, skill FROM (UNPIVOT (SELECT {KEY}, {skills} FROM {TABLE}) "
+        f"ON {skills} INTO NAME skill VALUE flag) WHERE flag = 1"
+        if skills else f"SELECT {KEY}, NULL::VARCHAR AS skill FROM {TABLE} WHERE false"
+    )
+    return [
+        # the last row of a job_url wins, as in insert_mysql.prepare
+        f"""
+        CREATE OR REPLACE TABLE {TABLE} AS
+        SELECT * EXCLUDE (row_no) FROM (SELECT *, row_number() OVER () AS row_no FROM {source})
+        QUALIFY row_no = max(row_no) OVER (PARTITION BY {KEY})
+        """,
+        f"CREATE OR REPLACE TABLE job_skills AS {job_skills}",
+        f"""
+        CREATE OR REPLACE TABLE skill_rollup AS
+        SELECT s.skill, {groups},
+               COUNT(*) AS jobs, COUNT(j.salary_lpa_min) AS salary_jobs, SUM(j.salary_lpa_min) AS salary_sum,
+               ROUND(AVG(j.salary_lpa_min), 2) AS avg_salary, MIN(j.salary_lpa_min) AS min_salary
+        FROM job_skills s JOIN {TABLE} j ON j.{KEY} = s.{KEY}
+        GROUP BY ALL
+        """,
+    ]
+
+
+def connect(path, storage=STORAGE):
+    """In-memory DuckDB connection with the jobs tables built from the dataset file at `path`."""
+    con = duckdb.connect()
+    if storage == "arrow":
+        con.register("jobs_file", feather.read_table(path, memory_map=True))
+    source = source_sql(path, storage)
+    columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    for sql in table_sql(source, columns):
+        con.execute(sql)
+    return con
+
+
+def run_statements(con, statements):
+    """Create the views and run the queries in file order; returns [(name, label, sql, DataFrame)]."""
+    results = []
+    for label, sql in statements:
+        if is_view(sql):
+            con.execute(to_duckdb(sql))
+            continue
+        df = con.execute(to_duckdb(sql)).df()
+        results.append((f"q{len(results) + 1:02d}", label, sql, df))
+    return results
+
+
+# ---------------- CACHE ---------------- #
+
+def file_hash(path, block=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(block):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_version(path, storage, sql_path=SQL_FILE):
+    """Hash of the dataset file, the SQL file and the table definitions: results change only with it."""
+    digest = hashlib.sha1()
+    for part in (file_hash(path), file_hash(sql_path), storage, duckdb.__version__,
+                 *table_sql(source_sql(path, storage), SKILL_COLUMNS)):
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class QueryCache:
+    """
+    Query results per data version: <directory>/<version>/ holds an
+    uncompressed Arrow IPC file per query (the fastest to read back) and a
+    manifest. Only the `keep` newest versions are kept.
+    """
+
+    def __init__(self, directory=QUERY_CACHE, keep=CACHE_KEEP):
+        self.directory = directory
+        self.keep = keep
+
+    def get(self, version):
+        folder = os.path.join(self.directory, version)
+        manifest = os.path.join(folder, "manifest.json")
+        if not os.path.exists(manifest):
+            return None
+        with open(manifest, encoding="utf-8") as f:
+            entries = json.load(f)
+        return [(e["name"], e["label"], e["sql"], feather.read_table(os.path.join(folder, e["name"] + ".arrow")).to_pandas())
+                for e in entries]
+
+    def put(self, version, results):
+        # written to a temporary folder and renamed, so readers never see half a version
+        folder = os.path.join(self.directory, version)
+        tmp = f"{folder}.tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        for name, _, _, df in results:
+            feather.write_feather(df, os.path.join(tmp, name + ".arrow"), compression="uncompressed")
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump([{"name": n, "label": l, "sql": s} for n, l, s, _ in results], f, indent=1)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+        self.evict()
+
+    def evict(self):
+        versions = [os.path.join(self.directory, v) for v in os.listdir(self.directory)
+                    if os.path.exists(os.path.join(self.directory, v, "manifest.json"))]
+        versions.sort(key=os.path.getmtime, reverse=True)
+        for folder in versions[self.keep:]:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+# ---------------- RUN ---------------- #
+
+def query_jobs(dataset="job_details_cleaned", storage=STORAGE, sql_path=SQL_FILE, cache_dir=QUERY_CACHE):
+    """
+    Results of every query in sql_path over the dataset, as
+    ([(name, label, sql, DataFrame)], cached). With cache_dir=None nothing is cached.
+    """
+    path = dataset_path(dataset, storage) if not os.path.exists(dataset) else dataset
+    cache = QueryCache(cache_dir) if cache_dir else None
+    version = data_version(path, storage, sql_path) if cache else None
+
+    if cache is not None:
+        results = cache.get(version)
+        if results is not None:
+            return results, True
+
+    con = connect(path, storage)
+    try:
+        results = run_statements(con, read_statements(sql_path))
+    finally:
+        con.close()
+    if cache is not None:
+        cache.put(version, results)
+    return results, False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run sql_query.sql over the cleaned dataset with DuckDB")
+    parser.add_argument("--dataset", default="job_details_cleaned", help="dataset name or file path")
+    parser.add_argument("--storage", choices=["csv", "parquet", "arrow"], default=STORAGE)
+    parser.add_argument("--sql", default=SQL_FILE)
+    parser.add_argument("--cache", default=QUERY_CACHE, help="folder of cached results")
+    parser.add_argument("--no-cache", action="store_true", help="always query, cache nothing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, cached = query_jobs(args.dataset, args.storage, args.sql, None if args.no_cache else args.cache)
+    elapsed = time.perf_counter() - start
+
+    for name, label, sql, df in results:
+        print(f"\n-- {name}" + (f": {label}" if label else ""))
+        print(df.to_string(index=False))
+    print(f"\n✅ {len(results)} queries in {elapsed * 1000:.1f} ms" + (" (cached)" if cached else ""))
@@ -1,51 +1,581 @@
+"""
+Load the cleaned jobs dataset into the `jobs` table.
+
+The table schema is typed from the dataset (TINYINT flags and scores,
+DECIMAL salary, indexed category columns, job_url as primary key), and rows
+are upserted by job_url in chunks instead of replacing the table. With
+--load-data each chunk goes through LOAD DATA LOCAL INFILE into a staging
+table first.
+
+Derived tables kept in step with every chunk:
+  - job_skills(job_url, skill): one row per skill flag set on a job
+  - skill_rollup: jobs and salary stats per skill × experience_level ×
+    location_clean; only the groups touched by a chunk are recomputed
+  - job_signatures / job_lsh: the MinHash signature and LSH band keys of
+    every job (analysis/dedup.py). A chunk's jobs are compared with the jobs
+    sharing a band key only, and canonical_job_id is rewritten for the
+    clusters they join.
+
+    python database/insert_mysql.py                       # MySQL (MYSQL_* env vars)
+    python database/insert_mysql.py --backend sqlite      # local SQLite stand-in
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+import numpy as np
 import pandas as pd
-import mysql.connector
 
-# LOAD CSV
-df = pd.read_csv(
-    r"E:\mushaf notes\Data Analytics\Job-Market-Intelligence-project\data\processed\job_details_cleaned.csv"
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+from data_cleaning import SCORES, SKILL_FLAGS
+from dedup import (
+    TEXT_COLUMNS as DEDUP_COLUMNS, band_keys, candidate_pairs, connected_components, duplicate_edges,
+    empty_signatures, posting_signatures,
 )
+from storage import CATEGORY_COLUMNS, LIST_COLUMNS, load_dataset
 
-# CONNECT MYSQL
-conn = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="mushaf",
-    database="job_market"
-)
+TABLE = "jobs"
+KEY = "job_url"
+CHUNK_SIZE = 1000
 
-cursor = conn.cursor()
+# 0/1 skill columns of jobs, normalized into job_skills and rolled up
+SKILL_COLUMNS = list(SKILL_FLAGS) + ["Data Analysis"]
+ROLLUP_KEYS = ["experience_level", "location_clean"]
 
-# 1️⃣ DROP TABLE IF EXISTS
-cursor.execute("DROP TABLE IF EXISTS jobs")
+# free text that can outgrow VARCHAR on a later scrape
+TEXT_COLUMNS = ["job_description", "key_skills", "matched_skills", "salary", "location"]
 
-# 2️⃣ CREATE TABLE AUTOMATICALLY FROM CSV
-cols = df.columns
+# fixed types for the cleaned dataset's own columns, so the schema does not
+# depend on the values of the first chunk loaded; other columns are inferred
+COLUMN_TYPES = {
+    "job_title": "VARCHAR(255)",
+    "company": "VARCHAR(255)",
+    "experience": "VARCHAR(64)",
+    "posted_time": "VARCHAR(64)",
+    "applicants": "VARCHAR(64)",
+    "experience_min": "DECIMAL(4,1)",
+    "experience_max": "DECIMAL(4,1)",
+    "salary_lpa_min": "DECIMAL(8,2)",
+    "salary_lpa_max": "DECIMAL(8,2)",
+    "is_data_role": "TINYINT",
+    "canonical_job_id": "VARCHAR(512)",
+    **{col: "TINYINT" for col in SKILL_COLUMNS + list(SCORES)},
+    **{col: "TEXT" for col in TEXT_COLUMNS},
+}
 
-column_defs = []
-for col in cols:
-    column_defs.append(f"`{col}` TEXT")
+MYSQL_CONFIG = {
+    "host": os.environ.get("MYSQL_HOST", "localhost"),
+    "port": int(os.environ.get("MYSQL_PORT", 3306)),
+    "user": os.environ.get("MYSQL_USER", "root"),
+    "password": os.environ.get("MYSQL_PASSWORD", "mushaf"),
+    "database": os.environ.get("MYSQL_DATABASE", "job_market"),
+}
+SQLITE_PATH = "data/job_market.sqlite"
 
-create_table_sql = f"""
-CREATE TABLE jobs (
-{",".join(column_defs)}
-)
-"""
 
-cursor.execute(create_table_sql)
+# ---------------- SCHEMA ---------------- #
+
+def column_type(name, series, backend="mysql"):
+    """SQL type for one dataset column."""
+    if name == KEY:
+        return "VARCHAR(512)"
+    if name in LIST_COLUMNS:
+        return "JSON" if backend == "mysql" else "TEXT"
+    if name in CATEGORY_COLUMNS:
+        return "VARCHAR(32)"
+    if name in COLUMN_TYPES:
+        return COLUMN_TYPES[name]
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        low, high = (series.min(), series.max()) if len(series) else (0, 0)
+        if -128 <= low and high <= 127:
+            return "TINYINT"
+        return "INT" if -2**31 <= low and high < 2**31 else "BIGINT"
+    if pd.api.types.is_float_dtype(series):
+        return "DOUBLE"
+    longest = series.dropna().astype(str).str.len().max()
+    return "VARCHAR(255)" if pd.isna(longest) or longest <= 255 else "TEXT"
+
+
+def schema(df, backend="mysql"):
+    return {col: column_type(col, df[col], backend) for col in df.columns}
+
+
+def quote(name):
+    return f"`{name}`"
+
+
+def create_table(cursor, columns, backend="mysql"):
+    """
+    Create the table if needed and add any dataset columns it is missing.
+    An existing table not keyed on job_url (e.g. from the old all-TEXT
+    loader) is refused, since upserts into it would only append duplicates.
+    """
+    defs = [f"{quote(col)} {sql_type}" + (" NOT NULL PRIMARY KEY" if col == KEY else "")
+            for col, sql_type in columns.items()]
+    indexed = [col for col in CATEGORY_COLUMNS if col in columns]
+
+    if backend == "mysql":
+        defs += [f"INDEX idx_{col} ({quote(col)})" for col in indexed]
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} (\n{', '.join(defs)}\n)")
+
+    if backend == "sqlite":
+        for col in indexed:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{col} ON {TABLE} ({quote(col)})")
+
+    if primary_key(cursor, backend) != [KEY]:
+        raise ValueError(f"Table `{TABLE}` is not keyed on {KEY}; reload it with --recreate")
+
+    existing = table_columns(cursor, backend)
+    for col, sql_type in columns.items():
+        if col not in existing:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD COLUMN {quote(col)} {sql_type}")
+
+
+def table_columns(cursor, backend="mysql"):
+    if backend == "mysql":
+        cursor.execute(f"SHOW COLUMNS FROM {TABLE}")
+    else:
+        cursor.execute(f"PRAGMA table_info({TABLE})")
+        return {row[1] for row in cursor.fetchall()}
+    return {row[0] for row in cursor.fetchall()}
+
+
+def primary_key(cursor, backend="mysql"):
+    """Primary key columns of the table, in key order."""
+    if backend == "mysql":
+        cursor.execute(f"SHOW KEYS FROM {TABLE} WHERE Key_name = 'PRIMARY'")
+        # (Table, Non_unique, Key_name, Seq_in_index, Column_name, ...)
+        return [row[4] for row in sorted(cursor.fetchall(), key=lambda row: row[3])]
+    cursor.execute(f"PRAGMA table_info({TABLE})")
+    # (cid, name, type, notnull, dflt_value, pk) with pk the 1-based key position
+    return [row[1] for row in sorted(cursor.fetchall(), key=lambda row: row[5]) if row[5]]
+
+
+# ---------------- ROWS ---------------- #
+
+def prepare(df):
+    """Dataset as written to the table: lists as JSON, one row per job_url (last one wins)."""
+    df = df.drop_duplicates(KEY, keep="last").copy()
+    for col in LIST_COLUMNS:
+        if col in df:
+            df[col] = df[col].map(json.dumps)
+    return df
+
+
+def chunk_rows(df, chunk_size=CHUNK_SIZE):
+    """Yield (chunk, rows) pairs, rows as plain Python tuples with None for missing values."""
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        values = chunk.astype(object)
+        values = values.where(values.notna(), None)
+        yield chunk, list(values.itertuples(index=False, name=None))
+
+
+def tsv_field(value):
+    """One field in LOAD DATA's default escaping (\\N is NULL)."""
+    if value is None:
+        return "\\N"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def upsert_sql(columns, backend="mysql"):
+    names = ", ".join(quote(c) for c in columns)
+    updates = [c for c in columns if c != KEY]
+
+    if backend == "mysql":
+        placeholders = ", ".join(["%s"] * len(columns))
+        assignments = ", ".join(f"{quote(c)} = VALUES({quote(c)})" for c in updates)
+        return f"INSERT INTO {TABLE} ({names}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {assignments}"
+
+    placeholders = ", ".join(["?"] * len(columns))
+    assignments = ", ".join(f"{quote(c)} = excluded.{quote(c)}" for c in updates)
+    return f"INSERT INTO {TABLE} ({names}) VALUES ({placeholders}) ON CONFLICT({KEY}) DO UPDATE SET {assignments}"
+
+
+# ---------------- SKILL TABLES ---------------- #
+
+SKILL_TABLES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_skills (
+        job_url VARCHAR(512) NOT NULL,
+        skill VARCHAR(64) NOT NULL,
+        PRIMARY KEY (job_url, skill)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS skill_rollup (
+        skill VARCHAR(64) NOT NULL,
+        experience_level VARCHAR(32) NOT NULL,
+        location_clean VARCHAR(32) NOT NULL,
+        jobs INT NOT NULL,
+        salary_jobs INT NOT NULL,
+        salary_sum DOUBLE,
+        avg_salary DECIMAL(8,2),
+        min_salary DECIMAL(8,2),
+        PRIMARY KEY (skill, experience_level, location_clean)
+    )
+    """,
+]
+
+# rollup group of a job; missing labels are grouped as 'Unknown'
+GROUP_SQL = "s.skill, COALESCE(j.experience_level, 'Unknown'), COALESCE(j.location_clean, 'Unknown')"
+
+
+def placeholder(backend="mysql"):
+    return "%s" if backend == "mysql" else "?"
+
+
+def create_skill_tables(cursor, backend="mysql"):
+    for sql in SKILL_TABLES_SQL:
+        cursor.execute(sql)
+    if backend == "mysql":
+        cursor.execute("SHOW INDEX FROM job_skills WHERE Key_name = 'idx_job_skills_skill'")
+        if not cursor.fetchall():
+            cursor.execute("CREATE INDEX idx_job_skills_skill ON job_skills (skill)")
+    else:
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills (skill)")
+
+
+def job_skill_pairs(chunk):
+    """(job_url, skill, experience_level, location_clean) for every skill flag set in chunk."""
+    groups = chunk.reindex(columns=[KEY] + ROLLUP_KEYS).astype(object).fillna("Unknown")
+    pairs = []
+    for skill in [c for c in SKILL_COLUMNS if c in chunk]:
+        hit = chunk[skill].fillna(0).astype(int) == 1
+        for url, level, location in groups[hit].itertuples(index=False, name=None):
+            pairs.append((url, skill, level, location))
+    return pairs
+
+
+def skill_groups(cursor, urls, backend="mysql"):
+    """Rollup groups the given jobs currently count towards."""
+    if not urls:
+        return set()
+    marks = ", ".join([placeholder(backend)] * len(urls))
+    cursor.execute(
+        f"SELECT {GROUP_SQL} FROM job_skills s JOIN {TABLE} j ON j.job_url = s.job_url "
+        f"WHERE s.job_url IN ({marks})",
+        urls,
+    )
+    return set(cursor.fetchall())
+
+
+def replace_job_skills(cursor, chunk, backend="mysql"):
+    """Rewrite the job_skills rows of the jobs in chunk; returns the groups they now count towards."""
+    urls = chunk[KEY].tolist()
+    marks = ", ".join([placeholder(backend)] * len(urls))
+    cursor.execute(f"DELETE FROM job_skills WHERE job_url IN ({marks})", urls)
+
+    pairs = job_skill_pairs(chunk)
+    p = placeholder(backend)
+    cursor.executemany(f"INSERT INTO job_skills (job_url, skill) VALUES ({p}, {p})",
+                       [pair[:2] for pair in pairs])
+    return {pair[1:] for pair in pairs}
+
+
+def refresh_rollups(cursor, groups=None, backend="mysql"):
+    """Recompute skill_rollup for the given (skill, experience_level, location_clean) groups, or all of them."""
+    select = (
+        f"SELECT {GROUP_SQL}, COUNT(*), COUNT(j.salary_lpa_min), SUM(j.salary_lpa_min), "
+        f"ROUND(AVG(j.salary_lpa_min), 2), MIN(j.salary_lpa_min) "
+        f"FROM job_skills s JOIN {TABLE} j ON j.job_url = s.job_url"
+    )
+    insert = ("INSERT INTO skill_rollup (skill, experience_level, location_clean, jobs, salary_jobs, "
+              "salary_sum, avg_salary, min_salary) ")
+
+    if groups is None:
+        cursor.execute("DELETE FROM skill_rollup")
+        cursor.execute(f"{insert}{select} GROUP BY {GROUP_SQL}")
+        return
+
+    if not groups:
+        return
+
+    temp = "TEMPORARY" if backend == "mysql" else "TEMP"
+    p = placeholder(backend)
+    cursor.execute(
+        f"CREATE {temp} TABLE IF NOT EXISTS rollup_dirty "
+        f"(skill VARCHAR(64), experience_level VARCHAR(32), location_clean VARCHAR(32))"
+    )
+    cursor.execute("DELETE FROM rollup_dirty")
+    cursor.executemany(f"INSERT INTO rollup_dirty VALUES ({p}, {p}, {p})", sorted(groups))
+
+    cursor.execute(
+        "DELETE FROM skill_rollup WHERE (skill, experience_level, location_clean) IN "
+        "(SELECT skill, experience_level, location_clean FROM rollup_dirty)"
+    )
+    # MySQL cannot open a temporary table twice in one statement, so the
+    # skill filter (which uses the job_skills index) is passed as parameters
+    skills = sorted({group[0] for group in groups})
+    cursor.execute(
+        f"{insert}{select} "
+        f"WHERE s.skill IN ({', '.join([p] * len(skills))}) "
+        f"GROUP BY {GROUP_SQL} "
+        f"HAVING ({GROUP_SQL}) IN (SELECT skill, experience_level, location_clean FROM rollup_dirty)",
+        skills,
+    )
+
+
+# ---------------- NEAR DUPLICATES ---------------- #
+
+DEDUP_TABLES_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_signatures (
+        job_url VARCHAR(512) NOT NULL PRIMARY KEY,
+        signature BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_lsh (
+        band SMALLINT NOT NULL,
+        bucket BIGINT NOT NULL,
+        job_url VARCHAR(512) NOT NULL,
+        PRIMARY KEY (band, bucket, job_url)
+    )
+    """,
+]
+
+
+def create_dedup_tables(cursor, backend="mysql"):
+    for sql in DEDUP_TABLES_SQL:
+        cursor.execute(sql)
+    if backend == "mysql":
+        cursor.execute(f"SHOW INDEX FROM {TABLE} WHERE Key_name = 'idx_canonical_job_id'")
+        if not cursor.fetchall():
+            cursor.execute(f"CREATE INDEX idx_canonical_job_id ON {TABLE} (canonical_job_id)")
+    else:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_canonical_job_id ON {TABLE} (canonical_job_id)")
+
+
+def lsh_rows(keys, owners):
+    """(band, bucket, owner) for every band key; buckets as signed BIGINTs."""
+    n, bands = keys.shape
+    return list(zip(np.tile(np.arange(bands), n).tolist(),
+                    keys.view(np.int64).ravel().tolist(),
+                    np.repeat(np.asarray(owners, dtype=object), bands).tolist()))
+
+
+def stored_matches(cursor, keys, backend="mysql"):
+    """
+    (chunk row, job_url, signature, canonical_job_id) of every stored job
+    sharing a band key with a row of keys.
+    """
+    temp = "TEMPORARY" if backend == "mysql" else "TEMP"
+    p = placeholder(backend)
+    cursor.execute(f"CREATE {temp} TABLE IF NOT EXISTS lsh_probe (band SMALLINT, bucket BIGINT, row_no INT)")
+    cursor.execute("DELETE FROM lsh_probe")
+    cursor.executemany(f"INSERT INTO lsh_probe VALUES ({p}, {p}, {p})", lsh_rows(keys, range(len(keys))))
+    cursor.execute(
+        f"SELECT p.row_no, s.job_url, s.signature, j.canonical_job_id FROM lsh_probe p "
+        f"JOIN job_lsh l ON l.band = p.band AND l.bucket = p.bucket "
+        f"JOIN job_signatures s ON s.job_url = l.job_url "
+        f"JOIN {TABLE} j ON j.job_url = l.job_url"
+    )
+    return cursor.fetchall()
+
+
+def update_canonical_ids(cursor, chunk, backend="mysql"):
+    """
+    Set canonical_job_id for the jobs in chunk, already upserted into the
+    table. They are compared with each other and with the stored jobs sharing
+    one of their LSH band keys; every cluster they join takes the smallest
+    job_url of the merged clusters. Re-loading a job never splits the
+    clusters it was in; --rebuild-dedup does.
+    """
+    urls = chunk[KEY].tolist()
+    p = placeholder(backend)
+    marks = ", ".join([p] * len(urls))
+    cursor.execute(f"DELETE FROM job_lsh WHERE job_url IN ({marks})", urls)
+    cursor.execute(f"DELETE FROM job_signatures WHERE job_url IN ({marks})", urls)
+
+    signatures = posting_signatures(chunk)
+    rows = np.flatnonzero(~empty_signatures(signatures))
+    keys = band_keys(signatures[rows])
+
+    # nodes: the chunk's jobs, then the stored jobs sharing a bucket with one
+    n = len(urls)
+    stored, stored_signatures, names, pairs = {}, [], list(urls), [candidate_pairs(signatures)]
+    for row, url, signature, canonical in stored_matches(cursor, keys, backend) if len(rows) else []:
+        if url not in stored:
+            stored[url] = n + len(stored)
+            stored_signatures.append(np.frombuffer(bytes(signature), dtype=np.uint32))
+            # a stored job stands for its whole cluster
+            names.append(canonical or url)
+        pairs.append(np.array([[rows[row], stored[url]]]))
+
+    everything = np.vstack([signatures] + stored_signatures)
+    edges = duplicate_edges(everything, np.unique(np.concatenate(pairs), axis=0))
+    labels = connected_components(len(everything), edges)
+    names = np.array(names, dtype=object)
+    canonical = pd.Series(names).groupby(labels).transform("min").to_numpy()
+
+    renamed = sorted({(new, old) for old, new in zip(names[n:], canonical[n:]) if old != new})
+    cursor.executemany(f"UPDATE {TABLE} SET canonical_job_id = {p} WHERE canonical_job_id = {p}", renamed)
+    cursor.executemany(f"UPDATE {TABLE} SET canonical_job_id = {p} WHERE {KEY} = {p}",
+                       list(zip(canonical[:n].tolist(), urls)))
+
+    owners = [urls[i] for i in rows]
+    cursor.executemany(f"INSERT INTO job_signatures (job_url, signature) VALUES ({p}, {p})",
+                       [(url, signatures[i].tobytes()) for url, i in zip(owners, rows)])
+    cursor.executemany(f"INSERT INTO job_lsh (band, bucket, job_url) VALUES ({p}, {p}, {p})", lsh_rows(keys, owners))
+
+
+def rebuild_canonical_ids(conn, backend="mysql", chunk_size=CHUNK_SIZE):
+    """Recompute canonical_job_id, signatures and band keys for the whole table, chunk by chunk."""
+    cursor = conn.cursor()
+    columns = [col for col in [KEY] + DEDUP_COLUMNS if col in table_columns(cursor, backend)]
+    cursor.execute("DELETE FROM job_lsh")
+    cursor.execute("DELETE FROM job_signatures")
+    cursor.execute(f"UPDATE {TABLE} SET canonical_job_id = {KEY}")
+    conn.commit()
+
+    last = ""
+    p = placeholder(backend)
+    while True:
+        cursor.execute(f"SELECT {', '.join(quote(c) for c in columns)} FROM {TABLE} "
+                       f"WHERE {KEY} > {p} ORDER BY {KEY} LIMIT {int(chunk_size)}", [last])
+        chunk = pd.DataFrame(cursor.fetchall(), columns=columns)
+        if chunk.empty:
+            break
+        update_canonical_ids(cursor, chunk, backend)
+        conn.commit()
+        last = chunk[KEY].iloc[-1]
+    cursor.close()
+
+
+# ---------------- LOADERS ---------------- #
+
+def load_chunked(conn, df, backend="mysql", chunk_size=CHUNK_SIZE):
+    """executemany per chunk, committed per chunk."""
+    cursor = conn.cursor()
+    sql = upsert_sql(list(df.columns), backend)
+    loaded = 0
+
+    for chunk, rows in chunk_rows(df, chunk_size):
+        dirty = skill_groups(cursor, chunk[KEY].tolist(), backend)
+        cursor.executemany(sql, rows)
+        dirty |= replace_job_skills(cursor, chunk, backend)
+        refresh_rollups(cursor, dirty, backend)
+        update_canonical_ids(cursor, chunk, backend)
+        conn.commit()
+        loaded += len(rows)
+        print(f"Upserted {loaded}/{len(df)} rows")
+
+    cursor.close()
+    return loaded
+
+
+def load_data_infile(conn, df, chunk_size=CHUNK_SIZE):
+    """
+    MySQL only: each chunk is written to a tab-separated file, loaded into a
+    temporary staging table with LOAD DATA LOCAL INFILE and upserted from there.
+    """
+    cursor = conn.cursor()
+    columns = list(df.columns)
+    names = ", ".join(quote(c) for c in columns)
+    assignments = ", ".join(f"{quote(c)} = VALUES({quote(c)})" for c in columns if c != KEY)
+
+    cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {TABLE}_staging LIKE {TABLE}")
+    loaded = 0
+
+    for chunk, rows in chunk_rows(df, chunk_size):
+        dirty = skill_groups(cursor, chunk[KEY].tolist())
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, newline="", encoding="utf-8") as f:
+            for row in rows:
+                f.write("\t".join(tsv_field(v) for v in row) + "\n")
+            path = f.name
+
+        try:
+            cursor.execute(f"TRUNCATE TABLE {TABLE}_staging")
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {TABLE}_staging "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({names})"
+            )
+            cursor.execute(
+                f"INSERT INTO {TABLE} ({names}) SELECT {names} FROM {TABLE}_staging "
+                f"ON DUPLICATE KEY UPDATE {assignments}"
+            )
+            dirty |= replace_job_skills(cursor, chunk)
+            refresh_rollups(cursor, dirty)
+            update_canonical_ids(cursor, chunk)
+            conn.commit()
+        finally:
+            os.remove(path)
+
+        loaded += len(rows)
+        print(f"Loaded {loaded}/{len(df)} rows")
+
+    cursor.close()
+    return loaded
+
+
+def connect(backend="mysql", sqlite_path=SQLITE_PATH, local_infile=False):
+    if backend == "sqlite":
+        os.makedirs(os.path.dirname(sqlite_path) or ".", exist_ok=True)
+        return sqlite3.connect(sqlite_path)
+
+    import mysql.connector
+    return mysql.connector.connect(**MYSQL_CONFIG, allow_local_infile=local_infile)
+
 
-# 3️⃣ INSERT DATA
-col_names = ",".join(f"`{c}`" for c in cols)
-placeholders = ",".join(["%s"] * len(cols))
+def load_jobs(df, conn, backend="mysql", chunk_size=CHUNK_SIZE, load_data=False, recreate=False):
+    """
+    Create or extend the typed jobs table and upsert df into it, keeping
+    job_skills, skill_rollup and canonical_job_id in step. `recreate` drops
+    the tables first,
+    which is required to replace a jobs table made by the old all-TEXT
+    loader: without a job_url primary key it is refused.
+    """
+    df = prepare(df)
+    cursor = conn.cursor()
+    if recreate:
+        for table in [TABLE, "job_skills", "skill_rollup", "job_signatures", "job_lsh"]:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    # canonical_job_id is derived here, whether or not the dataset has it
+    columns = {**schema(df, backend), "canonical_job_id": COLUMN_TYPES["canonical_job_id"]}
+    create_table(cursor, columns, backend)
+    create_skill_tables(cursor, backend)
+    create_dedup_tables(cursor, backend)
+    conn.commit()
+    cursor.close()
 
-insert_sql = f"INSERT INTO jobs ({col_names}) VALUES ({placeholders})"
+    if load_data:
+        if backend != "mysql":
+            raise ValueError("LOAD DATA INFILE is only available on MySQL")
+        return load_data_infile(conn, df, chunk_size)
+    return load_chunked(conn, df, backend, chunk_size)
 
-data = df.fillna("").values.tolist()
 
-cursor.executemany(insert_sql, data)
-conn.commit()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upsert the cleaned jobs dataset into MySQL or SQLite")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--load-data", action="store_true", help="ingest through LOAD DATA LOCAL INFILE (MySQL)")
+    parser.add_argument("--dataset", default="job_details_cleaned")
+    parser.add_argument("--recreate", action="store_true", help="drop and recreate the tables first")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="recompute skill_rollup from scratch")
+    parser.add_argument("--rebuild-dedup", action="store_true", help="recompute canonical_job_id from scratch")
+    args = parser.parse_args()
 
-cursor.close()
-conn.close()
+    df = load_dataset(args.dataset)
+    conn = connect(args.backend, args.sqlite_path, local_infile=args.load_data)
+    try:
+        count = load_jobs(df, conn, args.backend, args.chunk_size, args.load_data, args.recreate)
+        if args.rebuild_rollups:
+            cursor = conn.cursor()
+            refresh_rollups(cursor, backend=args.backend)
+            conn.commit()
+            cursor.close()
+        if args.rebuild_dedup:
+            rebuild_canonical_ids(conn, args.backend, args.chunk_size)
+    finally:
+        conn.close()
 
-print("✅ Data inserted into MySQL successfully")
+    print(f"✅ {count} jobs upserted into {args.backend} table `{TABLE}`")
@@ -0,0 +1,295 @@
+"""
+History of a dataset across crawls, stored as deltas.
+
+    python database/snapshots.py add                          # cleaned dataset, crawled when it was saved
+    python database/snapshots.py add --crawled-at 2026-10-18T09:00
+    python database/snapshots.py list
+    python database/snapshots.py as-of 2026-10-01
+    python database/snapshots.py demand --start 2026-09-01 --end 2026-10-01 --skills SQL Python
+
+Every crawl added is stored as a delta against the state of the previous
+one: the rows of new and changed postings, and the last rows of removed
+ones (one Parquet file per crawl). Every CHECKPOINT_EVERY crawls the full
+state is stored as well, so the state as of any date is the last
+checkpoint before it plus fewer than CHECKPOINT_EVERY deltas.
+
+Relative posted_time texts ("2 weeks ago") become posted_date when a
+posting is first seen, counted back from the crawl time, and are kept from
+then on; posted_date_bound is 1 when that date is only the latest possible
+one ("3+ weeks ago"). posted_time itself changes every day, so it does not
+make a posting count as changed.
+
+Skill demand (postings with each skill flag: active, new and removed, per
+crawl and location) is appended to demand.parquet as every crawl comes in,
+so queries over a time range read that table instead of replaying
+snapshots.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from config import STORAGE
+from insert_mysql import KEY, SKILL_COLUMNS
+from storage import CATEGORY_COLUMNS, LIST_COLUMNS, dataset_path, load_dataset, save_dataset, with_storage_types
+from text_parsing import posted_days
+
+SNAPSHOT_DIR = "data/snapshots"
+SNAPSHOT_STORAGE = "parquet"
+CHECKPOINT_EVERY = 14                # crawls between full copies of the state
+VOLATILE_COLUMNS = ["posted_time"]   # relative texts that change with every crawl
+TRACKED_COLUMNS = ["posted_date", "posted_date_bound", "first_seen"]
+DEMAND_KEYS = ["location_clean"]
+
+
+# ---------------- CHANGES ---------------- #
+
+def fingerprints(df, columns):
+    """uint64 hash of each row over the given columns (list cells by their repr)."""
+    df = df[columns].assign(**{col: df[col].map(repr) for col in LIST_COLUMNS if col in columns})
+    return pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+
+
+def posted_dates(posted_time, crawled_at):
+    """(posted_date, posted_date_bound) of relative posted texts seen at crawled_at."""
+    codes, texts = pd.factorize(posted_time)
+    ages = [posted_days(str(text)) for text in texts] + [(None, False)]
+    days = np.array([np.nan if d is None else d for d, _ in ages])[codes]
+    bound = np.array([int(b) for _, b in ages], dtype=np.int8)[codes]
+    dates = pd.Timestamp(crawled_at).normalize() - pd.to_timedelta(days, unit="D")
+    return pd.Series(dates, index=posted_time.index), pd.Series(bound, index=posted_time.index)
+
+
+def skill_demand_rows(state, new, removed, crawled_at):
+    """
+    Long table of active, new and removed postings per skill flag and
+    DEMAND_KEYS group, or None if the dataset has no skill flags.
+    """
+    skills = [col for col in SKILL_COLUMNS if col in state]
+    keys = [col for col in DEMAND_KEYS if col in state]
+    if not skills:
+        return None
+
+    def counts(df, name):
+        frame = df[keys + skills].copy()
+        frame[keys] = frame[keys].astype(object).fillna("Unknown")
+        # without any DEMAND_KEYS column all postings are one group
+        grouped = frame.groupby(keys or [np.zeros(len(frame), dtype=np.int8)], observed=True)
+        totals = grouped.size().rename("postings")
+        long = grouped[skills].sum().melt(ignore_index=False, var_name="skill", value_name=name)
+        return long.join(totals).set_index("skill", append=True), totals
+
+    active, postings = counts(state, "active")
+    rows = active.drop(columns="postings")
+    rows["new"] = counts(new, "new")[0]["new"]
+    rows["removed"] = counts(removed, "removed")[0]["removed"]
+    rows = rows.fillna(0).astype("int64")
+    rows["postings"] = postings.reindex(rows.index.droplevel("skill")).to_numpy()
+    rows = rows.reset_index(level=keys + ["skill"]).reset_index(drop=True)
+    rows.insert(0, "crawled_at", pd.Timestamp(crawled_at))
+    return rows
+
+
+# ---------------- STORE ---------------- #
+
+class SnapshotStore:
+    """
+    Crawls of one dataset in `path`: snapshots.json lists them, deltas/ and
+    checkpoints/ hold their rows and demand.parquet the skill demand per crawl.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        manifest = os.path.join(path, "snapshots.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"crawls": []}
+
+    @property
+    def crawls(self):
+        return self.manifest["crawls"]
+
+    def _file(self, kind, crawl):
+        return os.path.join(self.path, kind, crawl["id"])
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = os.path.join(self.path, "snapshots.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, "snapshots.json"))
+
+    def add(self, df, crawled_at=None):
+        """Store df as the crawl at crawled_at (default now); returns its manifest entry."""
+        crawled_at = pd.Timestamp(crawled_at or datetime.now()).floor("s")
+        if self.crawls and crawled_at <= pd.Timestamp(self.crawls[-1]["crawled_at"]):
+            raise ValueError(f"Crawl time {crawled_at} is not after the last crawl {self.crawls[-1]['crawled_at']}")
+
+        # one row per job_url, the last one as insert_mysql keeps it
+        current = with_storage_types(df.drop_duplicates(KEY, keep="last").drop(columns=TRACKED_COLUMNS, errors="ignore"))
+        current = current.reset_index(drop=True)
+        previous = self.as_of(crawled_at)
+        if previous is None:
+            previous = current.iloc[:0].assign(**{col: pd.Series(dtype=object) for col in TRACKED_COLUMNS})
+
+        columns = sorted(col for col in current.columns if col not in VOLATILE_COLUMNS)
+        pos = pd.Index(previous[KEY]).get_indexer(current[KEY])
+        seen = pos >= 0
+        changed = seen.copy()
+        if set(columns) <= set(previous.columns):
+            before = fingerprints(previous, columns)[pos[seen]]
+            changed[seen] = before != fingerprints(current.loc[seen], columns)
+        removed = ~previous[KEY].isin(current[KEY]).to_numpy()
+
+        # posted dates are worked out once, when a posting is first seen
+        state = current.copy()
+        if "posted_time" in state:
+            state["posted_date"], state["posted_date_bound"] = posted_dates(state["posted_time"], crawled_at)
+        else:
+            state["posted_date"], state["posted_date_bound"] = pd.NaT, np.zeros(len(state), dtype=np.int8)
+        state["first_seen"] = crawled_at.normalize()
+        if seen.any():
+            for col in TRACKED_COLUMNS:
+                state.loc[seen, col] = previous[col].to_numpy()[pos[seen]]
+
+        crawl = {
+            "id": crawled_at.strftime("%Y%m%dT%H%M%S"),
+            "crawled_at": crawled_at.isoformat(),
+            "rows": len(state),
+            "new": int((~seen).sum()),
+            "changed": int(changed.sum()),
+            "removed": int(removed.sum()),
+            "checkpoint": len(self.crawls) % CHECKPOINT_EVERY == 0,
+        }
+        stored = changed | ~seen
+        delta = pd.concat([
+            state[stored].assign(change=np.where(seen[stored], "changed", "new")),
+            previous[removed].assign(change="removed"),
+        ], ignore_index=True)
+
+        demand = skill_demand_rows(state, state[~seen], previous[removed], crawled_at)
+        demand_path = os.path.join(self.path, "demand.parquet")
+        if demand is not None and os.path.exists(demand_path):
+            demand = pd.concat([pd.read_parquet(demand_path), demand], ignore_index=True)
+
+        # nothing is written until every step has succeeded, the manifest
+        # last, so a failed add leaves no files behind; the first crawl is
+        # all new, so its checkpoint is its delta
+        if self.crawls:
+            save_dataset(delta, self._file("deltas", crawl), SNAPSHOT_STORAGE)
+        if crawl["checkpoint"]:
+            save_dataset(state, self._file("checkpoints", crawl), SNAPSHOT_STORAGE)
+        if demand is not None:
+            demand.to_parquet(demand_path, index=False, compression="zstd")
+
+        self.crawls.append(crawl)
+        self._save_manifest()
+        return crawl
+
+    def as_of(self, when):
+        """State of the dataset at the last crawl at or before `when`, or None before the first crawl."""
+        times = pd.to_datetime([crawl["crawled_at"] for crawl in self.crawls])
+        last = int(times.searchsorted(pd.Timestamp(when), side="right")) - 1
+        if last < 0:
+            return None
+        first = max(i for i in range(last + 1) if self.crawls[i]["checkpoint"])
+
+        state = load_dataset(self._file("checkpoints", self.crawls[first]), SNAPSHOT_STORAGE)
+        if last == first:
+            return state
+
+        # the last row of every job_url wins, in crawl order; removed ones are dropped
+        rows = pd.concat([state] + [load_dataset(self._file("deltas", crawl), SNAPSHOT_STORAGE)
+                                    for crawl in self.crawls[first + 1:last + 1]], ignore_index=True)
+        rows = rows[~rows[KEY].duplicated(keep="last") & (rows["change"] != "removed")]
+        rows = rows.drop(columns="change").reset_index(drop=True)
+        # categories differ between files, so they were concatenated as plain values
+        for col in CATEGORY_COLUMNS:
+            if col in rows:
+                rows[col] = rows[col].astype("category")
+        return rows
+
+    def changes(self, start=None, end=None):
+        """New, changed and removed rows of every crawl in [start, end], with crawled_at."""
+        frames = []
+        for crawl in self.crawls[1:]:
+            when = pd.Timestamp(crawl["crawled_at"])
+            if (start is None or when >= pd.Timestamp(start)) and (end is None or when <= pd.Timestamp(end)):
+                frames.append(load_dataset(self._file("deltas", crawl), SNAPSHOT_STORAGE).assign(crawled_at=when))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def skill_demand(self, start=None, end=None, skills=None, location=None):
+        """
+        Active, new and removed postings per crawl and skill in [start, end],
+        with the postings of all skills for shares; from demand.parquet only.
+        """
+        demand_path = os.path.join(self.path, "demand.parquet")
+        if not os.path.exists(demand_path):
+            return pd.DataFrame(columns=["crawled_at", "skill", "active", "new", "removed", "postings"])
+        filters = []
+        if start is not None:
+            filters.append(("crawled_at", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("crawled_at", "<=", pd.Timestamp(end)))
+        if skills:
+            filters.append(("skill", "in", list(skills)))
+        if location:
+            filters.append(("location_clean", "in", [location] if isinstance(location, str) else list(location)))
+        demand = pd.read_parquet(demand_path, filters=filters or None)
+        totals = demand.groupby(["crawled_at", "skill"], as_index=False)[["active", "new", "removed", "postings"]].sum()
+        totals["share"] = (totals["active"] / totals["postings"].where(totals["postings"] > 0)).round(4)
+        return totals
+
+
+def end_of(day):
+    """Timestamp for a CLI date: a bare date means the end of that day."""
+    when = pd.Timestamp(day)
+    return when + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) if len(day) == 10 else when
+
+
+# ---------------- RUN ---------------- #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the history of a dataset as crawl deltas")
+    parser.add_argument("command", choices=["add", "list", "as-of", "demand"])
+    parser.add_argument("date", nargs="?", help="as-of: date or time to rebuild the dataset at")
+    parser.add_argument("--dataset", default="job_details_cleaned")
+    parser.add_argument("--path", help=f"store folder (default {SNAPSHOT_DIR}/<dataset>)")
+    parser.add_argument("--crawled-at", help="add: crawl time (default: when the dataset file was saved)")
+    parser.add_argument("--output", help="as-of: save the rebuilt dataset under this name")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--skills", nargs="+")
+    parser.add_argument("--location", nargs="+")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.path or os.path.join(SNAPSHOT_DIR, args.dataset))
+
+    if args.command == "add":
+        path = dataset_path(args.dataset, STORAGE)
+        crawled_at = args.crawled_at or (datetime.fromtimestamp(os.path.getmtime(path)) if os.path.exists(path) else None)
+        crawl = store.add(load_dataset(args.dataset), crawled_at)
+        print(f"✅ Crawl {crawl['crawled_at']}: {crawl['rows']} postings, "
+              f"{crawl['new']} new, {crawl['changed']} changed, {crawl['removed']} removed")
+    elif args.command == "list":
+        print(pd.DataFrame(store.crawls).to_string(index=False))
+    elif args.command == "as-of":
+        if not args.date:
+            parser.error("as-of needs a date")
+        df = store.as_of(end_of(args.date))
+        if df is None:
+            print(f"❌ No crawl on or before {args.date}")
+            sys.exit(1)
+        print(f"{len(df)} postings as of {args.date}")
+        if args.output:
+            print(f"✅ Saved {save_dataset(df, args.output)}")
+    else:
+        demand = store.skill_demand(args.start, args.end and end_of(args.end), args.skills, args.location)
+        print(demand.pivot(index="crawled_at", columns="skill", values="active").to_string())
@@ -17,24 +17,13 @@ SUM(`Power BI`) AS powerbi_demand,
 SUM(`Tableau`) AS tableau_demand
 FROM jobs;
 
-SELECT 'SQL' AS skill,
-       AVG(salary_lpa_min) AS avg_salary
-FROM jobs
-WHERE `SQL` = 1
-
-UNION ALL
-
-SELECT 'Python' AS skill,
-       AVG(salary_lpa_min) AS avg_salary
-FROM jobs
-WHERE `Python` = 1
-
-UNION ALL
-
-SELECT 'Power BI' AS skill,
-       AVG(salary_lpa_min) AS avg_salary
-FROM jobs
-WHERE `Power BI` = 1;
+-- skill_rollup and job_skills are maintained by insert_mysql.py:
+-- skill_rollup holds jobs and salary stats per skill x experience_level x location_clean
+SELECT skill,
+       SUM(salary_sum) / SUM(salary_jobs) AS avg_salary
+FROM skill_rollup
+WHERE skill IN ('SQL', 'Python', 'Power BI')
+GROUP BY skill;
 
 SELECT 
 core_tools_score,
@@ -71,13 +60,16 @@ SELECT
 FROM jobs;
 
 CREATE OR REPLACE VIEW skill_salary AS
-SELECT 'SQL' AS skill, AVG(salary_lpa_min) AS avg_salary FROM jobs WHERE `SQL`=1
-UNION
-SELECT 'Python', AVG(salary_lpa_min) FROM jobs WHERE `Python`=1
-UNION
-SELECT 'Power BI', AVG(salary_lpa_min) FROM jobs WHERE `Power BI`=1
-UNION
-SELECT 'Tableau', AVG(salary_lpa_min) FROM jobs WHERE `Tableau`=1;
+SELECT skill,
+       SUM(jobs) AS demand,
+       SUM(salary_sum) / SUM(salary_jobs) AS avg_salary,
+       MIN(min_salary) AS min_salary
+FROM skill_rollup
+GROUP BY skill;
+
+CREATE OR REPLACE VIEW skill_demand_by_segment AS
+SELECT skill, experience_level, location_clean, jobs, avg_salary, min_salary
+FROM skill_rollup;
 
 SELECT
 ROUND(AVG(salary_lpa_min),2) AS avg_salary
@@ -90,15 +82,9 @@ ROUND(SUM(Python)/COUNT(*)*100,1) AS python_demand,
 ROUND(SUM(Excel)/COUNT(*)*100,1) AS excel_demand
 FROM job_analytics;
 
-SELECT 'SQL' AS skill, SUM(`SQL`) AS demand FROM job_analytics
-UNION ALL
-SELECT 'Python', SUM(Python) FROM job_analytics
-UNION ALL
-SELECT 'Excel', SUM(Excel) FROM job_analytics
-UNION ALL
-SELECT 'Power BI', SUM(`Power BI`) FROM job_analytics
-UNION ALL
-SELECT 'Tableau', SUM(Tableau) FROM job_analytics
+SELECT skill, demand
+FROM skill_salary
+WHERE skill IN ('SQL', 'Python', 'Excel', 'Power BI', 'Tableau')
 ORDER BY demand DESC;
 
 SELECT
@@ -115,23 +101,10 @@ FROM job_analytics
 GROUP BY experience_level;
 
 SELECT
-'SQL' AS skill,
-ROUND(AVG(salary_lpa_min),2) AS avg_salary
-FROM job_analytics WHERE `SQL` = 1
-
-UNION ALL
-
-SELECT
-'Python',
-ROUND(AVG(salary_lpa_min),2)
-FROM job_analytics WHERE Python = 1
-
-UNION ALL
-
-SELECT
-'Power BI',
-ROUND(AVG(salary_lpa_min),2)
-FROM job_analytics WHERE `Power BI` = 1;
+skill,
+ROUND(avg_salary,2) AS avg_salary
+FROM skill_salary
+WHERE skill IN ('SQL', 'Python', 'Power BI');
 
 SELECT
 core_tools_score,
@@ -152,3 +125,13 @@ COUNT(*) AS jobs
 FROM job_analytics
 GROUP BY combo_score
 ORDER BY combo_score DESC;
+
+-- senior skill demand per city, straight from the rollup
+SELECT
+skill,
+location_clean,
+jobs,
+avg_salary
+FROM skill_demand_by_segment
+WHERE experience_level = 'Senior'
+ORDER BY jobs DESC;
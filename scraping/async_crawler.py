@@ -0,0 +1,159 @@
+"""
+Concurrent search-results crawler.
+
+Every (role, city) pair is crawled as its own asyncio task, requesting
+PAGE_WINDOW result pages ahead at a time and stopping the city at the first
+page without job cards. A throttled page (429 or block page) pauses its host
+and is retried; a page that still fails is skipped, not taken as the end of
+the results. Requests to a host share a token-bucket rate limit
+and at most SEARCH_SESSIONS of them run at once, so adding cities or roles
+fills idle time instead of adding it.
+
+Two backends fetch a page and return its cards:
+  - "selenium": a DriverPool of Chrome sessions driven from worker threads
+  - "http": plain HTTP requests, cards parsed from the page HTML
+"""
+import argparse
+import asyncio
+from urllib.parse import urlsplit
+
+from config import (
+    ROLES, CITIES, MAX_PAGES, BASE_URL, HOST_RATE, HOST_BURST, SEARCH_SESSIONS, PAGE_WINDOW, THROTTLE_RETRIES,
+)
+from driver_pool import DriverPool, get_driver
+from http_fetcher import check_response, make_session
+from page_parser import parse_search_cards
+from rate_limiter import AsyncHostRateLimiter, Throttled
+from search_naukri import build_search_url, search_page_cards, finalize_results
+from storage import save_dataset
+from waits import WAITS
+
+
+# ---------------- BACKENDS ---------------- #
+
+class HttpSearchBackend:
+
+    def __init__(self, sessions=SEARCH_SESSIONS):
+        self.session = make_session(pool_size=sessions)
+
+    def _fetch(self, url, city, page):
+        response = self.session.get(url, timeout=20)
+        check_response(response)
+        return parse_search_cards(response.text, url, city, page)
+
+    async def fetch_cards(self, url, city, page):
+        return await asyncio.to_thread(self._fetch, url, city, page)
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumSearchBackend:
+    """`sessions` pre-warmed Chrome sessions, each used by one page at a time."""
+
+    def __init__(self, sessions=SEARCH_SESSIONS, driver_factory=get_driver):
+        self.pool = DriverPool(sessions, driver_factory=driver_factory)
+
+    async def fetch_cards(self, url, city, page):
+        return await asyncio.to_thread(self.pool.run, search_page_cards, url, city, page)
+
+    def close(self):
+        print(f"✅ {self.pool.summary()}")
+        print(WAITS.summary())
+        self.pool.close()
+
+
+# ---------------- CRAWLER ---------------- #
+
+class SearchCrawler:
+
+    def __init__(self, backend, roles=ROLES, cities=CITIES, max_pages=MAX_PAGES, base_url=BASE_URL,
+                 rate=HOST_RATE, burst=HOST_BURST, per_host=SEARCH_SESSIONS, page_window=PAGE_WINDOW):
+        self.backend = backend
+        self.roles = roles
+        self.cities = cities
+        self.max_pages = max_pages
+        self.base_url = base_url
+        self.page_window = max(1, page_window)
+        self.per_host = per_host
+        self.rate_limiter = AsyncHostRateLimiter(rate, burst)
+        self._slots = {}
+
+    async def fetch_page(self, role, city, page, retries=THROTTLE_RETRIES):
+        """Cards of one results page, or None if it failed (which does not end the city)."""
+        url = build_search_url(role, city, page, base=self.base_url)
+        host = urlsplit(url).netloc
+        slots = self._slots.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        async with slots:
+            for attempt in range(retries + 1):
+                await self.rate_limiter.acquire(url)
+                print(f"Scraping: {url}")
+                try:
+                    return await self.backend.fetch_cards(url, city, page)
+                except Throttled as e:
+                    # the next acquire waits out the host's pause
+                    self.rate_limiter.record(url, e.outcome, retry_after=e.retry_after)
+                    error = e
+                except Exception as e:
+                    error = e
+                    break
+            print(f"❌ Failed for {url}: {error}")
+            return None
+
+    async def crawl_city(self, role, city):
+        """Cards of one (role, city), paging until a page comes back empty."""
+        results = []
+        page = 1
+
+        while page <= self.max_pages:
+            window = range(page, min(page + self.page_window, self.max_pages + 1))
+            pages = await asyncio.gather(*(self.fetch_page(role, city, p) for p in window))
+
+            for cards in pages:
+                if cards is None:
+                    continue
+                if not cards:
+                    print(f"No job cards found for {role} in {city}, stopping pagination.")
+                    return results
+                results.extend(cards)
+
+            page += self.page_window
+
+        return results
+
+    async def crawl(self):
+        tasks = [self.crawl_city(role, city) for role in self.roles for city in self.cities]
+        per_city = await asyncio.gather(*tasks)
+        return [card for cards in per_city for card in cards]
+
+
+def scrape_search_results_async(backend="selenium", **kwargs):
+    """Crawl every role × city concurrently and return the job_urls DataFrame."""
+    sessions = kwargs.get("per_host", SEARCH_SESSIONS)
+    if backend == "http":
+        search_backend = HttpSearchBackend(sessions)
+    elif backend == "selenium":
+        search_backend = SeleniumSearchBackend(sessions)
+    else:
+        raise ValueError(f"Unknown search backend: {backend}")
+
+    try:
+        results = asyncio.run(SearchCrawler(search_backend, **kwargs).crawl())
+    finally:
+        search_backend.close()
+
+    return finalize_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl Naukri search results concurrently")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--sessions", type=int, default=SEARCH_SESSIONS, help="concurrent pages per host")
+    parser.add_argument("--base-url", default=BASE_URL)
+    args = parser.parse_args()
+
+    df = scrape_search_results_async(args.backend, per_host=args.sessions, base_url=args.base_url)
+
+    save_dataset(df, "job_urls")
+    print(f"Saved {len(df)} clean job URLs")
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: per-card vs batch extraction of search result cards.
+
+    python scraping/benchmark_cards.py --repeat 5
+
+Loads a fixture results page in Chrome and extracts its cards with
+extract_cards (one WebDriver call per field) and extract_cards_batch (one
+execute_script call), reporting WebDriver round-trips and time per page.
+Both must produce the same rows.
+"""
+import argparse
+import time
+
+import pandas as pd
+from selenium.webdriver.common.by import By
+
+from driver_pool import get_driver
+from fixture_server import serve_fixtures
+from search_naukri import (
+    CARD_SELECTORS, build_search_url, load_search_page, extract_cards, extract_cards_batch,
+)
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted."""
+    calls = {"n": 0}
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        calls["n"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return calls
+
+
+def run(repeat):
+    server, base_url = serve_fixtures()
+    driver = get_driver()
+    calls = count_round_trips(driver)
+    results = []
+
+    try:
+        url = build_search_url("data analyst", "Hyderabad", 1, base=base_url)
+        job_cards = load_search_page(driver, url)
+
+        extractors = {
+            "per_card": lambda: extract_cards(driver.find_elements(By.CSS_SELECTOR, CARD_SELECTORS), "Hyderabad", 1),
+            "batch": lambda: extract_cards_batch(driver, "Hyderabad", 1),
+        }
+        rows = {}
+        for name, extract in extractors.items():
+            calls["n"] = 0
+            start = time.perf_counter()
+            for _ in range(repeat):
+                rows[name] = extract()
+            elapsed = time.perf_counter() - start
+            results.append({
+                "extractor": name,
+                "cards": len(rows[name]),
+                "round_trips_per_page": calls["n"] / repeat,
+                "ms_per_page": round(elapsed / repeat * 1000, 2),
+            })
+
+        same = rows["per_card"] == rows["batch"]
+        print(f"{len(job_cards)} cards on page, identical rows: {same}")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-card and batch card extraction")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(run(args.repeat).to_string(index=False))
@@ -0,0 +1,90 @@
+"""
+Benchmark: crawl throughput of the frontier against the number of workers.
+
+    python scraping/benchmark_frontier.py --roles 8 --workers 1 2 4 8
+
+Every run seeds a fresh frontier with `--roles` roles x 3 cities against the
+fixture server (3 results pages per city, each page taking `--latency`
+seconds to answer) and crawls it to the end over plain HTTP with that many
+worker processes. Runs are repeated with the per-host cap at `--cap-rpm`,
+where throughput should level off at the cap instead of growing with the
+workers. "requests" counts what the server answered: with no URL fetched
+twice it equals the number of tasks.
+"""
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from fixture_server import serve_fixtures
+from frontier import Frontier, run_worker
+
+CITIES = ["Hyderabad", "Bengaluru", "Mumbai"]
+
+
+def no_browser():
+    raise RuntimeError("no browser in the benchmark: job pages without an embedded payload fail")
+
+
+def work(frontier, name, cap_rpm):
+    run_worker(frontier, owner=name, fetcher="http", search_backend="http", politeness="fixed",
+               rate=1000, burst=1000, cap_rpm=cap_rpm, poll=0.1, driver_factory=no_browser)
+
+
+def crawl(base_url, roles, workers, cap_rpm, shards):
+    directory = tempfile.mkdtemp(prefix="frontier_")
+    try:
+        frontier = Frontier(directory, shards, max_attempts=1)
+        frontier.seed([f"role {i}" for i in range(roles)], CITIES, base=base_url)
+
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=work, args=(frontier, f"worker-{i}", cap_rpm))
+                     for i in range(workers)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        seconds = time.perf_counter() - start
+        return sum(frontier.counts().values()), seconds
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run(roles, worker_counts, latency, cap_rpm, shards):
+    results = []
+    for cap in (1e9, cap_rpm):
+        for workers in worker_counts:
+            server, base_url = serve_fixtures(throttle=(10**9, 60), latency=latency)
+            try:
+                tasks, seconds = crawl(base_url, roles, workers, cap, shards)
+            finally:
+                server.shutdown()
+            results.append({
+                "cap_rpm": "none" if cap == 1e9 else cap,
+                "workers": workers,
+                "tasks": tasks,
+                "requests": server.throttle.counts["ok"],
+                "seconds": round(seconds, 1),
+                "tasks_per_s": round(tasks / seconds, 2),
+            })
+
+    df = pd.DataFrame(results)
+    single = df.groupby("cap_rpm")["tasks_per_s"].transform("first")
+    df["speedup"] = (df["tasks_per_s"] / single).round(2)
+    df["efficiency"] = (df["speedup"] / df["workers"]).round(2)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frontier throughput against the number of workers")
+    parser.add_argument("--roles", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the server takes per page")
+    parser.add_argument("--cap-rpm", type=float, default=600, help="per-host cap of the capped runs")
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    print(run(args.roles, args.workers, args.latency, args.cap_rpm, args.shards).to_string(index=False))
@@ -0,0 +1,79 @@
+"""
+Benchmark: "full" vs "lean" page load profile.
+
+    python scraping/benchmark_load_profile.py --detail-pages 6
+
+Serves the fixtures with assets (photos, a web font, a video, an ad iframe
+and a tracker script from a "third-party" host) and loads the same search
+and job detail pages with both profiles. Reports bytes received, requests
+made and blocked, DOMContentLoaded and driver.get time per page, and checks
+that both profiles extract the same cards and job records.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from config import BLOCKED_URLS
+from driver_pool import get_driver, page_metrics
+from fixture_server import THIRD_PARTY_PATTERN, fixture_urls, serve_fixtures
+from page_parser import parse_job_page
+from search_naukri import build_search_url, extract_cards_batch
+
+
+def load_pages(profile, pages):
+    """(per-page metrics, extracted rows) for every (kind, url, city, page) in pages."""
+    # the fixture server's "third-party" host stands in for ad and tracker domains
+    driver = get_driver(profile=profile, metrics=True, blocked_urls=BLOCKED_URLS + [THIRD_PARTY_PATTERN])
+    metrics, rows = [], []
+    try:
+        page_metrics(driver)  # drop the events of browser startup
+        for kind, url, city, page in pages:
+            start = time.perf_counter()
+            driver.get(url)
+            get_seconds = time.perf_counter() - start
+
+            if kind == "search":
+                rows.append(extract_cards_batch(driver, city, page))
+            else:
+                rows.append(parse_job_page(driver.page_source, url))
+            metrics.append({**page_metrics(driver), "get_ms": get_seconds * 1000})
+    finally:
+        driver.quit()
+    return metrics, rows
+
+
+def run(search_pages, detail_pages):
+    server, base_url = serve_fixtures(assets=True)
+    pages = [("search", build_search_url("data analyst", "Mumbai", p, base=base_url), "Mumbai", p)
+             for p in range(1, search_pages + 1)]
+    pages += [("detail", url, None, None) for url in fixture_urls(base_url, detail_pages)]
+
+    results, rows = [], {}
+    try:
+        for profile in ("full", "lean"):
+            metrics, rows[profile] = load_pages(profile, pages)
+            m = pd.DataFrame(metrics)
+            results.append({
+                "profile": profile,
+                "pages": len(m),
+                "kb_per_page": round(m["bytes"].mean() / 1024, 1),
+                "requests_per_page": round(m["requests"].mean(), 1),
+                "blocked_per_page": round(m["blocked"].mean(), 1),
+                "dom_content_loaded_ms": round(m["dom_content_loaded_ms"].mean(), 1),
+                "get_ms": round(m["get_ms"].mean(), 1),
+            })
+    finally:
+        server.shutdown()
+
+    print(f"identical extraction on all {len(pages)} pages: {rows['full'] == rows['lean']}")
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the full and lean page load profiles")
+    parser.add_argument("--search-pages", type=int, default=3)
+    parser.add_argument("--detail-pages", type=int, default=6)
+    args = parser.parse_args()
+
+    print(run(args.search_pages, args.detail_pages).to_string(index=False))
@@ -0,0 +1,99 @@
+"""
+Benchmark: fixed delays vs the adaptive politeness scheduler against a
+server that throttles.
+
+    python scraping/benchmark_politeness.py --pages 120 --scale 0.1
+
+The fixture server allows `--limit` requests per minute, answers 429s with
+Retry-After beyond that and block pages beyond twice that. Every schedule
+fetches the same job pages over HTTP with `--workers` threads:
+  - fixed:      HOST_RATE, the mean of DELAY_RANGE (the old human_delay pace)
+  - fixed_fast: a fixed rate above the server's limit
+  - adaptive:   AdaptiveRateLimiter with the configured AIMD settings
+All times (delays, the server's window, latency) are multiplied by `--scale`
+so the run takes minutes (Retry-After is sent in whole seconds, so the scale
+should keep the server's window several seconds long); results are reported
+in unscaled time.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from config import HOST_RATE, START_DELAY, MIN_DELAY, MAX_DELAY, DELAY_STEP, COOLDOWN, MAX_RPM
+from fixture_server import fixture_urls, serve_fixtures
+from http_fetcher import check_response, make_session
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter, Throttled
+
+
+def schedules(scale, fast_rpm):
+    return {
+        "fixed": lambda: HostRateLimiter(HOST_RATE / scale),
+        "fixed_fast": lambda: HostRateLimiter(fast_rpm / 60 / scale),
+        "adaptive": lambda: AdaptiveRateLimiter(
+            start_delay=START_DELAY * scale, min_delay=MIN_DELAY * scale, max_delay=MAX_DELAY * scale,
+            step=DELAY_STEP * scale, cooldown=COOLDOWN * scale, max_rpm=MAX_RPM / scale, log_every=1e9,
+        ),
+    }
+
+
+def crawl(rate_limiter, urls, workers):
+    """(pages fetched, pages failed) fetching every URL through the scheduler."""
+    session = make_session(pool_size=workers)
+
+    def get(url):
+        response = session.get(url, timeout=20)
+        check_response(response)
+        return response.text
+
+    def fetch(url):
+        try:
+            rate_limiter.request(url, get, url)
+            return True
+        except Throttled:
+            return False
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = sum(executor.map(fetch, urls))
+    finally:
+        session.close()
+    return fetched, len(urls) - fetched
+
+
+def run(pages, workers, limit, scale, fast_rpm):
+    results = []
+    for name, make in schedules(scale, fast_rpm).items():
+        # a fresh server per schedule, so no run inherits another's throttling
+        server, base_url = serve_fixtures(throttle=(limit, 60 * scale), latency=0.5 * scale)
+        try:
+            start = time.perf_counter()
+            fetched, failed = crawl(make(), fixture_urls(base_url, pages), workers)
+            minutes = (time.perf_counter() - start) / scale / 60
+        finally:
+            server.shutdown()
+
+        served = server.throttle.counts
+        results.append({
+            "schedule": name,
+            "fetched": fetched,
+            "failed": failed,
+            "minutes": round(minutes, 1),
+            "pages_per_min": round(fetched / minutes, 1),
+            "429s": served["throttled"],
+            "block_pages": served["blocked"],
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare fixed and adaptive politeness against a throttling server")
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=20, help="requests per minute the server allows")
+    parser.add_argument("--fast-rpm", type=float, default=60, help="rate of the fixed_fast schedule")
+    parser.add_argument("--scale", type=float, default=0.1, help="time scale of the simulation")
+    args = parser.parse_args()
+
+    print(run(args.pages, args.workers, args.limit, args.scale, args.fast_rpm).to_string(index=False))
@@ -0,0 +1,304 @@
+"""
+Benchmark and fuzz check: text_parsing.py against the per-call regex code it replaced.
+
+    python scraping/benchmark_text_parsing.py --texts 100000 --fuzz 20000
+
+The previous implementations are kept below (legacy_*) as the reference.
+The fuzz check runs both on random texts built from metadata keywords,
+"Key Skills" markers, salary/experience strings, punctuation-only lines and
+characters whose lowercase form is longer (İ) or ambiguous (ẞ), and reports
+every text where the outputs differ. The salary and experience minimums of
+every line are also checked against the old cleaner.
+
+The benchmark times both on a corpus of body texts built from the real job
+descriptions and fixture pages.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import lxml.html
+import pandas as pd
+
+from fixture_server import FIXTURE_DIR, job_detail_fixtures
+from page_parser import (
+    JD_METADATA_KEYWORDS, JD_NAVIGATION_LINES, clean_company_text, job_description_from_body,
+    parse_job_metadata, salary_from_body, salary_from_candidates, visible_text,
+)
+from text_parsing import experience_range, salary_range
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "analysis"))
+from data_cleaning import SKILL_ALIASES, SKILL_JUNK, clean_skill_list
+
+
+# ---------------- LEGACY ---------------- #
+
+def legacy_clean_company_text(text):
+    if text and len(text) < 100:
+        company = text.split('\n')[0].strip()
+        company = re.sub(r'\d+\.\d+\s*\d+\s*Reviews|Reviews|Employees.*choice', '', company).strip()
+        if company and len(company) > 1:
+            return company
+    return None
+
+
+def legacy_salary_from_candidates(candidates):
+    for c in candidates:
+        if not c:
+            continue
+        for part in [p.strip() for p in str(c).splitlines() if p.strip()]:
+            low = part.lower()
+            if any(k in low for k in ('lacs', 'lakhs', 'lpa', '₹')):
+                if 'year' in low or 'yrs' in low:
+                    continue
+                return part
+            m = re.search(r'\d+\s*[-–]\s*\d+\s*(?:lacs|lakhs|lpa)', low, re.I)
+            if m:
+                return m.group().strip()
+    return None
+
+
+def legacy_salary_from_body(body):
+    matches = re.findall(r'(?:₹\s*[\d.,\-]+\s*(?:Lacs|Lakhs|LPA|P\.A\.)?|\d+\s*[-–]\s*\d+\s*(?:Lacs|Lakhs|LPA))', body, re.I)
+    for s in matches:
+        if 'year' in s.lower():
+            continue
+        return s.strip()
+    return None
+
+
+def legacy_job_description_from_body(body_text):
+    if not body_text:
+        return None
+
+    key_skills_lower = body_text.lower().find('key skills')
+    preferred_keyskills_lower = body_text.lower().find('preferred keyskills')
+
+    cutoff = None
+    if key_skills_lower >= 0 and preferred_keyskills_lower >= 0:
+        cutoff = min(key_skills_lower, preferred_keyskills_lower)
+    elif key_skills_lower >= 0:
+        cutoff = key_skills_lower
+    elif preferred_keyskills_lower >= 0:
+        cutoff = preferred_keyskills_lower
+
+    text_before_skills = body_text[:cutoff] if cutoff is not None else body_text
+    lines = [line.strip() for line in text_before_skills.split('\n') if line.strip()]
+
+    description_lines = []
+    for line in lines:
+        line_lower = line.lower()
+        if any(keyword in line_lower for keyword in JD_METADATA_KEYWORDS):
+            continue
+        if len(line) < 20:
+            continue
+        if not any(c.isalnum() for c in line):
+            continue
+        if line_lower in JD_NAVIGATION_LINES:
+            continue
+        description_lines.append(line)
+
+    jd = " ".join(" ".join(description_lines).strip().split())
+    return jd if len(jd) > 150 else None
+
+
+def legacy_parse_job_metadata(text):
+    data = dict.fromkeys(["company", "location", "experience", "salary", "posted_time", "applicants"])
+    if not text:
+        return data
+
+    comp = re.search(r'Company\s*:\s*(.+)', text)
+    if comp:
+        data["company"] = comp.group(1).strip()
+    exp = re.search(r'(\d+\s*-\s*\d+\s*years|\d+\+\s*years)', text, re.I)
+    data["experience"] = exp.group() if exp else None
+    loc = re.search(r'\b(Hyderabad|Bengaluru|Bangalore|Chennai|Mumbai|Pune|Delhi|Gurgaon|Noida|Remote|Hybrid)\b',
+                    text, re.I)
+    if loc:
+        data["location"] = loc.group()
+    sal = re.search(r'₹\s*[\d.,]+\s*(Lacs|Lakhs|LPA)?|Not Disclosed', text, re.I)
+    if sal:
+        data["salary"] = sal.group()
+    post = re.search(r'Posted\s*:\s*([^\n|]+)', text, re.I)
+    if post:
+        data["posted_time"] = post.group(1).strip()
+    app = re.search(r'Applicants\s*:\s*(\d+\+?)', text, re.I)
+    if app:
+        data["applicants"] = app.group(1)
+    return data
+
+
+def legacy_extract_salary(sal):
+    sal = str(sal).lower()
+    if 'not disclosed' in sal:
+        return None
+    for part in sal.split('\n'):
+        part = part.strip()
+        if 'years' in part and 'lacs' not in part and 'lpa' not in part:
+            continue
+        match = re.search(r'(\d+)(?:\s*[-–]\s*\d+)?\s*(?:lacs?|lakhs?|lpa)', part)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def legacy_extract_experience(exp):
+    match = re.search(r"(\d+)", exp)
+    return int(match.group(1)) if match else None
+
+
+def legacy_clean_skill_list(skill_text):
+    cleaned = []
+    for p in re.split(r"[,\n]+", str(skill_text).lower()):
+        p = p.strip()
+        if not p or re.search(r"\d", p) or "review" in p or any(b in p for b in SKILL_JUNK):
+            continue
+        p = SKILL_ALIASES.get(p, p)
+        if len(p) >= 2:
+            cleaned.append(p)
+    return sorted(set(cleaned))
+
+
+# ---------------- TEXTS ---------------- #
+
+SALARIES = [
+    "3-6 Lacs P.A.", "Avg. salary - 14.7 LPA", "₹ 4,50,000 - 6,00,000 P.A.", "Not Disclosed",
+    "12 lakhs", "5 – 8 LPA", "₹25,000 per month", "Salary Upto 10lpa", "2-5 years", "₹ 3.5 Lacs",
+]
+EXPERIENCES = ["2 - 5 years", "5+ years", "1 to 3 Yrs", "Fresher", "10-15 years", "3 years"]
+META = [
+    "Role: Data Analyst", "Industry Type: IT Services", "Posted: 3 days ago", "Applicants: 100+",
+    "Company: Acme Analytics", "Employment Type: Full Time", "Education", "Reviews", "Share",
+    "Location: Hyderabad", "Work mode: Hybrid", "Key Skills", "Preferred Keyskills", "KEY SKILLS",
+]
+ODD = ["İ", "ı", "ſ", "K", "ẞ", "ß", "é", "₹", "–", "\xa0", "---", "***", "", "  ", "_", "²", "٣"]
+
+
+def _casing(text, rng):
+    return rng.choice([text, text.lower(), text.upper(), text.title()])
+
+
+def fuzz_text(rng, words):
+    lines = []
+    for _ in range(rng.randint(1, 25)):
+        kind = rng.random()
+        if kind < 0.35:
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(1, 30)))
+        elif kind < 0.55:
+            line = _casing(rng.choice(META), rng)
+        elif kind < 0.7:
+            line = rng.choice(SALARIES)
+        elif kind < 0.8:
+            line = rng.choice(EXPERIENCES)
+        else:
+            line = "".join(rng.choice(ODD + words[:50]) for _ in range(rng.randint(1, 12)))
+        if rng.random() < 0.2:
+            line = rng.choice(ODD) + line + rng.choice(ODD)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def body_corpus(n, descriptions, rng):
+    """n page body texts: fixture bodies and real descriptions framed by metadata lines."""
+    fixtures = []
+    for name in job_detail_fixtures():
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures.append(visible_text(lxml.html.document_fromstring(f.read()).body))
+
+    texts = []
+    for _ in range(n):
+        if rng.random() < 0.2:
+            texts.append(rng.choice(fixtures))
+            continue
+        head = [rng.choice(META) for _ in range(6)] + [rng.choice(SALARIES), rng.choice(EXPERIENCES)]
+        sentences = rng.choice(descriptions).split(". ")
+        tail = ["Key Skills", "SQL, Python, Excel", "Home", "About us", "Privacy Policy"]
+        texts.append("\n".join(head + sentences + tail))
+    return texts
+
+
+# ---------------- CHECKS ---------------- #
+
+PAIRS = {
+    "job_description_from_body": (legacy_job_description_from_body, job_description_from_body),
+    "parse_job_metadata": (legacy_parse_job_metadata, parse_job_metadata),
+    "salary_from_body": (legacy_salary_from_body, salary_from_body),
+    "salary_from_candidates": (lambda t: legacy_salary_from_candidates([t]), lambda t: salary_from_candidates([t])),
+    "clean_company_text": (legacy_clean_company_text, clean_company_text),
+    "clean_skill_list": (legacy_clean_skill_list, clean_skill_list),
+}
+
+
+def range_problems(text):
+    """Lines where the salary or experience minimum disagrees with the old cleaner."""
+    problems = []
+    for line in text.split("\n"):
+        old = legacy_extract_salary(line)
+        # the old pattern read "14.7 LPA" as 7: only whole numbers are comparable
+        if old is not None and "." not in line and salary_range(line)[0] != old:
+            problems.append(f"salary min {salary_range(line)[0]} != {old}: {line!r}")
+        if experience_range(line)[0] != legacy_extract_experience(line):
+            problems.append(f"experience min changed: {line!r}")
+    return problems
+
+
+def fuzz(n, words, seed=1):
+    rng = random.Random(seed)
+    mismatches = {name: 0 for name in PAIRS}
+    problems = []
+    for _ in range(n):
+        text = fuzz_text(rng, words)
+        for name, (legacy, current) in PAIRS.items():
+            if legacy(text) != current(text):
+                mismatches[name] += 1
+                if mismatches[name] <= 3:
+                    print(f"❌ {name} differs on {text!r}")
+        problems.extend(range_problems(text))
+
+    for name, count in mismatches.items():
+        print(f"{'✅' if not count else '❌'} {name}: {count} of {n} texts differ")
+    print(f"{'✅' if not problems else '❌'} salary/experience ranges: {len(problems)} problems")
+    for problem in problems[:5]:
+        print("   ", problem)
+
+
+def timed(func, texts):
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return time.perf_counter() - start
+
+
+def benchmark(texts):
+    salaries = [line for text in texts[:20000] for line in text.split("\n")[:8]]
+    runs = {
+        "job_description_from_body": (texts, *PAIRS["job_description_from_body"]),
+        "parse_job_metadata": (texts, *PAIRS["parse_job_metadata"]),
+        "salary_from_body": (texts, *PAIRS["salary_from_body"]),
+        "salary (cleaner)": (salaries, legacy_extract_salary, salary_range),
+        "experience (cleaner)": (salaries, legacy_extract_experience, experience_range),
+    }
+    rows = []
+    for name, (corpus, legacy, current) in runs.items():
+        old, new = timed(legacy, corpus), timed(current, corpus)
+        rows.append({"function": name, "texts": len(corpus), "legacy_s": round(old, 2),
+                     "shared_s": round(new, 2), "speedup": round(old / new, 2)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuzz check and benchmark the shared text parsing module")
+    parser.add_argument("--texts", type=int, default=100_000, help="body texts in the benchmark corpus")
+    parser.add_argument("--fuzz", type=int, default=20_000, help="random texts in the consistency check")
+    parser.add_argument("--source", default="data/processed/job_details_cleaned.csv")
+    args = parser.parse_args()
+
+    descriptions = pd.read_csv(args.source)["job_description"].dropna().tolist()
+    words = sorted({w for d in descriptions for w in d.split()})
+
+    fuzz(args.fuzz, words)
+    print()
+    print(benchmark(body_corpus(args.texts, descriptions, random.Random(0))).to_string(index=False))
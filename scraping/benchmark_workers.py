@@ -0,0 +1,54 @@
+"""
+Benchmark the detail-scraping worker pool against the local fixture server.
+
+    python scraping/benchmark_workers.py --pages 40 --mode thread
+
+Reports pages/minute (and pages per fetch path) for 1, 2, 4 and 8 workers.
+Politeness is a fixed per-host rate, set high by default so the numbers
+show the pool itself, not the politeness cap (--politeness adaptive times
+the AIMD scheduler instead, which ignores --rate). --fetcher http exercises the browserless path;
+fixture pages without an embedded payload go to the Selenium fallback.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from fixture_server import serve_fixtures, fixture_urls
+from job_details_scraper import scrape_job_details
+
+
+def run(pages, mode, fetcher, rate, politeness="fixed", worker_counts=(1, 2, 4, 8)):
+    server, base_url = serve_fixtures()
+    urls_df = pd.DataFrame({"job_url": fixture_urls(base_url, pages), "company": None})
+
+    results = []
+    try:
+        for workers in worker_counts:
+            start = time.perf_counter()
+            df = scrape_job_details(urls_df, workers=workers, mode=mode, fetcher=fetcher,
+                                    rate=rate, burst=workers, politeness=politeness)
+            elapsed = time.perf_counter() - start
+            results.append({
+                "workers": workers,
+                "pages": len(df),
+                **df.attrs["fetch_paths"],
+                "seconds": round(elapsed, 2),
+                "pages_per_minute": round(len(df) / elapsed * 60, 1),
+            })
+    finally:
+        server.shutdown()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the detail scraper worker pool")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--fetcher", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--rate", type=float, default=1000.0, help="requests/second allowed per host")
+    parser.add_argument("--politeness", choices=["adaptive", "fixed"], default="fixed")
+    args = parser.parse_args()
+
+    print(run(args.pages, args.mode, args.fetcher, args.rate, args.politeness).to_string(index=False))
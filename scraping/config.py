@@ -5,3 +5,104 @@ DELAY_RANGE = (4, 8) # Delay range between requests in seconds
 # Recommended delay range: (5, 10) seconds for ethical web scraping and to avoid being blocked
 
 BASE_URL = "https://www.naukri.com"
+
+# Detail scraping worker pool
+WORKERS = 1              # number of parallel browser sessions
+POOL_MODE = "thread"     # "thread" or "process"
+HOST_RATE = 2 / sum(DELAY_RANGE)  # requests per second per host (mean of DELAY_RANGE)
+HOST_BURST = 1
+FETCHER = "selenium"     # "selenium" or "http" (browserless, Selenium fallback)
+
+# Politeness scheduler (rate_limiter.py)
+POLITENESS = "adaptive"  # "adaptive" (AIMD on latency and throttling) or "fixed" (HOST_RATE per host)
+START_DELAY = sum(DELAY_RANGE) / 2  # seconds between requests to a host before any feedback
+MIN_DELAY = 1.0          # the floor a healthy host is sped up to
+MAX_DELAY = 120.0        # the ceiling repeated backoff stops at
+DELAY_STEP = 0.5         # seconds taken off the delay per healthy response (additive)
+BACKOFF = 2.0            # delay multiplier on a 429 or block page (multiplicative)
+LATENCY_FACTOR = 1.0     # the delay never drops below this many smoothed response times
+COOLDOWN = 60            # seconds a host is paused after a 429 or block page without Retry-After
+MAX_RPM = 30             # requests per minute over all hosts
+JITTER = 0.2             # random ±20% on every delay
+RATE_LOG_EVERY = 60      # seconds between effective rate log lines
+THROTTLE_RETRIES = 2     # a throttled request is retried this many times after backing off
+
+# Page waits (waits.py): each returns as soon as its condition holds
+WAIT_POLL = 0.05         # seconds between checks of a wait condition
+CARDS_TIMEOUT = 10       # search results: job cards or the "no jobs found" block
+DETAIL_HEADER_TIMEOUT = 3  # job page: the <h1> header
+JD_EXPAND_TIMEOUT = 1.5  # job description: text grown (or "read more" gone) after the click
+
+# Per-page profiling (metrics.py)
+METRICS_LOG = "data/metrics/job_details.jsonl"  # one JSON record per fetched page
+METRICS_MEMORY_EVERY = 10  # sample the browser's memory on every Nth page of a worker
+METRICS_WINDOW = 10000   # pages kept for the p50/p95 of the summary and the endpoint
+
+# Resumable detail scraping (URL state store)
+STATE_DB = "data/state/job_details_state.sqlite"
+FRESH_DAYS = 7           # re-fetch a done URL once its record is older than this
+CHECKPOINT_EVERY = 25    # commit state after this many records per worker
+MAX_ATTEMPTS = 5         # give up on a URL after this many failures
+RETRY_BACKOFF = 300      # seconds before the first retry, doubled per failure
+
+# Async search crawler
+ROLES = [ROLE]           # every role is crawled in every city
+SEARCH_SESSIONS = 3      # concurrent search pages per host
+PAGE_WINDOW = 2          # result pages of one city requested ahead at a time
+
+# Crawl frontier (frontier.py): the roles x cities space shared by any number of workers
+FRONTIER_DIR = "data/state/frontier"
+FRONTIER_SHARDS = 8      # SQLite files the tasks are spread over by URL hash
+LEASE_SECONDS = 300      # a leased task not completed within this long is handed out again
+LEASE_BATCH = 1          # tasks a worker leases at a time
+FRONTIER_POLL = 2        # seconds an idle worker waits before asking for tasks again
+HOST_CAP_RPM = 30        # requests per minute to one host over all workers together
+SEARCH_FRESH_HOURS = 12  # a done results page is crawled again when re-queued after this long
+FRONTIER_ROLES = [
+    "data analyst", "data scientist", "data engineer", "business analyst",
+    "business intelligence analyst", "analytics engineer", "machine learning engineer", "ai engineer",
+    "product analyst", "marketing analyst", "financial analyst", "risk analyst",
+    "operations analyst", "reporting analyst", "research analyst", "quantitative analyst",
+    "statistician", "mis executive", "power bi developer", "tableau developer",
+    "sql developer", "etl developer", "big data engineer", "database administrator",
+]
+METRO_CITIES = [
+    "Hyderabad", "Bengaluru", "Mumbai", "Delhi", "Gurugram", "Noida", "Chennai", "Pune",
+    "Kolkata", "Ahmedabad", "Jaipur", "Chandigarh", "Kochi", "Coimbatore", "Indore",
+]
+
+# Dataset storage (every stage reads and writes through storage.py)
+STORAGE = "csv"          # "csv", "parquet" or "arrow" (Arrow IPC / Feather)
+DATASETS = {
+    "job_urls": "data/raw/job_urls",
+    "job_details": "data/processed/job_details",
+    "job_details_cleaned": "data/processed/job_details_cleaned",
+}
+
+# Streaming pipeline (run_scraper.py)
+SEARCH_BACKEND = "selenium"  # "selenium" or "http" for search result pages
+QUEUE_SIZE = 50          # items buffered between two stages before the upstream one waits
+CLEAN_BATCH = 25         # records cleaned and loaded together
+CLEAN_BATCH_SECONDS = 30 # a partial batch is flushed after this long
+DB_BACKEND = "mysql"     # "mysql" or "sqlite" (see database/insert_mysql.py)
+
+# Browser sessions (driver_pool.py)
+HEADLESS = True          # pooled Chrome sessions run without a window
+PAGES_PER_SESSION = 50   # a browser is restarted after this many pages to cap its memory
+DRIVER_CACHE = "data/state/chromedriver_path"  # resolved chromedriver path, reused offline
+LOAD_PROFILE = "lean"    # "lean": headless, eager page loads, no images/fonts/media/ads; "full": everything
+BLOCKED_URLS = [         # URL patterns the lean profile never requests
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagservices.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*adservice.google.*", "*facebook.net*", "*amazon-adsystem.com*",
+    "*hotjar.com*", "*clarity.ms*", "*taboola.com*", "*outbrain.com*",
+]
+PAGE_METRICS = False     # record bytes received and DOMContentLoaded time of every page
+
+# Raw page cache (page_cache.py)
+PAGE_CACHE = "data/cache/pages.sqlite"
+CACHE_TTL_DAYS = 30      # cached pages older than this are evicted
+CACHE_MAX_MB = 500       # the oldest pages are evicted once compressed bodies exceed this
+CACHE_REUSE_HOURS = 24   # a page cached this recently is parsed from the cache instead of re-fetched
@@ -0,0 +1,419 @@
+"""
+Chrome sessions shared by every Selenium stage.
+
+    with DriverPool(size=3) as pool:
+        title = pool.run(lambda driver, url: driver.get(url) or driver.title, url)
+
+The chromedriver binary is resolved once and its path cached in DRIVER_CACHE,
+so later runs start without webdriver_manager (or a network connection).
+The pool starts its sessions up front, restarts a browser after
+PAGES_PER_SESSION pages to cap the memory a long-lived one accumulates, and
+replaces a browser that crashed instead of failing the job.
+
+Browsers use a load profile (LOAD_PROFILE). "lean" runs headless with the
+eager page load strategy (driver.get returns at DOMContentLoaded) and never
+requests images, fonts, media or ad/tracker hosts (BLOCKED_URLS, through
+CDP); the HTML, scripts and styles the extractors depend on are untouched.
+"full" loads every resource, as a desktop browser would.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import (
+    DRIVER_CACHE, HEADLESS, PAGES_PER_SESSION, WORKERS, LOAD_PROFILE, BLOCKED_URLS, PAGE_METRICS,
+    METRICS_WINDOW,
+)
+
+LOAD_PROFILES = ("lean", "full")
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+# ---------------- DRIVER ---------------- #
+
+def driver_path(cache=DRIVER_CACHE):
+    """
+    chromedriver binary: $CHROMEDRIVER if set, else the cached path, else
+    resolved by webdriver_manager (once) and written to the cache.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+
+        path = os.environ.get("CHROMEDRIVER")
+        if not path and os.path.exists(cache):
+            with open(cache) as f:
+                path = f.read().strip()
+
+        if not path or not os.path.exists(path):
+            path = ChromeDriverManager().install()
+            os.makedirs(os.path.dirname(cache) or ".", exist_ok=True)
+            with open(cache, "w") as f:
+                f.write(path)
+            print(f"✅ chromedriver cached: {path}")
+
+        _driver_path = path
+        return path
+
+
+def chrome_options(profile=LOAD_PROFILE, headless=HEADLESS, metrics=PAGE_METRICS):
+    if profile not in LOAD_PROFILES:
+        raise ValueError(f"Unknown load profile: {profile}")
+
+    options = Options()
+    if headless or profile == "lean":
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
+    # Disable location permission prompts
+    prefs = {"profile.default_content_setting_values.geolocation": 2}
+
+    if profile == "lean":
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        prefs["profile.managed_default_content_settings.images"] = 2
+    if metrics:
+        # Network events for page_metrics()
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def get_driver(profile=LOAD_PROFILE, headless=HEADLESS, metrics=PAGE_METRICS, blocked_urls=BLOCKED_URLS):
+    driver = webdriver.Chrome(service=Service(driver_path()), options=chrome_options(profile, headless, metrics))
+    if profile == "lean":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+    return driver
+
+
+def is_alive(driver):
+    """False once the browser has crashed or the chromedriver connection is gone."""
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+
+# ---------------- PAGE METRICS ---------------- #
+
+NAVIGATION_JS = """
+const nav = performance.getEntriesByType("navigation")[0];
+return nav ? nav.domContentLoadedEventEnd - nav.startTime : null;
+"""
+
+
+def page_metrics(driver):
+    """
+    DOMContentLoaded time of the current page, and the bytes received and
+    requests made (and blocked) since the last call. The byte and request
+    counts come from Chrome's performance log, so they are None unless the
+    driver was started with metrics=True.
+    """
+    metrics = {"dom_content_loaded_ms": None, "bytes": None, "requests": None, "blocked": None}
+    try:
+        dcl = driver.execute_script(NAVIGATION_JS)
+        metrics["dom_content_loaded_ms"] = round(dcl, 1) if dcl else None
+    except Exception:
+        pass
+
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return metrics
+
+    received = requests = blocked = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFinished":
+            received += params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    metrics.update(bytes=int(received), requests=requests, blocked=blocked)
+    return metrics
+
+
+# ---------------- MEMORY ---------------- #
+
+def _read_proc(pid, name):
+    try:
+        with open(f"/proc/{pid}/{name}") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def driver_pid(driver):
+    """PID of the chromedriver process (the root of the browser's process tree), or None."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def process_tree_memory(pid):
+    """
+    Memory (bytes) of a process and all of its descendants: the sum of their
+    proportional set sizes, so pages shared between Chrome processes are not
+    counted twice. None where /proc is not available.
+    """
+    if pid is None or not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        stat = _read_proc(entry, "stat") if entry.isdigit() else None
+        if stat:
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+
+    total, todo = 0, [pid]
+    while todo:
+        p = todo.pop()
+        todo.extend(children.get(p, []))
+        rollup = _read_proc(p, "smaps_rollup")
+        if rollup:
+            total += next((int(line.split()[1]) * 1024 for line in rollup.splitlines()
+                           if line.startswith("Pss:")), 0)
+        else:
+            statm = _read_proc(p, "statm")
+            total += int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE") if statm else 0
+    return total
+
+
+# ---------------- POOL ---------------- #
+
+class Session:
+    """One browser and how much it has been used."""
+
+    def __init__(self, driver, startup_seconds):
+        self.driver = driver
+        self.startup_seconds = startup_seconds
+        self.started_at = time.time()
+        self.pages = 0
+
+    @property
+    def pid(self):
+        return driver_pid(self.driver)
+
+    def memory(self):
+        return process_tree_memory(self.pid)
+
+
+class DriverPool:
+    """
+    Up to `size` browser sessions shared by threads. A session is lent for
+    one page at a time; after `max_pages` pages it is quit and a fresh one
+    is started on demand, and a session found dead is replaced the same way.
+    With `record_pages`, page_metrics() is taken after every page run(); the
+    means cover the last METRICS_WINDOW pages.
+    """
+
+    def __init__(self, size=WORKERS, max_pages=PAGES_PER_SESSION, driver_factory=get_driver, prewarm=True,
+                 record_pages=PAGE_METRICS):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self.record_pages = record_pages
+        self.pages = deque(maxlen=METRICS_WINDOW)
+        self.sessions = set()
+        self.counts = Counter()
+        self.startup_seconds = []
+        self._idle = queue.Queue()
+        self._open = 0          # sessions started (or starting) and not yet quit
+        self._lock = threading.Lock()
+        if prewarm:
+            self.prewarm()
+
+    def _reserve(self):
+        with self._lock:
+            if self._open >= self.size:
+                return False
+            self._open += 1
+            return True
+
+    def _start(self):
+        """Start a session in a slot already reserved."""
+        start = time.perf_counter()
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._lock:
+                self._open -= 1
+            raise
+        session = Session(driver, time.perf_counter() - start)
+        with self._lock:
+            self.sessions.add(session)
+            self.startup_seconds.append(session.startup_seconds)
+            self.counts["started"] += 1
+        return session
+
+    def _retire(self, session, reason):
+        with self._lock:
+            self.sessions.discard(session)
+            self._open -= 1
+            self.counts[reason] += 1
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def prewarm(self):
+        """Start every free session now, in parallel, so the first pages do not wait for a browser."""
+        n = 0
+        while self._reserve():
+            n += 1
+        if not n:
+            return
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [executor.submit(self._start) for _ in range(n)]
+        errors = []
+        for future in futures:
+            try:
+                self._idle.put(future.result())
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def acquire(self):
+        """An idle session, a new one if the pool is not full, or the next one released."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._reserve():
+                return self._start()
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def release(self, session, healthy=True):
+        session.pages += 1
+        if not healthy:
+            self._retire(session, "replaced")
+        elif session.pages >= self.max_pages:
+            self._retire(session, "recycled")
+        else:
+            self._idle.put(session)
+
+    @contextmanager
+    def driver(self):
+        """Lend a driver for one page."""
+        session = self.acquire()
+        try:
+            yield session.driver
+        except Exception:
+            self.release(session, healthy=is_alive(session.driver))
+            raise
+        self.release(session)
+
+    def run(self, func, *args, retries=1):
+        """
+        func(driver, *args) on a pooled driver. If the browser died while
+        running it, the call is retried (up to `retries` times) on a new session.
+        """
+        for attempt in range(retries + 1):
+            session = self.acquire()
+            try:
+                result = func(session.driver, *args)
+            except Exception:
+                alive = is_alive(session.driver)
+                self.release(session, healthy=alive)
+                if alive or attempt == retries:
+                    raise
+                print(f"❌ Browser session died, retrying on a new one (attempt {attempt + 2})")
+                continue
+            if self.record_pages:
+                page = page_metrics(session.driver)
+                with self._lock:
+                    self.pages.append(page)
+                    self.counts["pages_recorded"] += 1
+            self.release(session)
+            return result
+
+    def metrics(self):
+        """Session counts, startup times and the memory of every open session."""
+        with self._lock:
+            sessions = list(self.sessions)
+            startups = list(self.startup_seconds)
+            counts = dict(self.counts)
+            pages = list(self.pages)
+
+        def mean(key):
+            values = [p[key] for p in pages if p[key] is not None]
+            return sum(values) / len(values) if values else None
+
+        return {
+            "started": counts.get("started", 0),
+            "recycled": counts.get("recycled", 0),
+            "replaced": counts.get("replaced", 0),
+            "startup_seconds_mean": sum(startups) / len(startups) if startups else None,
+            "startup_seconds_max": max(startups, default=None),
+            "pages_recorded": counts.get("pages_recorded", 0),
+            "bytes_per_page": mean("bytes"),
+            "dom_content_loaded_ms": mean("dom_content_loaded_ms"),
+            "sessions": [
+                {
+                    "pid": s.pid,
+                    "pages": s.pages,
+                    "age_seconds": round(time.time() - s.started_at, 1),
+                    "startup_seconds": round(s.startup_seconds, 2),
+                    "memory_bytes": s.memory(),
+                }
+                for s in sessions
+            ],
+        }
+
+    def summary(self):
+        m = self.metrics()
+        memory = [s["memory_bytes"] for s in m["sessions"] if s["memory_bytes"] is not None]
+        text = f"{m['started']} browser sessions started"
+        if m["startup_seconds_mean"] is not None:
+            text += f" (startup {m['startup_seconds_mean']:.1f}s mean, {m['startup_seconds_max']:.1f}s max)"
+        text += f", {m['recycled']} recycled, {m['replaced']} replaced"
+        if memory:
+            text += f", {sum(memory) / 2**20:.0f} MB in {len(memory)} open sessions"
+        if m["bytes_per_page"] is not None:
+            text += f", {m['bytes_per_page'] / 1024:.0f} KB/page"
+        if m["dom_content_loaded_ms"] is not None:
+            text += f", DOMContentLoaded {m['dom_content_loaded_ms']:.0f} ms/page"
+        return text
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            self._retire(session, "closed")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
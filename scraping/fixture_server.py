@@ -0,0 +1,218 @@
+"""
+Local HTTP server for the HTML fixtures in scraping/fixtures.
+
+Used by the benchmarks to exercise the scrapers without hitting Naukri.
+Any path is answered with a fixture: exact file names are served as-is,
+search URLs (".../<role>-jobs-in-<city>") get the search results template
+for the first `search_pages` pages and an empty results page after that,
+and everything else is mapped onto one of the job detail pages.
+
+With `assets=True` every HTML page also pulls in the kind of resources a
+live page carries: photos, a web font, a video, and an ad iframe and tracker
+script from a "third-party" host (the same server reached as localhost).
+This is what the lean load profile is measured against.
+
+With `throttle=(limit, window)` the server behaves like a rate-limited site:
+pages slow down as the number of requests in the last `window` seconds nears
+`limit`, requests beyond it get a 429 with Retry-After, and a client that
+keeps going past twice the limit gets captcha block pages. Rejected requests
+count towards the limit too. This is what the politeness scheduler is
+tested against.
+"""
+import argparse
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEARCH_PATH = re.compile(r"-jobs-in-([a-z-]+?)(?:-(\d+))?$")
+
+# name -> (content type, size in bytes)
+ASSETS = {
+    "photo.jpg": ("image/jpeg", 150_000),
+    "logo.png": ("image/png", 20_000),
+    "font.woff2": ("font/woff2", 60_000),
+    "promo.mp4": ("video/mp4", 500_000),
+    "tracker.js": ("application/javascript", 40_000),
+}
+FONT_CSS = "@font-face { font-family: Fixture; src: url(/assets/font.woff2); } body { font-family: Fixture; }"
+AD_FRAME = '<html><body><img src="/assets/photo.jpg?ad"></body></html>'
+ASSETS_HTML = """
+<link rel="stylesheet" href="/assets/fonts.css">
+<img src="/assets/logo.png">
+<img src="/assets/photo.jpg?1"><img src="/assets/photo.jpg?2"><img src="/assets/photo.jpg?3">
+<video src="/assets/promo.mp4" preload="auto" muted></video>
+<iframe src="http://__THIRD_PARTY__/ads/banner.html"></iframe>
+<script src="http://__THIRD_PARTY__/assets/tracker.js"></script>
+"""
+# The fixture server's own address as seen by a page: what the lean profile blocks as third party
+THIRD_PARTY_PATTERN = "*://localhost:*"
+
+THROTTLED_HTML = "<html><head><title>429 Too Many Requests</title></head><body>Too Many Requests</body></html>"
+BLOCK_HTML = (
+    "<html><head><title>Access Denied - captcha</title></head>"
+    "<body>Unusual traffic from your network. Please solve the captcha to continue.</body></html>"
+)
+
+
+def asset_body(name):
+    content_type, size = ASSETS[name]
+    if content_type == "application/javascript":
+        return content_type, ("/*" + "x" * (size - 4) + "*/").encode()
+    return content_type, bytes(size)
+
+
+def job_detail_fixtures(directory=FIXTURE_DIR):
+    return sorted(f for f in os.listdir(directory) if f.startswith("job_detail_"))
+
+
+class Throttle:
+    """Sliding-window request counter shared by the handler threads of one server."""
+
+    def __init__(self, limit, window, latency=0.05):
+        self.limit = int(limit)
+        self.window = window
+        self.latency = latency
+        self.hits = deque()
+        self.lock = threading.Lock()
+        self.counts = {"ok": 0, "throttled": 0, "blocked": 0}
+
+    def check(self):
+        """
+        Outcome ("ok", "throttled" or "blocked") of a request arriving now,
+        the delay to answer it with, and the seconds until the window has room.
+        """
+        now = time.monotonic()
+        with self.lock:
+            while self.hits and self.hits[0] < now - self.window:
+                self.hits.popleft()
+            self.hits.append(now)
+            load = len(self.hits)
+            if load > 2 * self.limit:
+                outcome = "blocked"
+            elif load > self.limit:
+                outcome = "throttled"
+            else:
+                outcome = "ok"
+            self.counts[outcome] += 1
+            retry_after = self.hits[-self.limit] + self.window - now if load >= self.limit else 0
+        return outcome, self.latency * (1 + load / self.limit), retry_after
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    search_pages = 3
+    assets = False
+    throttle = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if self.assets and url.path.startswith("/assets/"):
+            return self.send_asset(os.path.basename(url.path))
+        if self.assets and url.path.startswith("/ads/"):
+            return self.send_body(AD_FRAME.encode("utf-8"))
+        if self.throttle is not None and self.throttled():
+            return
+
+        match = SEARCH_PATH.search(url.path)
+        if match is None:
+            if not self.assets:
+                return super().do_GET()
+            with open(self.translate_path(self.path), encoding="utf-8") as f:
+                return self.send_html(f.read())
+
+        page = int(parse_qs(url.query).get("page", [match.group(2) or 1])[0])
+        name = "search_results.html" if page <= self.search_pages else "search_results_empty.html"
+        with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+            body = f.read().replace("__CITY__", match.group(1)).replace("__PAGE__", str(page))
+        self.send_html(body)
+
+    def throttled(self):
+        """Answer with a 429 or a block page when over the limit; otherwise wait out the load latency."""
+        outcome, latency, retry_after = self.throttle.check()
+        time.sleep(latency)
+        if outcome == "throttled":
+            self.send_body(THROTTLED_HTML.encode("utf-8"), status=429,
+                           headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+        elif outcome == "blocked":
+            self.send_body(BLOCK_HTML.encode("utf-8"))
+        return outcome != "ok"
+
+    def send_html(self, body):
+        if self.assets:
+            port = self.server.server_address[1]
+            extra = ASSETS_HTML.replace("__THIRD_PARTY__", f"localhost:{port}")
+            body = body.replace("</body>", extra + "</body>") if "</body>" in body else body + extra
+        self.send_body(body.encode("utf-8"))
+
+    def send_asset(self, name):
+        if name == "fonts.css":
+            return self.send_body(FONT_CSS.encode("utf-8"), content_type="text/css")
+        if name not in ASSETS:
+            return self.send_body(b"", status=404)
+        content_type, body = asset_body(name)
+        self.send_body(body, content_type=content_type)
+
+    def send_body(self, body, status=200, content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def translate_path(self, path):
+        name = os.path.basename(urlsplit(path).path)
+        directory = self.directory
+        if not os.path.isfile(os.path.join(directory, name)):
+            pages = job_detail_fixtures(directory)
+            name = pages[zlib.crc32(path.encode()) % len(pages)]
+        return os.path.join(directory, name)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(directory=FIXTURE_DIR, host="127.0.0.1", port=0, search_pages=3, assets=False,
+                   throttle=None, latency=0.05):
+    """
+    Start the fixture server in a daemon thread and return (server, base_url).
+    With throttle=(limit, window), server.throttle counts the outcomes it served.
+    """
+    throttle = Throttle(*throttle, latency=latency) if throttle else None
+    handler_class = type("Handler", (FixtureHandler,),
+                         {"search_pages": search_pages, "assets": assets, "throttle": throttle})
+    handler = partial(handler_class, directory=directory)
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.throttle = throttle
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def fixture_urls(base_url, count):
+    """`count` distinct job URLs on the fixture server."""
+    return [f"{base_url}/job-listings-fixture-{i}" for i in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve scraping fixtures locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--assets", action="store_true", help="add images, fonts, video and third-party resources to pages")
+    parser.add_argument("--throttle", type=float, nargs=2, metavar=("LIMIT", "WINDOW"),
+                        help="answer 429s beyond LIMIT requests per WINDOW seconds, block pages beyond twice that")
+    args = parser.parse_args()
+
+    server, base_url = serve_fixtures(port=args.port, assets=args.assets, throttle=args.throttle)
+    print(f"Serving fixtures on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
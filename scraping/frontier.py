@@ -0,0 +1,488 @@
+"""
+Durable crawl frontier shared by any number of scraper workers.
+
+The (role, city, page) search space and the job URLs it turns up are kept
+as tasks in SQLite, split over FRONTIER_SHARDS files by a hash of the task
+URL so that workers seldom wait on each other's writes. A worker leases a
+task for LEASE_SECONDS: if it has not completed it by then (the process
+died, the machine went away) the task is handed to the next worker that
+asks. Every URL is queued once, whichever worker finds it; a done task is
+only queued again once it is older than FRESH_DAYS (job pages) or
+SEARCH_FRESH_HOURS (results pages).
+
+Requests to a host are spaced through a slot table next to the shards, so
+HOST_CAP_RPM holds for all workers together, and a 429 or block page seen
+by one worker pauses the host for all of them.
+
+    python scraping/frontier.py seed --roles "data analyst" "data engineer"
+    python scraping/frontier.py work --fetcher http    # as many workers as wanted
+    python scraping/frontier.py status
+    python scraping/frontier.py export
+
+Workers on several machines share the frontier directory over a network
+file system with working POSIX locks (SQLite relies on them), with their
+clocks in sync.
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from config import (
+    FRONTIER_DIR, FRONTIER_SHARDS, LEASE_SECONDS, LEASE_BATCH, FRONTIER_POLL, HOST_CAP_RPM,
+    SEARCH_FRESH_HOURS, FRONTIER_ROLES, METRO_CITIES, MAX_PAGES, BASE_URL, FRESH_DAYS, MAX_ATTEMPTS,
+    RETRY_BACKOFF, COOLDOWN, FETCHER, SEARCH_BACKEND, POLITENESS, HOST_RATE, HOST_BURST, PAGE_CACHE, METRICS_LOG,
+)
+from driver_pool import DriverPool, get_driver
+from http_fetcher import make_session
+from job_details_scraper import make_fetcher
+from metrics import PageMetrics
+from page_cache import PageCache
+from rate_limiter import RateLimiter, make_rate_limiter
+from search_naukri import build_search_url, finalize_results, http_card_fetcher, selenium_card_fetcher
+from storage import save_dataset
+from waits import WAITS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+"""
+HOSTS_SCHEMA = "CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, next_at REAL NOT NULL)"
+
+# Job pages go before results pages, so the queue does not grow faster than it drains
+PRIORITY = {"detail": 1, "search": 0}
+
+
+class Task:
+    def __init__(self, url, kind, payload, attempts=0, owner=None):
+        self.url = url
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.owner = owner
+
+
+def search_task(role, city, page, max_pages=MAX_PAGES, base=BASE_URL):
+    return Task(build_search_url(role, city, page, base=base), "search",
+                {"role": role, "city": city, "page": page, "max_pages": max_pages, "base": base})
+
+
+def detail_task(card):
+    return Task(card["job_url"], "detail", card)
+
+
+class Frontier:
+    """
+    Task queue in `directory`: shard_<n>.sqlite files and hosts.sqlite.
+
+    Safe to share between threads, processes and machines: every thread
+    opens its own connections, and every write is a short IMMEDIATE
+    transaction, so a lease is handed to exactly one worker.
+
+    Tasks are "queued", "leased" (available_at is then the lease expiry),
+    "done" or "failed" (after `max_attempts`, retried after a backoff).
+    """
+
+    def __init__(self, directory=FRONTIER_DIR, shards=FRONTIER_SHARDS, lease_seconds=LEASE_SECONDS,
+                 fresh_days=FRESH_DAYS, search_fresh_hours=SEARCH_FRESH_HOURS,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=RETRY_BACKOFF):
+        self.directory = directory
+        self.shards = shards
+        self.lease_seconds = lease_seconds
+        self.fresh = {"detail": fresh_days * 86400, "search": search_fresh_hours * 3600}
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._local = threading.local()
+
+        os.makedirs(directory, exist_ok=True)
+        for shard in range(shards):
+            conn = self._conn(shard)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        conn = self._conn("hosts")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(HOSTS_SCHEMA)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _conn(self, shard):
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        if shard not in conns:
+            name = f"shard_{shard}.sqlite" if shard != "hosts" else "hosts.sqlite"
+            # transactions are opened explicitly (see _write)
+            conns[shard] = sqlite3.connect(os.path.join(self.directory, name), timeout=60, isolation_level=None)
+        return conns[shard]
+
+    @contextmanager
+    def _write(self, shard):
+        # IMMEDIATE takes the write lock up front: two workers never read the same ready task
+        conn = self._conn(shard)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        for conn in getattr(self._local, "conns", {}).values():
+            conn.close()
+        self._local.conns = {}
+
+    def shard(self, url):
+        return zlib.crc32(url.encode("utf-8")) % self.shards
+
+    # ---------------- QUEUEING ---------------- #
+
+    def add(self, tasks, now=None):
+        """Queue tasks whose URL is new, or done/failed longer ago than its kind's freshness; returns how many."""
+        now = now or time.time()
+        by_shard = {}
+        for task in tasks:
+            by_shard.setdefault(self.shard(task.url), []).append(task)
+
+        added = 0
+        for shard, shard_tasks in by_shard.items():
+            with self._write(shard) as conn:
+                for task in shard_tasks:
+                    added += conn.execute(
+                        """
+                        INSERT INTO tasks (url, kind, payload, status, priority, available_at, updated_at)
+                        VALUES (?, ?, ?, 'queued', ?, ?, ?)
+                        ON CONFLICT (url) DO UPDATE SET
+                            status = 'queued', payload = excluded.payload, available_at = excluded.available_at,
+                            lease_owner = NULL, attempts = 0, error = NULL, updated_at = excluded.updated_at
+                        WHERE status IN ('done', 'failed') AND updated_at < ?
+                        """,
+                        (task.url, task.kind, json.dumps(task.payload), PRIORITY[task.kind], now, now,
+                         now - self.fresh[task.kind]),
+                    ).rowcount
+        return added
+
+    def seed(self, roles=FRONTIER_ROLES, cities=METRO_CITIES, max_pages=MAX_PAGES, base=BASE_URL):
+        """Queue the first results page of every role in every city."""
+        return self.add(search_task(role, city, 1, max_pages, base) for role in roles for city in cities)
+
+    def lease(self, owner, n=LEASE_BATCH, now=None):
+        """
+        Up to n ready tasks (queued, due for a retry, or with an expired lease),
+        leased to `owner` for lease_seconds. An expired lease of a task already
+        tried max_attempts times marks it failed instead, so a task that kills
+        its worker is not leased forever. Shards are visited from one chosen
+        by the owner's name, so workers start on different files.
+        """
+        now = now or time.time()
+        first = zlib.crc32(owner.encode("utf-8")) % self.shards
+        tasks = []
+        for i in range(self.shards):
+            if len(tasks) >= n:
+                break
+            shard = (first + i) % self.shards
+            # a read first, so that polling empty shards takes no write lock
+            ready = self._conn(shard).execute(
+                "SELECT 1 FROM tasks WHERE status IN ('queued', 'leased') AND available_at <= ? LIMIT 1", (now,)
+            ).fetchone()
+            if not ready:
+                continue
+            with self._write(shard) as conn:
+                conn.execute(
+                    """
+                    UPDATE tasks SET status = 'failed', lease_owner = NULL, error = 'lease expired', updated_at = ?
+                    WHERE status = 'leased' AND available_at <= ? AND attempts >= ?
+                    """,
+                    (now, now, self.max_attempts),
+                )
+                rows = conn.execute(
+                    """
+                    UPDATE tasks SET status = 'leased', lease_owner = ?, available_at = ?,
+                        attempts = attempts + 1, updated_at = ?
+                    WHERE url IN (
+                        SELECT url FROM tasks
+                        WHERE status IN ('queued', 'leased') AND available_at <= ?
+                        ORDER BY priority DESC, available_at LIMIT ?
+                    )
+                    RETURNING url, kind, payload, attempts
+                    """,
+                    (owner, now + self.lease_seconds, now, now, n - len(tasks)),
+                ).fetchall()
+            tasks += [Task(url, kind, json.loads(payload), attempts, owner) for url, kind, payload, attempts in rows]
+        return tasks
+
+    def extend(self, task, now=None):
+        """Renew the lease on a task still being worked on; False if it was lost to another worker."""
+        now = now or time.time()
+        with self._write(self.shard(task.url)) as conn:
+            return conn.execute(
+                "UPDATE tasks SET available_at = ? WHERE url = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, task.url, task.owner),
+            ).rowcount == 1
+
+    def complete(self, task, result=None, children=()):
+        """
+        Mark a task done (with its record, for job pages) and queue the tasks
+        it turned up. A task completed twice (its lease expired while it was
+        still being worked on) keeps the first result.
+        """
+        now = time.time()
+        with self._write(self.shard(task.url)) as conn:
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, error = NULL, updated_at = ?
+                WHERE url = ? AND status = 'leased'
+                """,
+                (json.dumps(result, default=str) if result is not None else None, now, task.url),
+            )
+        return self.add(children, now)
+
+    def fail(self, task, error):
+        """Put a task back with a backoff, or mark it failed after max_attempts."""
+        now = time.time()
+        failed = task.attempts >= self.max_attempts
+        with self._write(self.shard(task.url)) as conn:
+            conn.execute(
+                """
+                UPDATE tasks SET status = ?, available_at = ?, lease_owner = NULL, error = ?, updated_at = ?
+                WHERE url = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                ("failed" if failed else "queued", now + self.backoff_base * 2 ** (task.attempts - 1),
+                 str(error)[:500], now, task.url, task.owner),
+            )
+        return failed
+
+    # ---------------- HOST SLOTS ---------------- #
+
+    def host_slot(self, host, interval, now=None):
+        """Reserve the next request slot of a host, `interval` seconds after the last; returns its time."""
+        now = now or time.time()
+        with self._write("hosts") as conn:
+            row = conn.execute("SELECT next_at FROM hosts WHERE host = ?", (host,)).fetchone()
+            slot = max(now, row[0] if row else now)
+            conn.execute("INSERT OR REPLACE INTO hosts VALUES (?, ?)", (host, slot + interval))
+        return slot
+
+    def pause_host(self, host, seconds, now=None):
+        """Hand out no slot of the host for the next `seconds`."""
+        now = now or time.time()
+        with self._write("hosts") as conn:
+            conn.execute(
+                """
+                INSERT INTO hosts VALUES (?, ?)
+                ON CONFLICT (host) DO UPDATE SET next_at = MAX(next_at, excluded.next_at)
+                """,
+                (host, now + seconds),
+            )
+
+    # ---------------- INSPECTION ---------------- #
+
+    def counts(self):
+        """Number of tasks per (kind, status) over all shards."""
+        counts = Counter()
+        for shard in range(self.shards):
+            for kind, status, n in self._conn(shard).execute(
+                "SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status"
+            ):
+                counts[(kind, status)] += n
+        return counts
+
+    def open_tasks(self):
+        """Tasks queued or leased: while there are any, workers may still get (or create) work."""
+        return sum(n for (_, status), n in self.counts().items() if status in ("queued", "leased"))
+
+    def results(self):
+        """(card, record) of every job page done."""
+        out = []
+        for shard in range(self.shards):
+            rows = self._conn(shard).execute(
+                "SELECT payload, result FROM tasks WHERE kind = 'detail' AND status = 'done' ORDER BY url"
+            )
+            out += [(json.loads(payload), json.loads(result)) for payload, result in rows if result]
+        return out
+
+
+# ---------------- WORKER ---------------- #
+
+class HostCap(RateLimiter):
+    """
+    A worker's own politeness scheduler, plus the frontier's per-host slots:
+    no host gets more than `rpm` requests per minute from all workers, and a
+    429 or block page pauses the host for every worker.
+    """
+
+    def __init__(self, frontier, rate_limiter, rpm=HOST_CAP_RPM, cooldown=COOLDOWN):
+        self.frontier = frontier
+        self.rate_limiter = rate_limiter
+        self.interval = 60 / rpm
+        self.cooldown = cooldown
+
+    def acquire(self, url):
+        self.rate_limiter.acquire(url)
+        slot = self.frontier.host_slot(urlsplit(url).netloc, self.interval)
+        time.sleep(max(0.0, slot - time.time()))
+
+    def record(self, url, outcome, latency=None, retry_after=None):
+        self.rate_limiter.record(url, outcome, latency, retry_after)
+        if outcome in ("throttled", "blocked"):
+            self.frontier.pause_host(urlsplit(url).netloc, retry_after if retry_after is not None else self.cooldown)
+
+    def summary(self):
+        return f"{self.rate_limiter.summary()} (capped at {60 / self.interval:.0f} req/min per host over all workers)"
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(frontier, owner=None, fetcher=FETCHER, search_backend=SEARCH_BACKEND, politeness=POLITENESS,
+               rate=HOST_RATE, burst=HOST_BURST, cap_rpm=HOST_CAP_RPM, batch=LEASE_BATCH, poll=FRONTIER_POLL,
+               cache_path=None, metrics_path=None, driver_factory=get_driver, until_empty=True):
+    """
+    Lease and work tasks until the frontier has no open task left (or
+    forever, without `until_empty`). A results page queues its job URLs and
+    the next page; a job page stores its record. Returns the task counts.
+    """
+    owner = owner or worker_name()
+    rate_limiter = HostCap(frontier, make_rate_limiter(politeness, rate, burst), cap_rpm)
+    # One browser per worker, shared by results pages and job pages
+    pool = DriverPool(1, driver_factory=driver_factory, prewarm=False)
+    cache = PageCache(cache_path) if cache_path else None
+    detail_fetcher = make_fetcher(fetcher, driver_factory, pool, cache)
+    metrics = PageMetrics(metrics_path)
+    session = make_session() if search_backend == "http" else None
+    if session is not None:
+        fetch_cards = http_card_fetcher(session, rate_limiter)
+    else:
+        fetch_cards = selenium_card_fetcher(pool, rate_limiter)
+    counts = Counter()
+
+    def work(task):
+        if task.kind == "search":
+            p = task.payload
+            print(f"Scraping: {task.url}")
+            cards = fetch_cards(task.url, p["city"], p["page"])
+            children = [detail_task({k: (None if v == "" else v) for k, v in card.items()}) for card in cards]
+            if cards and p["page"] < p["max_pages"]:
+                children.append(search_task(p["role"], p["city"], p["page"] + 1, p["max_pages"], p["base"]))
+            counts["cards"] += len(cards)
+            counts["queued"] += frontier.complete(task, children=children)
+        else:
+            with metrics.page(task.url) as page:
+                record = detail_fetcher.fetch(task.payload, rate_limiter)
+                page.done(record)
+            frontier.complete(task, result=record)
+
+    try:
+        while True:
+            tasks = frontier.lease(owner, batch)
+            if not tasks:
+                if until_empty and not frontier.open_tasks():
+                    break
+                time.sleep(poll)
+                continue
+
+            for i, task in enumerate(tasks):
+                # the rest of a batch waited on the ones before it
+                if i and not frontier.extend(task):
+                    continue
+                try:
+                    work(task)
+                except Exception as e:
+                    print(f"❌ Failed for {task.url}: {e}")
+                    counts["failed" if frontier.fail(task, e) else "retried"] += 1
+                    continue
+                counts[task.kind] += 1
+    finally:
+        detail_fetcher.close()
+        pool.close()
+        metrics.close()
+        if session is not None:
+            session.close()
+        frontier.close()
+
+    print(f"✅ Worker {owner}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    print(rate_limiter.summary())
+    print(WAITS.summary())
+    return counts
+
+
+def export(frontier):
+    """Save the job URLs and job detail records of the done job pages as datasets."""
+    results = frontier.results()
+    urls_df = finalize_results([card for card, _ in results])
+    details_df = pd.DataFrame([record for _, record in results])
+    save_dataset(urls_df, "job_urls")
+    save_dataset(details_df, "job_details")
+    print(f"✅ Saved {len(urls_df)} job URLs and {len(details_df)} job detail records")
+    return urls_df, details_df
+
+
+def status_frame(frontier):
+    counts = frontier.counts()
+    df = pd.Series(counts, dtype="int64").unstack(fill_value=0) if counts else pd.DataFrame()
+    df.index.name, df.columns.name = "kind", None
+    return df
+
+
+# ---------------- RUN ---------------- #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl frontier shared by scraper workers")
+    parser.add_argument("command", choices=["seed", "work", "status", "export"])
+    parser.add_argument("--dir", default=FRONTIER_DIR, help="frontier directory (shared by all workers)")
+    parser.add_argument("--shards", type=int, default=FRONTIER_SHARDS)
+    parser.add_argument("--roles", nargs="+", default=FRONTIER_ROLES)
+    parser.add_argument("--cities", nargs="+", default=METRO_CITIES)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--fetcher", choices=["selenium", "http"], default=FETCHER)
+    parser.add_argument("--search", choices=["selenium", "http"], default=SEARCH_BACKEND)
+    parser.add_argument("--politeness", choices=["adaptive", "fixed"], default=POLITENESS)
+    parser.add_argument("--cap-rpm", type=float, default=HOST_CAP_RPM, help="requests per minute per host over all workers")
+    parser.add_argument("--batch", type=int, default=LEASE_BATCH, help="tasks leased at a time")
+    parser.add_argument("--cache", default=PAGE_CACHE, help="raw page cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="do not store fetched pages")
+    parser.add_argument("--metrics", default=METRICS_LOG, help="JSONL file of per-page phase times and fields")
+    parser.add_argument("--forever", action="store_true", help="keep polling for tasks when the frontier is empty")
+    args = parser.parse_args()
+
+    frontier = Frontier(args.dir, args.shards)
+    if args.command == "seed":
+        added = frontier.seed(args.roles, args.cities, args.max_pages, args.base_url)
+        print(f"✅ Queued {added} results pages ({len(args.roles)} roles x {len(args.cities)} cities)")
+    elif args.command == "work":
+        run_worker(frontier, fetcher=args.fetcher, search_backend=args.search, politeness=args.politeness,
+                   cap_rpm=args.cap_rpm, batch=args.batch, cache_path=None if args.no_cache else args.cache,
+                   metrics_path=args.metrics, until_empty=not args.forever)
+    elif args.command == "export":
+        export(frontier)
+    print(status_frame(frontier).to_string())
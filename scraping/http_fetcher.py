@@ -0,0 +1,284 @@
+"""
+Browserless fetch path for job detail pages.
+
+Naukri renders job pages server-side with the posting embedded as a JSON-LD
+JobPosting payload. HttpFetcher downloads the page over a pooled keep-alive
+session (gzip), builds the record from that payload and only hands the URL to
+the Selenium fallback when the payload cannot be parsed. Payload fields of an
+unexpected shape are skipped (the DOM parse fills them in), and a payload
+that still fails to parse counts as no payload.
+"""
+import json
+from collections import Counter
+
+import lxml.html
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import annotate, phase
+from page_parser import JobPage, format_key_skills, html_title, is_block_page, parse_job_page, visible_text
+from rate_limiter import Throttled
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def make_session(pool_size=4, retries=2):
+    """
+    Keep-alive session with a connection pool per host. Connection errors are
+    retried; 429s are returned, for the politeness scheduler to back off.
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, respect_retry_after_header=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def retry_after(response):
+    """Seconds from a Retry-After header, or None (HTTP dates are not used by the servers we crawl)."""
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+def check_response(response):
+    """Raise Throttled on a 429/503 or a block page, and HTTPError on any other error status."""
+    if response.status_code in (429, 503):
+        raise Throttled(response.url, "throttled", retry_after(response))
+    response.raise_for_status()
+    if is_block_page(html_title(response.text)):
+        raise Throttled(response.url, "blocked")
+
+
+# ---------------- EMBEDDED PAYLOAD ---------------- #
+
+# baseSalary unitText -> periods per year; other units are left to the DOM parse
+SALARY_UNITS = {"YEAR": 1, "MONTH": 12, "WEEK": 52}
+
+def _job_posting(tree):
+    """First JSON-LD object of @type JobPosting in the page, or None."""
+    for script in tree.xpath("//script[@type='application/ld+json']"):
+        try:
+            payload = json.loads(script.text or "")
+        except ValueError:
+            continue
+        if isinstance(payload, dict):
+            payload = payload.get("@graph", [payload])
+        if isinstance(payload, dict):
+            payload = [payload]
+        if not isinstance(payload, list):
+            continue
+        for item in payload:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting":
+                return item
+    return None
+
+
+def _location(posting):
+    places = posting.get("jobLocation") or []
+    if isinstance(places, dict):
+        places = [places]
+    if not isinstance(places, list):
+        places = [places]
+    names = []
+    for place in places:
+        if isinstance(place, str):
+            names.append(place)
+            continue
+        if not isinstance(place, dict):
+            continue
+        address = place.get("address") or {}
+        locality = address.get("addressLocality") if isinstance(address, dict) else address
+        if isinstance(locality, list):
+            names.extend(name for name in locality if isinstance(name, str))
+        elif isinstance(locality, str) and locality:
+            names.append(locality)
+    return ", ".join(dict.fromkeys(names)) or None
+
+
+def _experience(posting):
+    exp = posting.get("experienceRequirements")
+    if isinstance(exp, dict):
+        months = exp.get("monthsOfExperience")
+        return f"{int(months) // 12}+ years" if months is not None else None
+    return exp or None
+
+
+def _amount(value):
+    """A salary amount as a float, or None if it is not a number."""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _lacs(value):
+    return f"{value / 100000:g}"
+
+
+def _salary(posting):
+    """
+    baseSalary in the scraper's text form, e.g. '6-10 Lacs P.A.'. Amounts are
+    converted to annual; None (DOM value kept) for non-numeric amounts or
+    units not in SALARY_UNITS.
+    """
+    salary = posting.get("baseSalary")
+    if not isinstance(salary, dict):
+        return None
+    value = salary.get("value") or {}
+    if not isinstance(value, dict):
+        value = {"value": value}
+    low = value.get("minValue", value.get("value"))
+    high = value.get("maxValue")
+    if not low:
+        return "Not Disclosed"
+
+    unit = value.get("unitText") or salary.get("unitText") or "YEAR"
+    per_year = SALARY_UNITS.get(str(unit).upper())
+    low, high = _amount(low), _amount(high) if high else None
+    if per_year is None or low is None:
+        return None
+    if high and high != low:
+        return f"{_lacs(low * per_year)}-{_lacs(high * per_year)} Lacs P.A."
+    return f"{_lacs(low * per_year)} Lacs P.A."
+
+
+def _description(posting):
+    html = posting.get("description")
+    if not html:
+        return None
+    text = visible_text(lxml.html.fragment_fromstring(html, create_parent="div"))
+    return " ".join(text.split()) or None
+
+
+def _name(value):
+    """Name of a schema.org Thing given as a string, a {"name": ...} dict or a list of either."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) else None
+
+
+def _skills(posting):
+    skills = posting.get("skills")
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    if not isinstance(skills, list):
+        return None
+    names = [_name(skill) for skill in skills]
+    return format_key_skills([name for name in names if name])
+
+
+def _embedded_fields(tree):
+    """Record fields from the page's JobPosting, or None without a title and description."""
+    posting = _job_posting(tree)
+    if posting is None:
+        return None
+
+    title = _name(posting.get("title"))
+    description = _description(posting)
+    if not title or not description:
+        return None
+
+    return {
+        "job_title": title,
+        "company": _name(posting.get("hiringOrganization")),
+        "location": _location(posting),
+        "experience": _experience(posting),
+        "salary": _salary(posting),
+        "job_description": description,
+        "key_skills": _skills(posting),
+    }
+
+
+def parse_embedded_job(html, job_url, src_company=None):
+    """
+    Build a job record from the JSON-LD payload of a server-rendered page.
+
+    Fields missing from the payload are filled from the DOM parse of the same
+    HTML. Returns None when there is no usable payload (no JobPosting, no
+    title/description, or a payload that fails to parse), which sends the URL
+    to the browser fallback.
+    """
+    with phase("parse_html"):
+        page = JobPage(html)
+
+    with phase("extract_embedded"):
+        try:
+            payload = _embedded_fields(page.tree)
+        except Exception as e:
+            print(f"Unparseable embedded job for {job_url}: {e!r}")
+            payload = None
+        if payload is None:
+            return None
+
+    record = parse_job_page(page, job_url, src_company=src_company)
+
+    # Company from the search results stays preferred, as in the browser path
+    if pd.notna(src_company) and str(src_company).strip():
+        del payload["company"]
+
+    for field, value in payload.items():
+        if value:
+            record[field] = value
+    return record
+
+
+# ---------------- FETCHER ---------------- #
+
+class HttpFetcher:
+    """
+    Fetch job pages over HTTP and parse the embedded payload, falling back to
+    another fetcher (the Selenium one) for pages that do not parse.
+    """
+
+    name = "http"
+
+    def __init__(self, fallback, session=None, timeout=20, cache=None):
+        self.fallback = fallback
+        self.session = session or make_session()
+        self.timeout = timeout
+        self.cache = cache
+        self.counts = Counter()
+
+    def get(self, job_url):
+        response = self.session.get(job_url, timeout=self.timeout)
+        check_response(response)
+        return response.text
+
+    def fetch(self, row, rate_limiter):
+        job_url = row["job_url"]
+        record = None
+
+        # Throttled is not caught: the browser would be throttled by the same host
+        try:
+            html = rate_limiter.request(job_url, self.get, job_url)
+            if self.cache is not None:
+                with phase("cache_put"):
+                    self.cache.put(job_url, html, self.name)
+            record = parse_embedded_job(html, job_url, src_company=row.get("company"))
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {job_url}: {e}")
+
+        if record is not None:
+            self.counts["http"] += 1
+            annotate(fetch_path="http")
+            return record
+
+        self.counts[self.fallback.name] += 1
+        return self.fallback.fetch(row, rate_limiter)
+
+    def close(self):
+        self.session.close()
+        self.fallback.close()
@@ -1,21 +1,40 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
 import pandas as pd
+import argparse
+import multiprocessing
 import time
-import os
-import re
-
-from utils import human_delay
-from config import DELAY_RANGE
-
-
-# ---------------- FIELD EXTRACTORS (IMPROVED) ---------------- #
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from config import (
+    WORKERS, POOL_MODE, FETCHER, HOST_RATE, HOST_BURST, POLITENESS,
+    STATE_DB, FRESH_DAYS, CHECKPOINT_EVERY, MAX_ATTEMPTS, RETRY_BACKOFF,
+    PAGE_CACHE, CACHE_REUSE_HOURS, DETAIL_HEADER_TIMEOUT, JD_EXPAND_TIMEOUT, METRICS_LOG,
+)
+from driver_pool import DriverPool, driver_pid, get_driver, process_tree_memory
+from http_fetcher import HttpFetcher
+from metrics import PageMetrics, annotate, memory_due, phase, serve_metrics
+from page_cache import CachedFetcher, PageCache, parse_cached_page
+from page_parser import (
+    SALARY_LABEL_XPATH, SALARY_CLASS_XPATH, KEY_SKILLS_HEADING_XPATH,
+    clean_company_text, salary_from_candidates, salary_from_element_text,
+    salary_from_body, experience_from_body, key_skills_from_anchor_texts,
+    format_key_skills, job_description_from_body,
+    parse_job_page, is_block_page,
+)
+from rate_limiter import Throttled, make_rate_limiter
+from state_store import UrlStateStore
+from storage import load_dataset, save_dataset
+from waits import WAITS, timed_wait
+
+
+# ---------------- FIELD EXTRACTORS (SELENIUM) ---------------- #
+# Per-field WebDriver extractors. The scraper itself parses page_source once
+# with page_parser.parse_job_page; these are kept as the reference the parser
+# is verified against (verify_page_parser.py).
 
 def extract_company(driver):
     """Extract company name using multiple selector strategies."""
@@ -27,13 +46,9 @@ def extract_company(driver):
     ]
     for by, sel in selectors:
         try:
-            text = driver.find_element(by, sel).text.strip()
-            if text and len(text) < 100:
-                # Remove review ratings and extra text
-                company = text.split('\n')[0].strip()
-                company = re.sub(r'\d+\.\d+\s*\d+\s*Reviews|Reviews|Employees.*choice', '', company).strip()
-                if company and len(company) > 1:
-                    return company
+            company = clean_company_text(driver.find_element(by, sel).text.strip())
+            if company:
+                return company
         except Exception:
             continue
     return None
@@ -69,28 +84,20 @@ def extract_experience(driver):
             continue
     # Try to find patterns in the body text as fallback
     try:
-        body = driver.find_element(By.TAG_NAME, "body").text
-        exp = re.search(r'(\d+\s*-\s*\d+\s*years|\d+\+\s*years)', body, re.I)
-        if exp:
-            return exp.group()
+        return experience_from_body(driver.find_element(By.TAG_NAME, "body").text)
     except Exception:
-        pass
-    return None
+        return None
 
 def extract_salary(driver):
     """Extract salary using multiple selector strategies."""
     # 1) Look for explicit Salary label nodes and inspect their nearby siblings
     try:
         # nodes that explicitly mention 'salary'
-        label_nodes = driver.find_elements(
-            By.XPATH,
-            "//*[contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'salary')]"
-        )
+        label_nodes = driver.find_elements(By.XPATH, SALARY_LABEL_XPATH)
         for node in label_nodes:
             try:
-                # Check node text and nearby siblings (next 4 following nodes)
-                text = node.text or ''
-                candidates = [text]
+                # Check node text and nearby siblings (next 6 following nodes)
+                candidates = [node.text or '']
                 following = node.find_elements(By.XPATH, 'following::*')[:6]
                 for f in following:
                     try:
@@ -100,23 +107,9 @@ def extract_salary(driver):
                     except Exception:
                         continue
 
-                # Inspect candidates for salary-like patterns first
-                for c in candidates:
-                    if not c:
-                        continue
-                    # split lines and examine each
-                    for part in [p.strip() for p in str(c).splitlines() if p.strip()]:
-                        low = part.lower()
-                        # prefer explicit salary formats
-                        if any(k in low for k in ('lacs', 'lakhs', 'lpa', '₹')):
-                            # ensure part is not just experience
-                            if 'year' in low or 'yrs' in low:
-                                continue
-                            return part
-                        # capture numeric range with Lacs following
-                        m = re.search(r'\d+\s*[-–]\s*\d+\s*(?:lacs|lakhs|lpa)', low, re.I)
-                        if m:
-                            return m.group().strip()
+                salary = salary_from_candidates(candidates)
+                if salary:
+                    return salary
 
             except Exception:
                 continue
@@ -124,33 +117,20 @@ def extract_salary(driver):
         pass
 
     # 2) Try common selectors used on job sites
-    selectors = [
-        (By.XPATH, "//*[contains(@class,'salary') or contains(@class,'ctc') or contains(@class,'pay')]")
-    ]
-    for by, sel in selectors:
-        try:
-            elements = driver.find_elements(by, sel)
-            for el in elements:
-                try:
-                    text = el.text or ''
-                    for part in [p.strip() for p in text.splitlines() if p.strip()]:
-                        low = part.lower()
-                        if any(k in low for k in ('lacs', 'lakhs', 'lpa', '₹')) and 'year' not in low:
-                            return part
-                except Exception:
-                    continue
-        except Exception:
-            continue
-
-    # 3) Fallback: regex search in body for salary-like patterns, prefer Lacs/LPA over ranges of years
     try:
-        body = driver.find_element(By.TAG_NAME, "body").text
-        # find all salary-like patterns
-        matches = re.findall(r'(?:₹\s*[\d.,\-]+\s*(?:Lacs|Lakhs|LPA|P\.A\.)?|\d+\s*[-–]\s*\d+\s*(?:Lacs|Lakhs|LPA))', body, re.I)
-        for s in matches:
-            if 'year' in s.lower():
+        for el in driver.find_elements(By.XPATH, SALARY_CLASS_XPATH):
+            try:
+                salary = salary_from_element_text(el.text)
+                if salary:
+                    return salary
+            except Exception:
                 continue
-            return s.strip()
+    except Exception:
+        pass
+
+    # 3) Fallback: regex search in body for salary-like patterns
+    try:
+        return salary_from_body(driver.find_element(By.TAG_NAME, "body").text)
     except Exception:
         pass
 
@@ -158,21 +138,6 @@ def extract_salary(driver):
     return None
 
 
-# ---------------- DRIVER ---------------- #
-
-def get_driver():
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)")
-    prefs = {"profile.default_content_setting_values.geolocation": 2}
-    options.add_experimental_option("prefs", prefs)
-
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
-
-
 # ---------------- SAFE TEXT ---------------- #
 
 def safe_text(driver, by, selector):
@@ -184,6 +149,23 @@ def safe_text(driver, by, selector):
 
 # ---------------- READ MORE (JD ONLY) ---------------- #
 
+# True once the JD section's text has grown, or the "read more" link is gone or hidden
+JD_EXPANDED_JS = """
+return arguments[0].textContent.length > arguments[1]
+    || !arguments[2].isConnected || arguments[2].offsetParent === null;
+"""
+
+
+def jd_expanded(section, length_before, read_more):
+    def condition(driver):
+        try:
+            return driver.execute_script(JD_EXPANDED_JS, section, length_before, read_more)
+        except Exception:
+            # the section was re-rendered or removed: nothing left to wait for
+            return True
+    return condition
+
+
 def expand_job_description_only(driver):
     try:
         jd_heading = driver.find_element(
@@ -202,14 +184,18 @@ def expand_job_description_only(driver):
         return
 
     try:
-        driver.execute_script(
-            "arguments[0].scrollIntoView({block:'center'});", read_more
+        section = jd_heading.find_element(By.XPATH, "..")
+        # Measure, scroll and click in one round-trip (a script click needs no settling time)
+        length_before = driver.execute_script(
+            "var length = arguments[1].textContent.length;"
+            " arguments[0].scrollIntoView({block:'center'}); arguments[0].click();"
+            " return length;",
+            read_more, section
         )
-        time.sleep(0.4)
-        driver.execute_script("arguments[0].click();", read_more)
-        time.sleep(0.6)
     except Exception:
-        pass
+        return
+
+    timed_wait(driver, "jd_expand", JD_EXPAND_TIMEOUT, jd_expanded(section, length_before, read_more))
 
 
 # ---------------- JOB DESCRIPTION ---------------- #
@@ -220,78 +206,7 @@ def extract_job_description(driver):
     and extracting meaningful content before it while filtering metadata.
     """
     try:
-        body_text = driver.find_element(By.TAG_NAME, "body").text
-        
-        if not body_text:
-            return None
-        
-        # Find where "Key Skills" appears (case-insensitive)
-        key_skills_lower = body_text.lower().find('key skills')
-        preferred_keyskills_lower = body_text.lower().find('preferred keyskills')
-        
-        # Use whichever comes first
-        cutoff = None
-        if key_skills_lower >= 0 and preferred_keyskills_lower >= 0:
-            cutoff = min(key_skills_lower, preferred_keyskills_lower)
-        elif key_skills_lower >= 0:
-            cutoff = key_skills_lower
-        elif preferred_keyskills_lower >= 0:
-            cutoff = preferred_keyskills_lower
-        
-        # Extract text before Key Skills
-        if cutoff is not None:
-            text_before_skills = body_text[:cutoff]
-        else:
-            text_before_skills = body_text
-        
-        # Split into lines and filter
-        lines = [line.strip() for line in text_before_skills.split('\n') if line.strip()]
-        
-        # Metadata keywords to skip (these are job posting structure, not description)
-        metadata_keywords = {
-            'role:', 'industry type:', 'department:', 'employment type:',
-            'role category:', 'education', 'ug:', 'pg:', 'doctorate:',
-            'skills:', 'experience', 'skills highlighted', 'are preferred',
-            'skills required:', 'basic qualifications:', 'preferred qualifications:',
-            'beware of imposters', 'about the company', 'salary insights',
-            'reviews', 'posted:', 'applicants:', 'company:',
-            'read more', 'share', 'home', 'about us', 'careers'
-        }
-        
-        # Filter lines: keep only meaningful content
-        description_lines = []
-        for line in lines:
-            line_lower = line.lower()
-            
-            # Skip metadata lines
-            if any(keyword in line_lower for keyword in metadata_keywords):
-                continue
-            
-            # Skip very short lines (< 20 chars)
-            if len(line) < 20:
-                continue
-            
-            # Skip lines that are mostly special characters or punctuation
-            if not any(c.isalnum() for c in line):
-                continue
-            
-            # Skip lines that are just numbers, dates, or navigation text
-            if line_lower in {'home', 'apply', 'read all', 'connect with us', 
-                             'security guidelines', 'terms and conditions',
-                             'terms & conditions', 'privacy policy', 'fraud alert',
-                             'trust & safety'}:
-                continue
-            
-            description_lines.append(line)
-        
-        # Join lines and return if long enough
-        jd = " ".join(description_lines).strip()
-        
-        # Clean up multiple spaces
-        jd = " ".join(jd.split())
-        
-        return jd if len(jd) > 150 else None
-
+        return job_description_from_body(driver.find_element(By.TAG_NAME, "body").text)
     except Exception:
         return None
 
@@ -334,33 +249,15 @@ def _is_valid_description_block(text):
 
 def extract_key_skills(driver):
     try:
-        headings = driver.find_elements(
-            By.XPATH,
-            "//*[contains(translate(text(),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'key skills')]"
-        )
-
-        skills = []
-        # Noise words to filter out
-        noise_words = {
-            'read more', 'home', 'security guidelines', 'terms and conditions',
-            'connect with us', 'about us', 'careers', 'employer', 'sitemap',
-            'credits', 'help center', 'summons', 'notices', 'grievances',
-            'report issue', 'privacy policy', 'fraud alert', 'trust & safety',
-            'hyderabad', 'reviews', 'website', 'employee', 'naukri'
-        }
+        headings = driver.find_elements(By.XPATH, KEY_SKILLS_HEADING_XPATH)
 
         for h in headings:
             anchors = h.find_elements(By.XPATH, "following::a")
-            for a in anchors:
-                txt = a.text.strip()
-                if 1 < len(txt) < 40 and txt.lower() not in noise_words:
-                    skills.append(txt)
+            skills = key_skills_from_anchor_texts(a.text for a in anchors)
             if skills:
-                break
+                return format_key_skills(skills)
 
-        # Return unique skills, filtered
-        unique_skills = list(dict.fromkeys(skills))[:15]  # Limit to 15 skills
-        return ", ".join(unique_skills) if unique_skills else None
+        return None
 
     except Exception:
         return None
@@ -375,126 +272,288 @@ def extract_metadata_block(driver):
         return ""
 
 
-def parse_job_metadata(text):
-    data = {
-        "company": None,
-        "location": None,
-        "experience": None,
-        "salary": None,
-        "posted_time": None,
-        "applicants": None
-    }
+# ---------------- SINGLE JOB ---------------- #
 
-    if not text:
-        return data
-
-    # Company (usually near top)
-    comp = re.search(r'Company\s*:\s*(.+)', text)
-    if comp:
-        data["company"] = comp.group(1).strip()
-
-    # Experience
-    exp = re.search(r'(\d+\s*-\s*\d+\s*years|\d+\+\s*years)', text, re.I)
-    if exp:
-        data["experience"] = exp.group()
-
-    # Location
-    loc = re.search(
-        r'\b(Hyderabad|Bengaluru|Bangalore|Chennai|Mumbai|Pune|Delhi|Gurgaon|Noida|Remote|Hybrid)\b',
-        text,
-        re.I
-    )
-    if loc:
-        data["location"] = loc.group()
-
-    # Salary
-    sal = re.search(r'₹\s*[\d.,]+\s*(Lacs|Lakhs|LPA)?|Not Disclosed', text, re.I)
-    if sal:
-        data["salary"] = sal.group()
-
-    # Posted time
-    post = re.search(r'Posted\s*:\s*([^\n|]+)', text, re.I)
-    if post:
-        data["posted_time"] = post.group(1).strip()
-
-    # Applicants
-    app = re.search(r'Applicants\s*:\s*(\d+\+?)', text, re.I)
-    if app:
-        data["applicants"] = app.group(1)
-
-    return data
-
-
-# ---------------- MAIN SCRAPER ---------------- #
-
-def scrape_job_details():
-    urls_df = pd.read_csv("data/raw/job_urls.csv")
-    driver = get_driver()
-    records = []
+def load_job_page(driver, job_url):
+    driver.get(job_url)
+    if is_block_page(driver.title):
+        raise Throttled(job_url, "blocked")
 
-    for idx, row in urls_df.iterrows():
-        job_url = row["job_url"]
-        print(f"[{idx+1}/{len(urls_df)}] Scraping job detail")
 
-        try:
-            driver.get(job_url)
+def scrape_job(driver, row, rate_limiter, cache=None):
+    job_url = row["job_url"]
+
+    # The scheduler paces the page load and adapts to its latency and block pages
+    rate_limiter.request(job_url, load_job_page, driver, job_url)
+
+    # driver.get returns once the DOM is ready; give a client-rendered header a moment
+    with phase("header_wait"):
+        timed_wait(driver, "detail_header", DETAIL_HEADER_TIMEOUT,
+                   EC.presence_of_element_located((By.TAG_NAME, "h1")))
+
+    with phase("expand"):
+        expand_job_description_only(driver)
+
+    # One round-trip for the whole page; every field is parsed locally
+    with phase("page_source"):
+        html = driver.page_source
+    if memory_due():
+        memory = process_tree_memory(driver_pid(driver))
+        annotate(browser_mb=round(memory / 2**20, 1) if memory else None)
+    if cache is not None:
+        with phase("cache_put"):
+            cache.put(job_url, html, "selenium")
+    return parse_job_page(html, job_url, src_company=row.get("company"))
+
+
+# ---------------- FETCHERS ---------------- #
 
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
+class SeleniumFetcher:
+    """
+    Fetch job pages in a browser from a DriverPool. Without a shared pool
+    the fetcher keeps its own single-session pool, started on first use.
+    Pages are stored in `cache` (a PageCache) when one is given.
+    """
+
+    name = "selenium"
 
-            human_delay(DELAY_RANGE)
+    def __init__(self, driver_factory=get_driver, pool=None, cache=None):
+        self.owns_pool = pool is None
+        self.pool = DriverPool(size=1, driver_factory=driver_factory, prewarm=False) if pool is None else pool
+        self.cache = cache
+        self.counts = Counter()
 
-            expand_job_description_only(driver)
+    def fetch(self, row, rate_limiter):
+        self.counts[self.name] += 1
+        annotate(fetch_path=self.name)
+        return self.pool.run(scrape_job, row, rate_limiter, self.cache)
 
-            # Prefer company name from the source CSV (more reliable), fall back to extractor
+    def close(self):
+        if self.owns_pool:
+            self.pool.close()
+
+
+def make_fetcher(kind, driver_factory=get_driver, pool=None, cache=None):
+    """
+    A fetcher of the given kind. With a PageCache every fetched page is
+    stored in it, and pages cached within CACHE_REUSE_HOURS are not re-fetched.
+    """
+    if kind == "selenium":
+        fetcher = SeleniumFetcher(driver_factory, pool, cache)
+    elif kind == "http":
+        fetcher = HttpFetcher(fallback=SeleniumFetcher(driver_factory, pool, cache), cache=cache)
+    else:
+        raise ValueError(f"Unknown fetcher: {kind}")
+    return fetcher if cache is None else CachedFetcher(fetcher, cache, CACHE_REUSE_HOURS * 3600)
+
+
+# ---------------- WORKER POOL ---------------- #
+
+def _scrape_chunk(chunk, total, rate_limiter, fetcher_factory, state=None, metrics=None, send_back=False):
+    """
+    Scrape a list of (idx, row) pairs with one fetcher, returning the
+    (idx, record) pairs, how many pages took each fetch path and, with
+    `send_back` (in a worker process), the waits and page metrics recorded.
+    Outcomes are recorded in the state store as they happen, if one is given.
+    """
+    fetcher = fetcher_factory()
+    metrics = metrics if metrics is not None else PageMetrics()
+    results = []
+
+    try:
+        for idx, row in chunk:
+            print(f"[{idx+1}/{total}] Scraping job detail")
             try:
-                src_company = row.get("company") if hasattr(row, 'get') else row["company"]
-            except Exception:
-                src_company = None
-
-            company = src_company if pd.notna(src_company) and str(src_company).strip() else extract_company(driver)
-            location = extract_location(driver)
-            experience = extract_experience(driver)
-            salary = extract_salary(driver)
-
-            # Fallback: parse from metadata block if any field is missing
-            meta_text = extract_metadata_block(driver)
-            meta = parse_job_metadata(meta_text)
-            company = company or meta["company"]
-            location = location or meta["location"]
-            experience = experience or meta["experience"]
-            salary = salary or meta["salary"]
-            posted_time = meta["posted_time"]
-            applicants = meta["applicants"]
-
-            job_data = {
-                "job_title": safe_text(driver, By.TAG_NAME, "h1"),
-                "company": company,
-                "location": location,
-                "experience": experience,
-                "salary": salary,
-                "posted_time": posted_time,
-                "applicants": applicants,
-                "job_description": extract_job_description(driver),
-                "key_skills": extract_key_skills(driver),
-                "job_url": job_url
-            }
-
-            records.append(job_data)
-
-        except Exception as e:
-            print(f"❌ Failed for {job_url}: {e}")
-            continue
+                with metrics.page(row["job_url"]) as page:
+                    record = fetcher.fetch(row, rate_limiter)
+                    page.done(record)
+            except Exception as e:
+                print(f"❌ Failed for {row['job_url']}: {e}")
+                if state is not None:
+                    state.mark_failed(row["job_url"], e)
+                continue
+
+            results.append((idx, record))
+            if state is not None:
+                state.mark_done(row["job_url"], record)
+    finally:
+        fetcher.close()
+        if state is not None:
+            state.close()
+        if send_back:
+            metrics.close()
+
+    if send_back:
+        return results, fetcher.counts, WAITS.drain(), metrics.drain()
+    return results, fetcher.counts, ([], None), []
+
+
+def scrape_job_details(urls_df=None, workers=WORKERS, mode=POOL_MODE, fetcher=FETCHER,
+                       rate=HOST_RATE, burst=HOST_BURST, driver_factory=get_driver,
+                       state_path=None, cache_path=None, politeness=POLITENESS,
+                       metrics_path=None, metrics_port=None):
+    """
+    Scrape every URL in urls_df with a pool of `workers` fetchers.
+
+    The URL list is split round-robin between workers, which run as threads
+    or processes (`mode`). Politeness is enforced by one scheduler shared by
+    all workers: adaptive, or a per-host token bucket of `rate`
+    (`politeness`). Records come back in the order of urls_df; the number
+    of pages per fetch path is kept in df.attrs["fetch_paths"].
+
+    With `state_path`, progress is kept in a UrlStateStore: only new, stale or
+    retry-due URLs are fetched, and the result also includes the stored
+    records of URLs that were already done.
+
+    With `cache_path`, every fetched page is also kept in a PageCache, so the
+    extractors can be re-run over it later with replay_job_details.
+
+    Every page is profiled (metrics.py): per-phase times, fields extracted
+    and browser memory go to `metrics_path` (JSONL), are served in the
+    Prometheus format on `metrics_port`, and are summarised at the end.
+    """
+    if urls_df is None:
+        urls_df = load_dataset("job_urls")
+
+    state = None
+    rows = urls_df.to_dict("records")
+    if state_path:
+        state = UrlStateStore(state_path, fresh_days=FRESH_DAYS, checkpoint_every=CHECKPOINT_EVERY,
+                              max_attempts=MAX_ATTEMPTS, backoff_base=RETRY_BACKOFF)
+        todo = set(state.pending(urls_df["job_url"]))
+        print(f"{len(todo)} of {len(rows)} URLs need fetching")
+        rows = [row for row in rows if row["job_url"] in todo]
+
+    rows = list(enumerate(rows))
+    workers = max(1, min(workers, len(rows)))
+    chunks = [rows[i::workers] for i in range(workers)]
+
+    pool = None
+    if mode == "process":
+        # Browsers cannot be shared between processes: every worker keeps its own
+        manager = multiprocessing.Manager()
+        rate_limiter = make_rate_limiter(politeness, rate, burst, manager)
+        executor = ProcessPoolExecutor(max_workers=workers)
+    elif mode == "thread":
+        manager = None
+        rate_limiter = make_rate_limiter(politeness, rate, burst)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        # One pool for all worker threads, warmed up front when every page needs a browser
+        pool = DriverPool(workers, driver_factory=driver_factory, prewarm=fetcher == "selenium" and bool(rows))
+    else:
+        raise ValueError(f"Unknown pool mode: {mode}")
+    cache = PageCache(cache_path) if cache_path else None
+    fetcher_factory = partial(make_fetcher, fetcher, driver_factory, pool, cache)
+    metrics = PageMetrics(metrics_path)
+    endpoint = serve_metrics(metrics, metrics_port) if metrics_port else None
+
+    results = []
+    fetch_paths = Counter()
+    try:
+        with executor:
+            futures = [
+                executor.submit(_scrape_chunk, chunk, len(rows), rate_limiter, fetcher_factory, state,
+                                metrics, mode == "process")
+                for chunk in chunks if chunk
+            ]
+            for f in futures:
+                chunk_results, counts, waits, pages = f.result()
+                results.extend(chunk_results)
+                fetch_paths.update(counts)
+                WAITS.extend(*waits)
+                metrics.extend(pages)
+    finally:
+        metrics.close()
+        if endpoint is not None:
+            endpoint.shutdown()
+        if rows:
+            print(rate_limiter.summary())
+            print(WAITS.summary())
+            print(metrics.summary())
+        if manager is not None:
+            manager.shutdown()
+        if pool is not None:
+            if pool.counts["started"]:
+                print(f"✅ {pool.summary()}")
+            pool.close()
+
+    if state is not None:
+        records = state.records(urls_df["job_url"])
+        print("URL state: " + ", ".join(f"{k}={v}" for k, v in sorted(state.counts().items())))
+        state.close()
+    else:
+        results.sort(key=lambda pair: pair[0])
+        records = [record for _, record in results]
+
+    df = pd.DataFrame(records)
+    df.attrs["fetch_paths"] = dict(fetch_paths)
+
+    if fetch_paths:
+        print("Fetch paths: " + ", ".join(f"{k}={v}" for k, v in sorted(fetch_paths.items())))
+    return df
+
+
+def replay_job_details(urls_df=None, cache_path=PAGE_CACHE):
+    """
+    Re-run the extractors over the cached pages of urls_df, with no network.
+
+    Every URL is parsed from its latest cached page by the parser of the
+    fetch path that stored it; URLs with no page in the cache are skipped
+    and counted as "missing" in df.attrs["fetch_paths"].
+    """
+    if urls_df is None:
+        urls_df = load_dataset("job_urls")
+
+    cache = PageCache(cache_path)
+    records = []
+    fetch_paths = Counter()
+    start = time.perf_counter()
+    try:
+        for row in urls_df.to_dict("records"):
+            page = cache.get(row["job_url"])
+            if page is None:
+                fetch_paths["missing"] += 1
+                continue
+            records.append(parse_cached_page(page, src_company=row.get("company")))
+            fetch_paths[f"replay_{page.source}"] += 1
+    finally:
+        cache.close()
 
-    driver.quit()
-    return pd.DataFrame(records)
+    df = pd.DataFrame(records)
+    df.attrs["fetch_paths"] = dict(fetch_paths)
+    print(f"Replayed {len(records)} cached pages in {time.perf_counter() - start:.1f}s: "
+          + ", ".join(f"{k}={v}" for k, v in sorted(fetch_paths.items())))
+    return df
 
 
 # ---------------- RUN ---------------- #
 
 if __name__ == "__main__":
-    df = scrape_job_details()
-    os.makedirs("data/processed", exist_ok=True)
-    df.to_csv("data/processed/job_details.csv", index=False)
+    parser = argparse.ArgumentParser(description="Scrape Naukri job detail pages")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--mode", choices=["thread", "process"], default=POOL_MODE)
+    parser.add_argument("--fetcher", choices=["selenium", "http"], default=FETCHER)
+    parser.add_argument("--politeness", choices=["adaptive", "fixed"], default=POLITENESS)
+    parser.add_argument("--state", default=STATE_DB, help="URL state store (SQLite) for resumable runs")
+    parser.add_argument("--no-state", action="store_true", help="fetch every URL and keep no state")
+    parser.add_argument("--cache", default=PAGE_CACHE, help="raw page cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="do not store fetched pages")
+    parser.add_argument("--replay", action="store_true",
+                        help="re-run the extractors over the cached pages instead of fetching")
+    parser.add_argument("--wait-log", help="CSV file to write the time of every page wait to")
+    parser.add_argument("--metrics", default=METRICS_LOG, help="JSONL file of per-page phase times and fields")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while scraping")
+    args = parser.parse_args()
+
+    if args.replay:
+        df = replay_job_details(cache_path=args.cache)
+    else:
+        df = scrape_job_details(workers=args.workers, mode=args.mode, fetcher=args.fetcher,
+                                politeness=args.politeness,
+                                state_path=None if args.no_state else args.state,
+                                cache_path=None if args.no_cache else args.cache,
+                                metrics_path=args.metrics, metrics_port=args.metrics_port)
+        if args.wait_log:
+            WAITS.to_frame().to_csv(args.wait_log, index=False)
+    save_dataset(df, "job_details")
     print(f"✅ Saved {len(df)} job detail records")
@@ -0,0 +1,287 @@
+"""
+Per-page profiling of the detail scraper.
+
+Every page fetched inside `PageMetrics.page(job_url)` gets a record of how
+long each phase took (politeness delay, navigation, waits, reading the page
+source, HTML parsing and every field extractor), which fields came back
+empty, the fetch path and, every METRICS_MEMORY_EVERY pages, the memory of
+the browser that loaded it. Code along the fetch path marks its phases with
+`with phase("name"):`, which does nothing outside a page.
+
+Records are appended to a JSONL file as pages finish, summarised as
+p50/p95 per phase and null rate per field, and can be served in the
+Prometheus text format (serve_metrics).
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from config import METRICS_MEMORY_EVERY, METRICS_WINDOW
+
+_current = threading.local()
+
+
+# ---------------- PHASES ---------------- #
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to `name` on the page being fetched by this thread."""
+    page = getattr(_current, "page", None)
+    if page is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        page.phases[name] = page.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def annotate(**values):
+    """Set fields (fetch_path, browser_mb) on the page being fetched by this thread."""
+    page = getattr(_current, "page", None)
+    if page is not None:
+        page.extra.update(values)
+
+
+def memory_due():
+    """True on every METRICS_MEMORY_EVERY-th page of this thread (the first included)."""
+    page = getattr(_current, "page", None)
+    if page is None:
+        return False
+    _current.pages = getattr(_current, "pages", 0) + 1
+    return (_current.pages - 1) % METRICS_MEMORY_EVERY == 0
+
+
+class PageRecord:
+
+    def __init__(self, job_url):
+        self.job_url = job_url
+        self.started_at = time.time()
+        self.phases = {}
+        self.fields = {}
+        self.extra = {}
+        self.error = None
+
+    def done(self, record):
+        """Note which fields of the extracted record are filled."""
+        self.fields = {k: v is not None and v == v and str(v).strip() != ""
+                       for k, v in record.items() if k != "job_url"}
+
+    def to_dict(self, seconds):
+        return {
+            "job_url": self.job_url, "ts": round(self.started_at, 3), "ok": self.error is None,
+            "error": self.error, "seconds": round(seconds, 4), **self.extra,
+            "phases": {k: round(v, 6) for k, v in self.phases.items()}, "fields": self.fields,
+        }
+
+
+# ---------------- RECORDER ---------------- #
+
+class PageMetrics:
+    """
+    Records of the pages fetched, written to `path` (JSONL) when given.
+
+    Thread-safe. Picklable for worker processes, which append to the same
+    file and send their records back with drain(). Quantiles are computed
+    over the last `window` pages; counts and sums cover the whole run.
+    """
+
+    def __init__(self, path=None, window=METRICS_WINDOW):
+        self.path = path
+        self.window = window
+        self._init()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _init(self):
+        self._lock = threading.Lock()
+        self._file = None
+        self._recent = deque(maxlen=self.window)
+        self._pending = []
+        self.pages = Counter()
+        self.phase_sums = Counter()
+        self.phase_counts = Counter()
+        self.field_nulls = Counter()
+        self.field_counts = Counter()
+        self.browser_bytes = None
+
+    def __getstate__(self):
+        return {"path": self.path, "window": self.window}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+    @contextmanager
+    def page(self, job_url):
+        """Profile the fetch of one page; exceptions are recorded and re-raised."""
+        page = PageRecord(job_url)
+        _current.page = page
+        start = time.perf_counter()
+        try:
+            yield page
+        except Exception as e:
+            page.error = str(e)[:200]
+            raise
+        finally:
+            _current.page = None
+            self.record(page.to_dict(time.perf_counter() - start))
+
+    def record(self, rec, pending=True):
+        with self._lock:
+            self._recent.append(rec)
+            if pending:
+                self._pending.append(rec)
+            self.pages[(rec.get("fetch_path") or "none", rec["ok"])] += 1
+            for name, seconds in rec["phases"].items():
+                self.phase_sums[name] += seconds
+                self.phase_counts[name] += 1
+            for field, filled in rec["fields"].items():
+                self.field_counts[field] += 1
+                self.field_nulls[field] += not filled
+            if rec.get("browser_mb") is not None:
+                self.browser_bytes = rec["browser_mb"] * 2**20
+
+            if self.path and pending:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(json.dumps(rec) + "\n")
+                self._file.flush()
+
+    def drain(self):
+        """Records since the last drain (to send them from a worker process)."""
+        with self._lock:
+            records, self._pending = self._pending, []
+        return records
+
+    def extend(self, records):
+        """Add records drained from a worker process (already written to the file)."""
+        for rec in records:
+            self.record(rec, pending=False)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ---------------- REPORTS ---------------- #
+
+    def phase_frame(self):
+        """p50/p95/mean milliseconds per phase over the recent pages, and its share of all page time."""
+        with self._lock:
+            recent = list(self._recent)
+        rows = [(name, seconds) for rec in recent for name, seconds in rec["phases"].items()]
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=["phase", "seconds"])
+        ms = (df["seconds"] * 1000).groupby(df["phase"])
+        total = sum(rec["seconds"] for rec in recent)
+        out = pd.DataFrame({
+            "pages": ms.size(),
+            "p50_ms": ms.quantile(0.5).round(1),
+            "p95_ms": ms.quantile(0.95).round(1),
+            "mean_ms": ms.mean().round(1),
+            "share": (df["seconds"].groupby(df["phase"]).sum() / total).round(3) if total else 0.0,
+        })
+        return out.sort_values("share", ascending=False)
+
+    def field_frame(self):
+        with self._lock:
+            fields = sorted(self.field_counts)
+            return pd.DataFrame({
+                "pages": [self.field_counts[f] for f in fields],
+                "null_rate": [round(self.field_nulls[f] / self.field_counts[f], 3) for f in fields],
+            }, index=pd.Index(fields, name="field"))
+
+    def summary(self):
+        with self._lock:
+            pages = dict(self.pages)
+            memory = [rec["browser_mb"] for rec in self._recent if rec.get("browser_mb") is not None]
+        if not pages:
+            return "Page metrics: no pages recorded"
+
+        lines = ["Page metrics: " + ", ".join(
+            f"{path} {'ok' if ok else 'failed'}={n}" for (path, ok), n in sorted(pages.items()))]
+        lines += ["", self.phase_frame().to_string(), "", self.field_frame().to_string()]
+        if memory:
+            lines.append(f"\nBrowser memory: p50 {pd.Series(memory).median():.0f} MB, max {max(memory):.0f} MB")
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            recent = list(self._recent)
+            pages = dict(self.pages)
+            sums, counts = dict(self.phase_sums), dict(self.phase_counts)
+            nulls, fields = dict(self.field_nulls), dict(self.field_counts)
+            browser_bytes = self.browser_bytes
+
+        lines = [
+            "# HELP scraper_pages_total Job pages fetched, by fetch path and outcome.",
+            "# TYPE scraper_pages_total counter",
+        ]
+        lines += [f'scraper_pages_total{{path="{path}",ok="{str(ok).lower()}"}} {n}'
+                  for (path, ok), n in sorted(pages.items())]
+
+        lines += [
+            "# HELP scraper_phase_seconds Time per page spent in each phase (quantiles over recent pages).",
+            "# TYPE scraper_phase_seconds summary",
+        ]
+        by_phase = {}
+        for rec in recent:
+            for name, seconds in rec["phases"].items():
+                by_phase.setdefault(name, []).append(seconds)
+        for name in sorted(sums):
+            values = pd.Series(by_phase.get(name, [0.0]))
+            for q in (0.5, 0.95):
+                lines.append(f'scraper_phase_seconds{{phase="{name}",quantile="{q}"}} {values.quantile(q):.6f}')
+            lines.append(f'scraper_phase_seconds_sum{{phase="{name}"}} {sums[name]:.6f}')
+            lines.append(f'scraper_phase_seconds_count{{phase="{name}"}} {counts[name]}')
+
+        lines += [
+            "# HELP scraper_field_null_ratio Share of pages where the field was not extracted.",
+            "# TYPE scraper_field_null_ratio gauge",
+        ]
+        lines += [f'scraper_field_null_ratio{{field="{f}"}} {nulls[f] / fields[f]:.4f}' for f in sorted(fields)]
+
+        if browser_bytes is not None:
+            lines += [
+                "# HELP scraper_browser_memory_bytes Memory (PSS) of the last sampled browser process tree.",
+                "# TYPE scraper_browser_memory_bytes gauge",
+                f"scraper_browser_memory_bytes {browser_bytes:.0f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+# ---------------- ENDPOINT ---------------- #
+
+def serve_metrics(metrics, port, host="127.0.0.1"):
+    """Serve metrics.prometheus() at http://host:port/metrics from a daemon thread; returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,250 @@
+"""
+On-disk cache of the raw job pages the detail scraper fetched.
+
+Every fetched page is stored compressed under (job_url, fetch date), so the
+extractors can be re-run over the cache with no network (replay) and a page
+fetched again the same day is parsed from disk. Bodies are stored once per
+content hash: a page that did not change between fetch dates costs no
+extra space. Pages older than the TTL are dropped, and the oldest pages go
+first when the cache grows past its size limit.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+from config import PAGE_CACHE, CACHE_TTL_DAYS, CACHE_MAX_MB
+from http_fetcher import parse_embedded_job
+from metrics import annotate, phase
+from page_parser import parse_job_page
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    job_url TEXT NOT NULL,
+    fetch_date TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (job_url, fetch_date)
+);
+CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at);
+CREATE TABLE IF NOT EXISTS bodies (
+    content_hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+"""
+
+
+def fetch_date(fetched_at):
+    return time.strftime("%Y-%m-%d", time.gmtime(fetched_at))
+
+
+class CachedPage:
+    def __init__(self, job_url, html, source, fetched_at):
+        self.job_url = job_url
+        self.html = html
+        self.source = source
+        self.fetched_at = fetched_at
+
+
+class PageCache:
+    """
+    SQLite-backed page cache; bodies are zlib-compressed blobs.
+
+    Safe to share between worker threads and processes like UrlStateStore:
+    every thread opens its own connection. Each put is its own short
+    transaction, and expired or excess pages are evicted every
+    `evict_every` puts and on close.
+    """
+
+    def __init__(self, path=PAGE_CACHE, ttl_days=CACHE_TTL_DAYS, max_mb=CACHE_MAX_MB,
+                 level=6, evict_every=200):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_bytes = max_mb * 1024 * 1024
+        self.level = level
+        self.evict_every = evict_every
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+            self._local.puts = 0
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._local.puts:
+                self.evict()
+            conn.close()
+            self._local.conn = None
+
+    # ---------------- PAGES ---------------- #
+
+    def put(self, job_url, html, source, fetched_at=None):
+        """Store a fetched page; a later fetch of the same URL on the same date replaces it."""
+        fetched_at = fetched_at or time.time()
+        raw = html.encode("utf-8")
+        digest = hashlib.sha1(raw).hexdigest()
+        conn = self._conn()
+
+        with conn:
+            exists = conn.execute("SELECT 1 FROM bodies WHERE content_hash = ?", (digest,)).fetchone()
+            if not exists:
+                body = zlib.compress(raw, self.level)
+                conn.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?, ?)", (digest, len(body), body))
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (job_url, fetch_date(fetched_at), fetched_at, source, digest),
+            )
+
+        self._local.puts += 1
+        if self._local.puts % self.evict_every == 0:
+            self.evict()
+        return digest
+
+    def get(self, job_url, max_age=None, now=None):
+        """Latest cached page of job_url within the TTL (and max_age seconds, if given), or None."""
+        now = now or time.time()
+        oldest = now - min(self.ttl, max_age if max_age is not None else self.ttl)
+        row = self._conn().execute(
+            """
+            SELECT p.fetched_at, p.source, b.body FROM pages p JOIN bodies b USING (content_hash)
+            WHERE p.job_url = ? AND p.fetched_at >= ?
+            ORDER BY p.fetched_at DESC LIMIT 1
+            """,
+            (job_url, oldest),
+        ).fetchone()
+        if row is None:
+            return None
+        fetched_at, source, body = row
+        return CachedPage(job_url, zlib.decompress(body).decode("utf-8"), source, fetched_at)
+
+    def urls(self):
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT job_url FROM pages ORDER BY job_url")]
+
+    # ---------------- EVICTION ---------------- #
+
+    def evict(self, now=None):
+        """Drop pages past the TTL, then the oldest pages until the bodies fit in max_bytes."""
+        now = now or time.time()
+        conn = self._conn()
+        with conn:
+            expired = conn.execute("DELETE FROM pages WHERE fetched_at < ?", (now - self.ttl,)).rowcount
+            removed = self._drop_orphans(conn)
+
+            size = self._size(conn)
+            while size > self.max_bytes:
+                # a tenth of the remaining pages per round keeps the number of rounds small
+                count = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+                if not count:
+                    break
+                expired += conn.execute(
+                    "DELETE FROM pages WHERE rowid IN (SELECT rowid FROM pages ORDER BY fetched_at LIMIT ?)",
+                    (max(1, count // 10),),
+                ).rowcount
+                removed += self._drop_orphans(conn)
+                size = self._size(conn)
+        return expired, removed
+
+    @staticmethod
+    def _drop_orphans(conn):
+        return conn.execute(
+            "DELETE FROM bodies WHERE content_hash NOT IN (SELECT content_hash FROM pages)"
+        ).rowcount
+
+    @staticmethod
+    def _size(conn):
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def stats(self):
+        conn = self._conn()
+        pages, urls, oldest, newest = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT job_url), MIN(fetched_at), MAX(fetched_at) FROM pages"
+        ).fetchone()
+        bodies, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bodies").fetchone()
+        return {
+            "pages": pages, "urls": urls, "bodies": bodies, "mb": round(size / 1024 / 1024, 2),
+            "oldest": fetch_date(oldest) if oldest else None, "newest": fetch_date(newest) if newest else None,
+        }
+
+
+# ---------------- EXTRACTION ---------------- #
+
+def parse_cached_page(page, src_company=None):
+    """The record the fetch path that stored the page would have extracted from it."""
+    if page.source == "http":
+        record = parse_embedded_job(page.html, page.job_url, src_company=src_company)
+        if record is not None:
+            return record
+    return parse_job_page(page.html, page.job_url, src_company=src_company)
+
+
+class CachedFetcher:
+    """
+    Wrap a fetcher (whose fetch paths store the pages they get in `cache`)
+    so that a page cached less than `max_age` seconds ago is parsed from
+    the cache instead of fetched again.
+    """
+
+    def __init__(self, fetcher, cache, max_age):
+        self.fetcher = fetcher
+        self.cache = cache
+        self.max_age = max_age
+        self.hits = Counter()
+
+    @property
+    def counts(self):
+        return self.fetcher.counts + self.hits
+
+    def fetch(self, row, rate_limiter):
+        with phase("cache_get"):
+            page = self.cache.get(row["job_url"], max_age=self.max_age)
+        if page is not None:
+            self.hits["cache"] += 1
+            annotate(fetch_path="cache")
+            return parse_cached_page(page, src_company=row.get("company"))
+        return self.fetcher.fetch(row, rate_limiter)
+
+    def close(self):
+        self.fetcher.close()
+        self.cache.close()
+
+
+# ---------------- RUN ---------------- #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and evict the raw page cache")
+    parser.add_argument("--path", default=PAGE_CACHE)
+    parser.add_argument("--evict", action="store_true", help="drop expired pages and trim to the size limit")
+    args = parser.parse_args()
+
+    cache = PageCache(args.path)
+    if args.evict:
+        expired, removed = cache.evict()
+        print(f"✅ Evicted {expired} pages ({removed} bodies)")
+    print(", ".join(f"{k}={v}" for k, v in cache.stats().items()))
+    cache.close()
@@ -0,0 +1,487 @@
+"""
+Single-pass parser for Naukri job detail pages.
+
+The page is captured once (driver.page_source) and every field is extracted
+locally from one lxml tree, instead of one WebDriver round-trip per selector.
+The selectors and fallbacks mirror the Selenium extractors in
+job_details_scraper.py, and element text follows Selenium's visible-text rules
+closely enough to give the same output (see verify_page_parser.py).
+"""
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+import pandas as pd
+
+from metrics import phase
+from text_parsing import (
+    ALNUM, APPLICANTS_META, COMPANY_META, COMPANY_NOISE, EXPERIENCE_BODY, KEY_SKILLS_MARKER,
+    LOCATION_META, POSTED_META, SALARY_BODY, SALARY_META, SALARY_RANGE_WORD, SALARY_WORD,
+    keyword_matcher, lines_before, lowercase_view,
+)
+
+
+# ---------------- VISIBLE TEXT ---------------- #
+
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "dd", "details", "dialog",
+    "div", "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "html", "li", "main",
+    "nav", "ol", "p", "pre", "section", "summary", "table", "tbody", "td",
+    "tfoot", "th", "thead", "tr", "ul",
+}
+
+SKIP_TAGS = {"head", "script", "style", "noscript", "template", "title", "meta", "link"}
+
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+
+def _is_hidden(el):
+    return el.get("hidden") is not None or bool(HIDDEN_STYLE.search(el.get("style") or ""))
+
+
+def _collect_text(el, parts):
+    tag = el.tag if isinstance(el.tag, str) else None
+    if tag is None or tag in SKIP_TAGS or _is_hidden(el):
+        return
+
+    block = tag in BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if tag == "br":
+        parts.append("\n")
+    if el.text:
+        parts.append(el.text)
+
+    for child in el:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+    if block:
+        parts.append("\n")
+
+
+def visible_text(el):
+    """Rendered text of an element, one line per block, whitespace collapsed (like WebElement.text)."""
+    parts = []
+    _collect_text(el, parts)
+    raw = "".join(parts).replace("\xa0", " ")
+    lines = (" ".join(line.split()) for line in raw.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+# ---------------- TEXT HELPERS (shared with Selenium extractors) ---------------- #
+
+def clean_company_text(text):
+    """Company name from a candidate element text, or None."""
+    if text and len(text) < 100:
+        # Remove review ratings and extra text
+        company = text.split('\n')[0].strip()
+        company = COMPANY_NOISE.sub('', company).strip()
+        if company and len(company) > 1:
+            return company
+    return None
+
+
+def salary_from_candidates(candidates):
+    """First salary-looking line among texts found next to a 'salary' label."""
+    for c in candidates:
+        if not c:
+            continue
+        # split lines and examine each
+        for part in [p.strip() for p in str(c).splitlines() if p.strip()]:
+            low = part.lower()
+            # prefer explicit salary formats
+            if SALARY_WORD.search(low):
+                # ensure part is not just experience
+                if 'year' in low or 'yrs' in low:
+                    continue
+                return part
+            # capture numeric range with Lacs following
+            m = SALARY_RANGE_WORD.search(low)
+            if m:
+                return m.group().strip()
+    return None
+
+
+def salary_from_element_text(text):
+    """Salary line inside an element whose class looks like salary/ctc/pay."""
+    for part in [p.strip() for p in (text or '').splitlines() if p.strip()]:
+        low = part.lower()
+        if SALARY_WORD.search(low) and 'year' not in low:
+            return part
+    return None
+
+
+def salary_from_body(body):
+    """Fallback: regex search in body for salary-like patterns, prefer Lacs/LPA over ranges of years."""
+    for s in SALARY_BODY.iter_matches(body):
+        if 'year' in s.lower():
+            continue
+        return s.strip()
+    return None
+
+
+def experience_from_body(body, low=None):
+    exp = EXPERIENCE_BODY.search(body, low)
+    return exp.group() if exp else None
+
+
+KEY_SKILL_NOISE = {
+    'read more', 'home', 'security guidelines', 'terms and conditions',
+    'connect with us', 'about us', 'careers', 'employer', 'sitemap',
+    'credits', 'help center', 'summons', 'notices', 'grievances',
+    'report issue', 'privacy policy', 'fraud alert', 'trust & safety',
+    'hyderabad', 'reviews', 'website', 'employee', 'naukri'
+}
+
+
+def key_skills_from_anchor_texts(texts):
+    skills = []
+    for txt in texts:
+        txt = txt.strip()
+        if 1 < len(txt) < 40 and txt.lower() not in KEY_SKILL_NOISE:
+            skills.append(txt)
+    return skills
+
+
+def format_key_skills(skills):
+    # Return unique skills, filtered
+    unique_skills = list(dict.fromkeys(skills))[:15]  # Limit to 15 skills
+    return ", ".join(unique_skills) if unique_skills else None
+
+
+# Metadata keywords to skip (these are job posting structure, not description)
+JD_METADATA_KEYWORDS = {
+    'role:', 'industry type:', 'department:', 'employment type:',
+    'role category:', 'education', 'ug:', 'pg:', 'doctorate:',
+    'skills:', 'experience', 'skills highlighted', 'are preferred',
+    'skills required:', 'basic qualifications:', 'preferred qualifications:',
+    'beware of imposters', 'about the company', 'salary insights',
+    'reviews', 'posted:', 'applicants:', 'company:',
+    'read more', 'share', 'home', 'about us', 'careers'
+}
+
+JD_NAVIGATION_LINES = {
+    'home', 'apply', 'read all', 'connect with us',
+    'security guidelines', 'terms and conditions',
+    'terms & conditions', 'privacy policy', 'fraud alert',
+    'trust & safety'
+}
+
+# every metadata keyword in one scan of the line
+JD_METADATA_MATCHER = keyword_matcher(JD_METADATA_KEYWORDS)
+
+
+def job_description_from_body(body_text):
+    """
+    Extract job description from the page body text: keep meaningful lines
+    before the 'Key Skills' marker and drop metadata/navigation lines.
+    """
+    if not body_text:
+        return None
+
+    # Lines before "Key Skills" / "Preferred Keyskills", whichever comes first (case-insensitive)
+    lines = lines_before(body_text, KEY_SKILLS_MARKER)
+
+    # Filter lines: keep only meaningful content
+    description_lines = []
+    for line, line_lower in lines:
+        # Skip very short lines (< 20 chars)
+        if len(line) < 20:
+            continue
+
+        # Skip metadata lines
+        if JD_METADATA_MATCHER.search(line_lower):
+            continue
+
+        # Skip lines that are mostly special characters or punctuation
+        if not ALNUM.search(line):
+            continue
+
+        # Skip lines that are just numbers, dates, or navigation text
+        if line_lower in JD_NAVIGATION_LINES:
+            continue
+
+        description_lines.append(line)
+
+    # Join lines and return if long enough
+    jd = " ".join(description_lines).strip()
+
+    # Clean up multiple spaces
+    jd = " ".join(jd.split())
+
+    return jd if len(jd) > 150 else None
+
+
+def parse_job_metadata(text):
+    data = {
+        "company": None,
+        "location": None,
+        "experience": None,
+        "salary": None,
+        "posted_time": None,
+        "applicants": None
+    }
+
+    if not text:
+        return data
+
+    # one lowercase copy for every case-insensitive pattern
+    low = lowercase_view(text)
+
+    # Company (usually near top)
+    comp = COMPANY_META.search(text)
+    if comp:
+        data["company"] = comp.group(1).strip()
+
+    # Experience
+    data["experience"] = experience_from_body(text, low)
+
+    # Location
+    loc = LOCATION_META.search(text, low)
+    if loc:
+        data["location"] = loc.group()
+
+    # Salary
+    sal = SALARY_META.search(text, low)
+    if sal:
+        data["salary"] = sal.group()
+
+    # Posted time
+    post = POSTED_META.search(text, low)
+    if post:
+        data["posted_time"] = post.group(1).strip()
+
+    # Applicants
+    app = APPLICANTS_META.search(text, low)
+    if app:
+        data["applicants"] = app.group(1)
+
+    return data
+
+
+# ---------------- SELECTORS ---------------- #
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+LOWER = "translate({}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+COMPANY_SELECTORS = [
+    f"//*[self::a or self::div or self::span][{_has_class('comp-name')}]",
+    "//a[contains(@href,'/company/') or contains(@href,'/cmp/')][1]",
+    "//*[contains(@class,'companyName') or contains(@class,'comp-name')][1]",
+    "//*[contains(text(),'Company:')]/following-sibling::*[1]",
+]
+
+LOCATION_SELECTORS = [
+    f"//*[self::span or self::div][{_has_class('loc')} or {_has_class('location')}]",
+    "//*[contains(@class,'loc') or contains(@class,'location')][1]",
+    "//*[contains(text(),'Location:')]/following-sibling::*[1]",
+]
+
+EXPERIENCE_SELECTORS = [
+    "//*[contains(text(),'Experience')]/following-sibling::*[1]",
+    "//*[contains(@class,'exp') or contains(@class,'experience')][1]",
+]
+
+SALARY_LABEL_XPATH = f"//*[contains({LOWER.format('normalize-space(.)')},'salary')]"
+SALARY_CLASS_XPATH = "//*[contains(@class,'salary') or contains(@class,'ctc') or contains(@class,'pay')]"
+KEY_SKILLS_HEADING_XPATH = f"//*[contains({LOWER.format('text()')},'key skills')]"
+
+
+# ---------------- PAGE ---------------- #
+
+class JobPage:
+    """A job detail page parsed once; all fields are read from the same DOM tree."""
+
+    def __init__(self, html):
+        self.tree = lxml.html.document_fromstring(html)
+        self._text_cache = {}
+
+    def text(self, el):
+        if el not in self._text_cache:
+            self._text_cache[el] = visible_text(el)
+        return self._text_cache[el]
+
+    def first(self, xpath):
+        found = self.tree.xpath(xpath)
+        return found[0] if found else None
+
+    @property
+    def body_text(self):
+        body = self.first("//body")
+        return self.text(body) if body is not None else ""
+
+    def title(self):
+        h1 = self.first("//h1")
+        return self.text(h1) if h1 is not None else None
+
+    def company(self):
+        for sel in COMPANY_SELECTORS:
+            el = self.first(sel)
+            if el is None:
+                continue
+            company = clean_company_text(self.text(el))
+            if company:
+                return company
+        return None
+
+    def location(self):
+        for sel in LOCATION_SELECTORS:
+            el = self.first(sel)
+            if el is None:
+                continue
+            text = self.text(el)
+            if text and len(text) < 100:
+                return text
+        return None
+
+    def experience(self):
+        for sel in EXPERIENCE_SELECTORS:
+            el = self.first(sel)
+            if el is None:
+                continue
+            text = self.text(el)
+            if text and len(text) < 50:
+                return text
+        return experience_from_body(self.body_text)
+
+    def salary(self):
+        # 1) explicit 'salary' label nodes and the next few nodes after them
+        for node in self.tree.xpath(SALARY_LABEL_XPATH):
+            following = node.xpath("following::*")[:6]
+            candidates = [self.text(node)] + [self.text(f) for f in following]
+            salary = salary_from_candidates(candidates)
+            if salary:
+                return salary
+
+        # 2) elements with salary-like class names
+        for el in self.tree.xpath(SALARY_CLASS_XPATH):
+            salary = salary_from_element_text(self.text(el))
+            if salary:
+                return salary
+
+        # 3) body text fallback
+        return salary_from_body(self.body_text)
+
+    def key_skills(self):
+        for h in self.tree.xpath(KEY_SKILLS_HEADING_XPATH):
+            skills = key_skills_from_anchor_texts(self.text(a) for a in h.xpath("following::a"))
+            if skills:
+                return format_key_skills(skills)
+        return None
+
+    def job_description(self):
+        return job_description_from_body(self.body_text)
+
+
+def parse_job_page(html, job_url, src_company=None):
+    """
+    Build a job detail record from the page HTML (or an already parsed JobPage),
+    in the same shape as the Selenium scraper.
+    """
+    with phase("parse_html"):
+        page = html if isinstance(html, JobPage) else JobPage(html)
+        body_text = page.body_text
+
+    with phase("extract_company"):
+        company = src_company if pd.notna(src_company) and str(src_company).strip() else page.company()
+    with phase("extract_location"):
+        location = page.location()
+    with phase("extract_experience"):
+        experience = page.experience()
+    with phase("extract_salary"):
+        salary = page.salary()
+
+    # Fallback: parse from metadata block if any field is missing
+    with phase("parse_metadata"):
+        meta = parse_job_metadata(body_text)
+
+    with phase("extract_title"):
+        title = page.title()
+    with phase("extract_job_description"):
+        job_description = page.job_description()
+    with phase("extract_key_skills"):
+        key_skills = page.key_skills()
+
+    return {
+        "job_title": title,
+        "company": company or meta["company"],
+        "location": location or meta["location"],
+        "experience": experience or meta["experience"],
+        "salary": salary or meta["salary"],
+        "posted_time": meta["posted_time"],
+        "applicants": meta["applicants"],
+        "job_description": job_description,
+        "key_skills": key_skills,
+        "job_url": job_url
+    }
+
+
+# ---------------- SEARCH RESULTS ---------------- #
+
+SEARCH_CARD_XPATH = f"//div[{_has_class('cust-job-tuple')} or {_has_class('srp-job-promotion')}]"
+
+CARD_FIELDS = {
+    "job_title": f".//a[{_has_class('title')}]",
+    "company": f".//a[{_has_class('comp-name')}]",
+    "location": f".//span[{_has_class('locWdth')}]",
+    "experience": f".//span[{_has_class('expwdth')}]",
+    "posted_time": f".//span[{_has_class('job-post-day')}]",
+}
+
+CARD_URL_XPATHS = [
+    f".//a[{_has_class('title')}]/@href",
+    ".//a[contains(@href, 'job-listings')]/@href",
+]
+
+
+def parse_search_cards(html, base_url, city, page):
+    """Job cards of a search results page, as the rows written to job_urls.csv."""
+    tree = lxml.html.document_fromstring(html)
+    results = []
+
+    for card in tree.xpath(SEARCH_CARD_XPATH):
+        row = {}
+        for field, xpath in CARD_FIELDS.items():
+            found = card.xpath(xpath)
+            row[field] = visible_text(found[0]) if found else ""
+
+        job_url = ""
+        for xpath in CARD_URL_XPATHS:
+            hrefs = card.xpath(xpath)
+            if hrefs and hrefs[0]:
+                job_url = urljoin(base_url, hrefs[0])
+                break
+
+        # Only keep cards with a job_url
+        if job_url:
+            row.update({"job_url": job_url, "city": city, "page_no": page})
+            results.append(row)
+
+    return results
+
+# ---------------- BLOCK PAGES ---------------- #
+
+# Titles of rate-limit, captcha and bot-check pages (checked in lowercase)
+BLOCK_PAGE_TITLES = {
+    'access denied', 'captcha', 'too many requests', 'unusual traffic',
+    'are you a robot', 'are you a human', 'just a moment', 'attention required',
+}
+BLOCK_PAGE_MATCHER = keyword_matcher(BLOCK_PAGE_TITLES)
+TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+
+
+def html_title(html):
+    """Text of the <title> in the head of the page, or ''."""
+    found = TITLE.search(html, 0, 20000)
+    return found.group(1).strip() if found else ""
+
+
+def is_block_page(title):
+    """Whether a page title (driver.title or html_title) is a block page's rather than a job page's."""
+    return bool(title) and BLOCK_PAGE_MATCHER.search(title.lower()) is not None
@@ -0,0 +1,264 @@
+import asyncio
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+from config import (
+    POLITENESS, START_DELAY, MIN_DELAY, MAX_DELAY, DELAY_STEP, BACKOFF, LATENCY_FACTOR,
+    COOLDOWN, MAX_RPM, JITTER, RATE_LOG_EVERY, THROTTLE_RETRIES,
+)
+from metrics import phase
+
+
+class Throttled(RuntimeError):
+    """The host answered with a 429/503 or a block (captcha) page."""
+
+    def __init__(self, url, outcome="throttled", retry_after=None):
+        super().__init__(f"{outcome}: {url}")
+        self.outcome = outcome
+        self.retry_after = retry_after
+
+
+class RateLimiter(ABC):
+    """
+    Interface shared by the limiters: acquire(url) before every request and
+    record(url, outcome, ...) after it. request() does both around a call.
+    """
+
+    @abstractmethod
+    def acquire(self, url):
+        """Block until the host of `url` has a free request slot."""
+
+    def record(self, url, outcome, latency=None, retry_after=None):
+        """Feedback on a finished request; ignored by fixed-rate limiters."""
+
+    def summary(self):
+        return ""
+
+    def request(self, url, func, *args, retries=THROTTLE_RETRIES):
+        """
+        func(*args) once the host has a slot, reporting its latency and
+        outcome. A Throttled call is retried, after the backoff, up to
+        `retries` times.
+        """
+        for attempt in range(retries + 1):
+            with phase("delay"):
+                self.acquire(url)
+            start = time.monotonic()
+            try:
+                with phase("navigation"):
+                    result = func(*args)
+            except Throttled as e:
+                self.record(url, e.outcome, retry_after=e.retry_after)
+                if attempt == retries:
+                    raise
+                continue
+            except Exception:
+                self.record(url, "error")
+                raise
+            self.record(url, "ok", latency=time.monotonic() - start)
+            return result
+
+
+class HostRateLimiter(RateLimiter):
+    """
+    Token-bucket rate limiter keyed by host.
+
+    Each host gets a bucket of `burst` tokens refilled at `rate` tokens per
+    second. Workers call `acquire(url)` before every request and block until
+    the host has a token. Build it with `shared()` to use one limiter from
+    several processes.
+    """
+
+    def __init__(self, rate, burst=1, state=None, lock=None):
+        self.rate = rate
+        self.burst = burst
+        self._state = state if state is not None else {}
+        self._lock = lock if lock is not None else threading.Lock()
+
+    @classmethod
+    def shared(cls, manager, rate, burst=1):
+        """Limiter backed by a multiprocessing Manager, safe to pass to worker processes."""
+        return cls(rate, burst, state=manager.dict(), lock=manager.Lock())
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._state.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._state[host] = (tokens - 1, now)
+                    return
+                self._state[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+    def summary(self):
+        return f"Politeness: fixed {self.rate * 60:.1f} req/min per host"
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Politeness scheduler that adapts the delay between requests to a host
+    (AIMD): every healthy response takes `step` seconds off the delay, down to
+    `min_delay` or `latency_factor` times the smoothed response time, whichever
+    is longer; a 429 or block page multiplies it by `backoff` (up to
+    `max_delay`) and pauses the host for its Retry-After or `cooldown` seconds.
+
+    Requests are handed out as time slots (with ±`jitter` on the delay), so
+    concurrent workers never burst, and all hosts together stay under
+    `max_rpm`. The effective rate of every host is logged every `log_every`
+    seconds. Build it with `shared()` to use one scheduler from several processes.
+    """
+
+    GLOBAL = "*"
+
+    def __init__(self, start_delay=START_DELAY, min_delay=MIN_DELAY, max_delay=MAX_DELAY, step=DELAY_STEP,
+                 backoff=BACKOFF, latency_factor=LATENCY_FACTOR, cooldown=COOLDOWN, max_rpm=MAX_RPM,
+                 jitter=JITTER, log_every=RATE_LOG_EVERY, state=None, lock=None):
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.max_rpm = max_rpm
+        self.jitter = jitter
+        self.log_every = log_every
+        self._state = state if state is not None else {}
+        self._lock = lock if lock is not None else threading.Lock()
+        self._started = time.monotonic()
+
+    @classmethod
+    def shared(cls, manager, **kwargs):
+        """Scheduler backed by a multiprocessing Manager, safe to pass to worker processes."""
+        return cls(state=manager.dict(), lock=manager.Lock(), **kwargs)
+
+    def _host(self, host, now):
+        # Hosts are stored as plain dicts and written back, which also works through a Manager
+        return self._state.get(host) or {
+            "delay": self.start_delay, "next": now, "paused_until": now, "latency": None,
+            "sent": 0, "ok": 0, "throttled": 0, "blocked": 0, "error": 0,
+            "logged_at": now, "logged_sent": 0,
+        }
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                h = self._host(host, now)
+                slot = max(now, h["next"], self._state.get(self.GLOBAL, now))
+                h["next"] = slot + h["delay"] * random.uniform(1 - self.jitter, 1 + self.jitter)
+                self._state[self.GLOBAL] = slot + 60 / self.max_rpm
+                self._log(host, h, now)
+                self._state[host] = h
+
+            time.sleep(max(0.0, slot - now))
+            # A throttle reported while this worker waited pauses its slot too
+            with self._lock:
+                now = time.monotonic()
+                paused = self._host(host, now)["paused_until"] > now
+            if not paused:
+                return
+
+    def record(self, url, outcome, latency=None, retry_after=None):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            h = self._host(host, now)
+            h[outcome] += 1
+            h["sent"] += 1
+
+            if outcome in ("throttled", "blocked"):
+                h["delay"] = min(self.max_delay, h["delay"] * self.backoff)
+                pause = retry_after if retry_after is not None else self.cooldown
+                h["paused_until"] = max(h["paused_until"], now + pause)
+                h["next"] = max(h["next"], h["paused_until"])
+                print(f"❌ {host} {outcome}: delay now {h['delay']:.1f}s, pausing {pause:.0f}s")
+            elif outcome == "ok":
+                if latency is not None:
+                    h["latency"] = latency if h["latency"] is None else 0.8 * h["latency"] + 0.2 * latency
+                floor = max(self.min_delay, self.latency_factor * (h["latency"] or 0))
+                h["delay"] = max(floor, h["delay"] - self.step)
+            self._state[host] = h
+
+    def _log(self, host, h, now):
+        if now - h["logged_at"] < self.log_every:
+            return
+        rpm = (h["sent"] - h["logged_sent"]) / (now - h["logged_at"]) * 60
+        print(f"⏱ {host}: {rpm:.1f} req/min, {self._describe(h)}")
+        h["logged_at"], h["logged_sent"] = now, h["sent"]
+
+    @staticmethod
+    def _describe(h):
+        latency = f"{h['latency']:.2f}s" if h["latency"] is not None else "-"
+        return (f"delay {h['delay']:.1f}s, latency {latency} "
+                f"(ok={h['ok']} throttled={h['throttled']} blocked={h['blocked']} errors={h['error']})")
+
+    def hosts(self):
+        return {host: h for host, h in self._state.items() if host != self.GLOBAL}
+
+    def summary(self):
+        minutes = max(time.monotonic() - self._started, 1e-9) / 60
+        return "Politeness: " + "; ".join(
+            f"{host} {h['sent'] / minutes:.1f} req/min, {self._describe(h)}" for host, h in self.hosts().items()
+        )
+
+
+def make_rate_limiter(politeness=POLITENESS, rate=None, burst=1, manager=None):
+    """
+    The "adaptive" scheduler or a "fixed" token bucket of `rate` requests per
+    second per host; shared through `manager` when one is given.
+    """
+    if politeness == "adaptive":
+        return AdaptiveRateLimiter.shared(manager) if manager is not None else AdaptiveRateLimiter()
+    if politeness == "fixed":
+        if manager is not None:
+            return HostRateLimiter.shared(manager, rate, burst)
+        return HostRateLimiter(rate, burst)
+    raise ValueError(f"Unknown politeness: {politeness}")
+
+
+class AsyncHostRateLimiter:
+    """
+    asyncio version of HostRateLimiter for coroutines sharing one event loop.
+    A throttled host is paused for its Retry-After or `cooldown` seconds.
+    """
+
+    def __init__(self, rate, burst=1, cooldown=COOLDOWN):
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+        self._state = {}
+        self._locks = {}
+        self._paused_until = {}
+
+    def record(self, url, outcome, retry_after=None):
+        if outcome in ("throttled", "blocked"):
+            host = urlsplit(url).netloc
+            pause = retry_after if retry_after is not None else self.cooldown
+            self._paused_until[host] = max(self._paused_until.get(host, 0), time.monotonic() + pause)
+            print(f"❌ {host} {outcome}: pausing {pause:.0f}s")
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        # Waiters queue on the host lock, so tokens are handed out in arrival order
+        async with lock:
+            pause = self._paused_until.get(host, 0) - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            now = time.monotonic()
+            tokens, last = self._state.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / self.rate)
+                tokens = 1
+                now = time.monotonic()
+            self._state[host] = (tokens - 1, now)
@@ -0,0 +1,299 @@
+"""
+Streaming pipeline: search -> job details -> cleaning -> database.
+
+    python scraping/run_scraper.py --db sqlite
+
+Each stage runs in its own thread(s) and hands records to the next through
+a bounded queue, so a slow stage holds the faster ones back instead of
+letting work pile up in memory. A job URL is fetched as soon as its search
+page is scraped, and cleaned rows are upserted in small batches (at most
+CLEAN_BATCH records or CLEAN_BATCH_SECONDS old), so the database fills up
+while the crawl is still running. Every cleaned batch is also added to the
+search index (analysis/search_index.py) as it is emitted.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+from config import (
+    ROLES, CITIES, MAX_PAGES, BASE_URL, HOST_RATE, HOST_BURST, WORKERS, FETCHER, POLITENESS,
+    STATE_DB, FRESH_DAYS, CHECKPOINT_EVERY, MAX_ATTEMPTS, RETRY_BACKOFF,
+    SEARCH_BACKEND, QUEUE_SIZE, CLEAN_BATCH, CLEAN_BATCH_SECONDS, DB_BACKEND, PAGE_CACHE, METRICS_LOG,
+)
+from driver_pool import DriverPool, get_driver
+from http_fetcher import make_session
+from job_details_scraper import make_fetcher
+from metrics import PageMetrics, serve_metrics
+from page_cache import PageCache
+from rate_limiter import make_rate_limiter
+from search_naukri import http_card_fetcher, iter_search_cards, selenium_card_fetcher
+from state_store import UrlStateStore
+from waits import WAITS
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "analysis"))
+sys.path.append(os.path.join(ROOT, "database"))
+from data_cleaning import clean_jobs
+from insert_mysql import SQLITE_PATH, connect, load_jobs
+from search_index import INDEX_DIR, SearchIndex
+
+DONE = object()
+
+
+# ---------------- QUEUES ---------------- #
+
+class Pipeline:
+    """Threads joined by bounded queues; the first failing stage stops the rest."""
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.stop = threading.Event()
+        self.errors = []
+        self.threads = []
+
+    def queue(self):
+        return queue.Queue(maxsize=self.queue_size)
+
+    def put(self, q, item):
+        # Blocks while the queue is full: this is the backpressure
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def items(self, q):
+        """Yield items from q until the upstream stage is done."""
+        while not self.stop.is_set():
+            try:
+                item = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is DONE:
+                # Put it back for the other workers reading the same queue
+                q.put(DONE)
+                return
+            yield item
+
+    def batches(self, q, size, max_wait):
+        """Lists of up to `size` items, flushed early once the oldest has waited `max_wait` seconds."""
+        batch, started = [], None
+        while not self.stop.is_set():
+            timeout = 0.5 if started is None else max(0.0, min(0.5, started + max_wait - time.monotonic()))
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is DONE:
+                q.put(DONE)
+                break
+            if item is not None:
+                batch.append(item)
+                started = started or time.monotonic()
+
+            if batch and (len(batch) >= size or time.monotonic() - started >= max_wait):
+                yield batch
+                batch, started = [], None
+
+        if batch and not self.stop.is_set():
+            yield batch
+
+    def stage(self, name, produce, outbox=None, workers=1):
+        """
+        Run `produce()` in `workers` threads. If it returns an iterator, every
+        item is put on `outbox`, followed by DONE once all workers finish.
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                for item in produce() or ():
+                    if self.stop.is_set():
+                        break
+                    self.put(outbox, item)
+            except Exception as e:
+                traceback.print_exc()
+                self.errors.append((name, e))
+                self.stop.set()
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and outbox is not None:
+                    self.put(outbox, DONE)
+
+        for i in range(workers):
+            thread = threading.Thread(target=run, name=f"{name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self):
+        try:
+            for thread in self.threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            print("Stopping pipeline...")
+            self.stop.set()
+            raise
+        if self.errors:
+            name, error = self.errors[0]
+            raise RuntimeError(f"Pipeline stage '{name}' failed: {error}") from error
+
+
+# ---------------- STAGES ---------------- #
+
+def run_pipeline(search_backend=SEARCH_BACKEND, fetcher=FETCHER, workers=WORKERS, db_backend=DB_BACKEND,
+                 sqlite_path=SQLITE_PATH, state_path=None, cache_path=None, roles=ROLES, cities=CITIES, max_pages=MAX_PAGES,
+                 base_url=BASE_URL, rate=HOST_RATE, burst=HOST_BURST, queue_size=QUEUE_SIZE,
+                 batch_size=CLEAN_BATCH, batch_seconds=CLEAN_BATCH_SECONDS, driver_factory=get_driver,
+                 politeness=POLITENESS, metrics_path=None, metrics_port=None, index_path=None):
+    """Stream every search result through detail scraping, cleaning and loading; returns stage counts."""
+    pipeline = Pipeline(queue_size)
+    urls, records, frames = pipeline.queue(), pipeline.queue(), pipeline.queue()
+    rate_limiter = make_rate_limiter(politeness, rate, burst)
+    counts = {"discovered": 0, "skipped": 0, "fetched": 0, "failed": 0, "loaded": 0}
+    counts_lock = threading.Lock()
+    state = None
+    if state_path:
+        state = UrlStateStore(state_path, fresh_days=FRESH_DAYS, checkpoint_every=CHECKPOINT_EVERY,
+                              max_attempts=MAX_ATTEMPTS, backoff_base=RETRY_BACKOFF)
+    cache = PageCache(cache_path) if cache_path else None
+    metrics = PageMetrics(metrics_path)
+    index = SearchIndex(index_path) if index_path else None
+
+    def count(key, n=1):
+        with counts_lock:
+            counts[key] += n
+
+    def discover():
+        if search_backend == "http":
+            session = make_session()
+            fetch_cards = http_card_fetcher(session, rate_limiter)
+            close = session.close
+        else:
+            search_pool = DriverPool(1, driver_factory=driver_factory)
+            fetch_cards = selenium_card_fetcher(search_pool, rate_limiter)
+            close = search_pool.close
+
+        seen = set()
+        try:
+            for card in iter_search_cards(fetch_cards, roles, cities, max_pages, base_url):
+                job_url = card["job_url"]
+                if job_url in seen:
+                    continue
+                seen.add(job_url)
+                count("discovered")
+
+                if state is not None and not state.is_pending(job_url):
+                    count("skipped")
+                    continue
+                row = {k: (None if v == "" else v) for k, v in card.items()}
+                yield row, time.time()
+        finally:
+            close()
+
+    def fetch():
+        worker_fetcher = make_fetcher(fetcher, driver_factory, detail_pool, cache)
+        try:
+            for row, discovered_at in pipeline.items(urls):
+                try:
+                    with metrics.page(row["job_url"]) as page:
+                        record = worker_fetcher.fetch(row, rate_limiter)
+                        page.done(record)
+                except Exception as e:
+                    print(f"❌ Failed for {row['job_url']}: {e}")
+                    count("failed")
+                    if state is not None:
+                        state.mark_failed(row["job_url"], e)
+                    continue
+
+                count("fetched")
+                if state is not None:
+                    state.mark_done(row["job_url"], record)
+                yield record, discovered_at
+        finally:
+            worker_fetcher.close()
+            if state is not None:
+                state.close()
+
+    def clean():
+        for batch in pipeline.batches(records, batch_size, batch_seconds):
+            df = clean_jobs(pd.DataFrame([record for record, _ in batch]))
+            if index is not None:
+                index.add(df)
+            yield df, min(discovered_at for _, discovered_at in batch)
+
+    def load():
+        conn = connect(db_backend, sqlite_path)
+        try:
+            for df, oldest in pipeline.items(frames):
+                load_jobs(df, conn, db_backend, chunk_size=len(df))
+                count("loaded", len(df))
+                print(f"✅ {counts['loaded']} jobs in the database "
+                      f"(oldest in batch discovered {time.time() - oldest:.0f}s ago)")
+        finally:
+            conn.close()
+
+    # Detail workers share one pool, warmed up while the first search page loads
+    detail_pool = DriverPool(max(1, workers), driver_factory=driver_factory, prewarm=False)
+    if fetcher == "selenium":
+        pipeline.stage("warmup", detail_pool.prewarm)
+
+    pipeline.stage("search", discover, urls)
+    pipeline.stage("details", fetch, records, workers=max(1, workers))
+    pipeline.stage("clean", clean, frames)
+    pipeline.stage("load", load)
+    endpoint = serve_metrics(metrics, metrics_port) if metrics_port else None
+    try:
+        pipeline.join()
+    finally:
+        if detail_pool.counts["started"]:
+            print(f"✅ {detail_pool.summary()}")
+        detail_pool.close()
+        metrics.close()
+        if endpoint is not None:
+            endpoint.shutdown()
+        print(rate_limiter.summary())
+        print(WAITS.summary())
+        print(metrics.summary())
+
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape, clean and load Naukri jobs as one streaming pipeline")
+    parser.add_argument("--search", choices=["selenium", "http"], default=SEARCH_BACKEND)
+    parser.add_argument("--fetcher", choices=["selenium", "http"], default=FETCHER)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="detail fetchers running in parallel")
+    parser.add_argument("--politeness", choices=["adaptive", "fixed"], default=POLITENESS)
+    parser.add_argument("--db", choices=["mysql", "sqlite"], default=DB_BACKEND)
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--state", default=STATE_DB, help="URL state store (SQLite) for resumable runs")
+    parser.add_argument("--no-state", action="store_true", help="fetch every URL and keep no state")
+    parser.add_argument("--cache", default=PAGE_CACHE, help="raw page cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="do not store fetched pages")
+    parser.add_argument("--metrics", default=METRICS_LOG, help="JSONL file of per-page phase times and fields")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while running")
+    parser.add_argument("--index", default=INDEX_DIR, help="search index updated with every cleaned batch")
+    parser.add_argument("--no-index", action="store_true", help="do not update the search index")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--batch-size", type=int, default=CLEAN_BATCH)
+    args = parser.parse_args()
+
+    counts = run_pipeline(args.search, args.fetcher, args.workers, args.db, args.sqlite_path,
+                          state_path=None if args.no_state else args.state,
+                          cache_path=None if args.no_cache else args.cache,
+                          base_url=args.base_url, batch_size=args.batch_size, politeness=args.politeness,
+                          metrics_path=args.metrics, metrics_port=args.metrics_port,
+                          index_path=None if args.no_index else args.index)
+    print("Pipeline: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
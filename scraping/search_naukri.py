@@ -1,48 +1,32 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
 import pandas as pd
-import os
 import time
 
-from config import ROLE, CITIES, MAX_PAGES, DELAY_RANGE
-from utils import human_delay
+from config import ROLE, CITIES, MAX_PAGES, BASE_URL, HOST_RATE, HOST_BURST, CARDS_TIMEOUT
+from driver_pool import DriverPool
+from http_fetcher import check_response
+from page_parser import is_block_page, parse_search_cards
+from rate_limiter import Throttled, make_rate_limiter
+from storage import save_dataset
+from waits import WAITS, timed_wait
 
 
-def get_driver():
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-    )
-    # Disable location permission prompts
-    prefs = {"profile.default_content_setting_values.geolocation": 2}
-    options.add_experimental_option("prefs", prefs)
-
-    return webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
-
-
-def build_search_url(role, city, page):
+def build_search_url(role, city, page, base=BASE_URL):
     role = role.replace(" ", "-")
     
     # Naukri uses composite city slugs
     city_slug_map = {
         "hyderabad": "hyderabad-secunderabad",
         "bengaluru": "bengaluru-bangalore",
-        "mumbai": "mumbai"
+        "mumbai": "mumbai",
+        "delhi": "delhi-ncr",
+        "gurugram": "gurgaon-gurugram",
     }
 
     city_slug = city_slug_map.get(city.lower(), city.lower())
 
-    base = f"https://www.naukri.com/{role}-jobs-in-{city_slug}"
+    base = f"{base}/{role}-jobs-in-{city_slug}"
 
     if page == 1:
         return base
@@ -50,116 +34,160 @@ def build_search_url(role, city, page):
     return f"{base}-{page}?page={page}"
 
 
+CARD_SELECTORS = "div.cust-job-tuple, div.srp-job-promotion"
+# The block shown instead of cards past the last results page
+NO_RESULTS_SELECTOR = "div[class*='no-result']"
+COOKIE_BUTTON_XPATH = (
+    "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') "
+    "or contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'got it')]"
+)
 
 
-def scrape_search_results():
-    driver = get_driver()
-    results = []
+def cards_or_no_results(driver):
+    return driver.find_elements(By.CSS_SELECTOR, f"{CARD_SELECTORS}, {NO_RESULTS_SELECTOR}")
 
-    for city in CITIES:
-        for page in range(1, MAX_PAGES + 1):
-            url = build_search_url(ROLE, city, page)
-            print(f"Scraping: {url}")
-            driver.get(url)
-            human_delay(DELAY_RANGE)
-
-            # Close ad / extra tabs
-            main_handle = driver.current_window_handle
-            for handle in driver.window_handles:
-                if handle != main_handle:
-                    try:
-                        driver.switch_to.window(handle)
-                        driver.close()
-                    except Exception:
-                        pass
-            driver.switch_to.window(main_handle)
-
-            # Accept cookies if present
+
+def load_search_page(driver, url):
+    """
+    Open a results page, clear ad tabs and the cookie banner, and return its
+    job cards. Waits only until the cards (or the no-results block) render.
+    """
+    driver.get(url)
+
+    # Close ad / extra tabs
+    main_handle = driver.current_window_handle
+    for handle in driver.window_handles:
+        if handle != main_handle:
             try:
-                WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((
-                        By.XPATH,
-                        "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'accept') "
-                        "or contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'got it')]"
-                    ))
-                ).click()
+                driver.switch_to.window(handle)
+                driver.close()
             except Exception:
                 pass
+    driver.switch_to.window(main_handle)
+
+    # An empty results page ends the wait as soon as a full one would
+    timed_wait(driver, "search_cards", CARDS_TIMEOUT, cards_or_no_results)
+
+    # Accept cookies if the banner is there by now: cards are read by script, so it never blocks them
+    for button in driver.find_elements(By.XPATH, COOKIE_BUTTON_XPATH):
+        try:
+            button.click()
+            break
+        except Exception:
+            continue
+
+    return driver.find_elements(By.CSS_SELECTOR, CARD_SELECTORS)
+
+
+def extract_cards(job_cards, city, page):
+    """Per-card extraction with one WebDriver call per field (see extract_cards_batch)."""
+    results = []
+
+    for card in job_cards:
+        try:
+            # Job Title
+            try:
+                title = card.find_element(By.CSS_SELECTOR, "a.title").text
+            except Exception:
+                title = ""
+
+            # Company
+            try:
+                company = card.find_element(By.CSS_SELECTOR, "a.comp-name").text
+            except Exception:
+                company = ""
+
+            # Location
+            try:
+                location = card.find_element(By.CSS_SELECTOR, "span.locWdth").text
+            except Exception:
+                location = ""
 
-            # Wait for job cards
-            selectors = "div.cust-job-tuple, div.srp-job-promotion"
+            # Experience
             try:
-                job_cards = WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, selectors))
-                )
+                experience = card.find_element(By.CSS_SELECTOR, "span.expwdth").text
             except Exception:
-                job_cards = driver.find_elements(By.CSS_SELECTOR, selectors)
+                experience = ""
 
-            if not job_cards:
-                print("No job cards found, stopping pagination.")
-                break
+            # Posted time
+            try:
+                posted = card.find_element(By.CSS_SELECTOR, "span.job-post-day").text
+            except Exception:
+                posted = ""
 
-            for card in job_cards:
+            # Job URL (ROBUST EXTRACTION)
+            job_url = ""
+            for selector in ["a.title", "a[href*='job-listings']"]:
                 try:
-                    # Job Title
-                    try:
-                        title = card.find_element(By.CSS_SELECTOR, "a.title").text
-                    except Exception:
-                        title = ""
-
-                    # Company
-                    try:
-                        company = card.find_element(By.CSS_SELECTOR, "a.comp-name").text
-                    except Exception:
-                        company = ""
-
-                    # Location
-                    try:
-                        location = card.find_element(By.CSS_SELECTOR, "span.locWdth").text
-                    except Exception:
-                        location = ""
-
-                    # Experience
-                    try:
-                        experience = card.find_element(By.CSS_SELECTOR, "span.expwdth").text
-                    except Exception:
-                        experience = ""
-
-                    # Posted time
-                    try:
-                        posted = card.find_element(By.CSS_SELECTOR, "span.job-post-day").text
-                    except Exception:
-                        posted = ""
-
-                    # Job URL (ROBUST EXTRACTION)
-                    job_url = ""
-                    for selector in ["a.title", "a[href*='job-listings']"]:
-                        try:
-                            job_url = card.find_element(By.CSS_SELECTOR, selector).get_attribute("href")
-                            if job_url:
-                                break
-                        except Exception:
-                            continue
-
-                    # Only append if job_url exists
+                    job_url = card.find_element(By.CSS_SELECTOR, selector).get_attribute("href")
                     if job_url:
-                        results.append({
-                            "job_title": title,
-                            "company": company,
-                            "location": location,
-                            "experience": experience,
-                            "posted_time": posted,
-                            "job_url": job_url,
-                            "city": city,
-                            "page_no": page
-                        })
-
+                        break
                 except Exception:
                     continue
 
-    driver.quit()
-
-    # ---------------- POST-PROCESSING (CRITICAL) ----------------
+            # Only append if job_url exists
+            if job_url:
+                results.append({
+                    "job_title": title,
+                    "company": company,
+                    "location": location,
+                    "experience": experience,
+                    "posted_time": posted,
+                    "job_url": job_url,
+                    "city": city,
+                    "page_no": page
+                })
+
+        except Exception:
+            continue
+
+    return results
+
+
+# Reads every card's fields in the page itself and returns them in one round-trip
+CARDS_JS = """
+const text = (card, sel) => {
+    const el = card.querySelector(sel);
+    return el ? el.innerText.trim() : "";
+};
+const link = (card) => {
+    for (const sel of ["a.title", "a[href*='job-listings']"]) {
+        const el = card.querySelector(sel);
+        if (el && el.href) return el.href;
+    }
+    return "";
+};
+return Array.from(document.querySelectorAll(arguments[0])).map(card => ({
+    job_title: text(card, "a.title"),
+    company: text(card, "a.comp-name"),
+    location: text(card, "span.locWdth"),
+    experience: text(card, "span.expwdth"),
+    posted_time: text(card, "span.job-post-day"),
+    job_url: link(card)
+}));
+"""
+
+
+def extract_cards_batch(driver, city, page):
+    """
+    All job cards on the current page in one execute_script call, with the
+    same fields as extract_cards. Falls back to parsing page_source.
+    """
+    try:
+        cards = driver.execute_script(CARDS_JS, CARD_SELECTORS)
+    except Exception:
+        return parse_search_cards(driver.page_source, driver.current_url, city, page)
+
+    return [
+        {**card, "city": city, "page_no": page}
+        for card in cards
+        # Only keep cards with a job_url
+        if card["job_url"]
+    ]
+
+
+def finalize_results(results):
+    """Build the job_urls DataFrame: empty strings become NA, job URLs are deduplicated."""
     df = pd.DataFrame(results)
 
     # Normalize empty strings
@@ -171,12 +199,76 @@ def scrape_search_results():
     return df
 
 
+def search_page_cards(driver, url, city, page):
+    job_cards = load_search_page(driver, url)
+    if job_cards:
+        return extract_cards_batch(driver, city, page)
+    # A block page has no cards either, but must not end the city's pagination
+    if is_block_page(driver.title):
+        raise Throttled(url, "blocked")
+    return []
+
+
+def selenium_card_fetcher(pool, rate_limiter):
+    """fetch_cards for iter_search_cards: load a results page on a pooled browser when the scheduler allows."""
+    def fetch_cards(url, city, page):
+        return rate_limiter.request(url, pool.run, search_page_cards, url, city, page)
+    return fetch_cards
+
+
+def http_card_fetcher(session, rate_limiter):
+    """fetch_cards for iter_search_cards over plain HTTP."""
+    def get(url):
+        response = session.get(url, timeout=20)
+        check_response(response)
+        return response.text
+
+    def fetch_cards(url, city, page):
+        return parse_search_cards(rate_limiter.request(url, get, url), url, city, page)
+    return fetch_cards
+
+
+def iter_search_cards(fetch_cards, roles=(ROLE,), cities=CITIES, max_pages=MAX_PAGES, base=BASE_URL):
+    """
+    Yield job cards page by page, as they are scraped. A city stops at its
+    first page without job cards. As in async_crawler, a page that still
+    fails after the rate limiter's retries is skipped, not taken as the end
+    of the results. fetch_cards(url, city, page) returns the cards of one
+    results page.
+    """
+    for role in roles:
+        for city in cities:
+            for page in range(1, max_pages + 1):
+                url = build_search_url(role, city, page, base=base)
+                print(f"Scraping: {url}")
+                try:
+                    cards = fetch_cards(url, city, page)
+                except Exception as e:
+                    print(f"❌ Failed for {url}: {e}")
+                    continue
+
+                if not cards:
+                    print("No job cards found, stopping pagination.")
+                    break
+
+                yield from cards
+
+
+def scrape_search_results():
+    rate_limiter = make_rate_limiter(rate=HOST_RATE, burst=HOST_BURST)
+    with DriverPool(size=1) as pool:
+        results = list(iter_search_cards(selenium_card_fetcher(pool, rate_limiter)))
+        print(f"✅ {pool.summary()}")
+    print(rate_limiter.summary())
+    print(WAITS.summary())
+
+    # ---------------- POST-PROCESSING (CRITICAL) ----------------
+    return finalize_results(results)
+
+
 if __name__ == "__main__":
     df = scrape_search_results()
 
-    # Ensure output directory exists
-    os.makedirs("data/raw", exist_ok=True)
-
-    df.to_csv("data/raw/job_urls.csv", index=False)
+    save_dataset(df, "job_urls")
     print(f"Saved {len(df)} clean job URLs")
     print("Step 3 scraping completed successfully.")
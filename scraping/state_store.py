@@ -0,0 +1,172 @@
+"""
+Persistent per-URL state for the detail scraper.
+
+One SQLite row per job_url records the fetch status, when it was fetched, a
+hash of the extracted content, the attempt count for failures and the record
+itself. Reruns only fetch URLs that are new, stale or due for a retry, and a
+crash loses at most the records since the last checkpoint.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS url_state (
+    job_url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    fetched_at REAL,
+    content_hash TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,
+    error TEXT,
+    record TEXT
+)
+"""
+
+
+def content_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class UrlStateStore:
+    """
+    SQLite-backed state keyed by job_url.
+
+    Safe to share between worker threads and processes: every thread opens
+    its own connection, and its updates are committed in batches of
+    `checkpoint_every` (and on close).
+    """
+
+    def __init__(self, path, fresh_days=7, checkpoint_every=25,
+                 max_attempts=5, backoff_base=300, backoff_cap=86400):
+        self.path = path
+        self.fresh_days = fresh_days
+        self.checkpoint_every = checkpoint_every
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(SCHEMA)
+        conn.commit()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+            self._local.buffer = []
+        return conn
+
+    def _write(self, sql, params):
+        # Updates are buffered and written in one short transaction per
+        # checkpoint, so workers never hold the database lock between pages
+        self._conn()
+        self._local.buffer.append((sql, params))
+        if len(self._local.buffer) >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or not self._local.buffer:
+            return
+        with conn:
+            for sql, params in self._local.buffer:
+                conn.execute(sql, params)
+        self._local.buffer = []
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self.checkpoint()
+            conn.close()
+            self._local.conn = None
+
+    # ---------------- QUERIES ---------------- #
+
+    def pending(self, urls, now=None):
+        """URLs from `urls` that need fetching: new, stale, or failed and due for a retry."""
+        now = now or time.time()
+        stale_before = now - self.fresh_days * 86400
+        rows = self._conn().execute(
+            "SELECT job_url, status, fetched_at, attempts, next_attempt_at FROM url_state"
+        ).fetchall()
+        state = {r[0]: r[1:] for r in rows}
+        return [url for url in urls if url not in state or self._due(*state[url], now, stale_before)]
+
+    def is_pending(self, job_url, now=None):
+        """pending() for a single URL, looked up by key."""
+        now = now or time.time()
+        row = self._conn().execute(
+            "SELECT status, fetched_at, attempts, next_attempt_at FROM url_state WHERE job_url = ?", (job_url,)
+        ).fetchone()
+        return row is None or self._due(*row, now, now - self.fresh_days * 86400)
+
+    def _due(self, status, fetched_at, attempts, next_attempt_at, now, stale_before):
+        if status == "done":
+            return fetched_at < stale_before
+        return status == "failed" and attempts < self.max_attempts and next_attempt_at <= now
+
+    def records(self, urls):
+        """Stored records for `urls`, in that order (URLs never fetched successfully are skipped)."""
+        rows = self._conn().execute(
+            "SELECT job_url, record FROM url_state WHERE record IS NOT NULL"
+        ).fetchall()
+        by_url = {url: record for url, record in rows}
+        return [json.loads(by_url[url]) for url in urls if url in by_url]
+
+    def counts(self):
+        return dict(self._conn().execute(
+            "SELECT status, COUNT(*) FROM url_state GROUP BY status"
+        ).fetchall())
+
+    # ---------------- UPDATES ---------------- #
+
+    def mark_done(self, job_url, record):
+        self._write(
+            """
+            INSERT INTO url_state (job_url, status, fetched_at, content_hash, attempts, next_attempt_at, error, record)
+            VALUES (?, 'done', ?, ?, 0, NULL, NULL, ?)
+            ON CONFLICT(job_url) DO UPDATE SET
+                status = 'done', fetched_at = excluded.fetched_at,
+                content_hash = excluded.content_hash, attempts = 0,
+                next_attempt_at = NULL, error = NULL, record = excluded.record
+            """,
+            (job_url, time.time(), content_hash(record), json.dumps(record, default=str)),
+        )
+
+    def mark_failed(self, job_url, error):
+        """Record a failure; the next retry is scheduled with exponential backoff."""
+        row = self._conn().execute(
+            "SELECT attempts FROM url_state WHERE job_url = ?", (job_url,)
+        ).fetchone()
+        attempts = (row[0] if row else 0) + 1
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempts - 1))
+        now = time.time()
+
+        # A failed refresh keeps the previously stored record
+        self._write(
+            """
+            INSERT INTO url_state (job_url, status, fetched_at, attempts, next_attempt_at, error)
+            VALUES (?, 'failed', ?, ?, ?, ?)
+            ON CONFLICT(job_url) DO UPDATE SET
+                status = 'failed', attempts = excluded.attempts,
+                next_attempt_at = excluded.next_attempt_at, error = excluded.error
+            """,
+            (job_url, now, attempts, now + delay, str(error)[:500]),
+        )
@@ -0,0 +1,100 @@
+"""
+Dataset storage for every pipeline stage.
+
+Datasets are addressed by name (see DATASETS in config.py) and stored as
+CSV, Parquet or Arrow IPC depending on the STORAGE setting. Whatever the
+format, loaded frames have the same types:
+  - list columns (skill_list) as lists of strings, list<string> on disk
+  - low-cardinality labels (location_clean, experience_level) as categoricals
+  - integer columns (the 0/1 skill flags and scores) downcast, int8 on disk
+"""
+import ast
+import os
+
+import pandas as pd
+
+from config import STORAGE, DATASETS
+
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+LIST_COLUMNS = ["skill_list"]
+CATEGORY_COLUMNS = ["location_clean", "experience_level"]
+
+
+def dataset_path(name, storage=STORAGE):
+    if storage not in EXTENSIONS:
+        raise ValueError(f"Unknown storage format: {storage}")
+    return DATASETS.get(name, name) + EXTENSIONS[storage]
+
+
+def _parse_list(value):
+    # CSV keeps lists in their Python repr, e.g. "['excel', 'sql']"
+    if isinstance(value, str):
+        return ast.literal_eval(value)
+    if value is None or isinstance(value, float):
+        return []
+    # Parquet and Arrow hand list cells back as arrays
+    return list(value)
+
+
+def _parse_lists(values):
+    # each distinct CSV string is parsed once
+    cache = {}
+    out = []
+    for value in values:
+        if isinstance(value, str):
+            if value not in cache:
+                cache[value] = _parse_list(value)
+            out.append(list(cache[value]))
+        else:
+            out.append(_parse_list(value))
+    return out
+
+
+def with_storage_types(df):
+    """Copy of df with the column types used on disk and after loading."""
+    df = df.copy()
+    for col in LIST_COLUMNS:
+        if col in df:
+            df[col] = _parse_lists(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype("category")
+    for col in df.select_dtypes("integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+def save_dataset(df, name, storage=STORAGE):
+    path = dataset_path(name, storage)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if storage == "csv":
+        df.to_csv(path, index=False)
+    elif storage == "parquet":
+        with_storage_types(df).to_parquet(path, index=False, compression="zstd")
+    else:
+        with_storage_types(df).reset_index(drop=True).to_feather(path, compression="zstd")
+    return path
+
+
+def load_dataset(name, storage=STORAGE, columns=None):
+    """
+    Load a dataset in the configured format. If that file does not exist yet
+    but the dataset was saved in another format, that copy is loaded instead.
+    """
+    path = dataset_path(name, storage)
+    if not os.path.exists(path):
+        for other in EXTENSIONS:
+            if os.path.exists(dataset_path(name, other)):
+                print(f"{path} not found, loading {other} copy")
+                storage, path = other, dataset_path(name, other)
+                break
+
+    if storage == "csv":
+        df = pd.read_csv(path, usecols=columns)
+    elif storage == "parquet":
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_feather(path, columns=columns)
+    return with_storage_types(df)
@@ -0,0 +1,182 @@
+"""
+Text parsing shared by the scraper (page_parser.py) and the cleaner
+(analysis/data_cleaning.py).
+
+Every pattern is compiled once at import. Keyword lists that used to be
+checked one `in` at a time are folded into a single alternation, so a line
+is scanned once whatever the number of keywords. Case-insensitive patterns
+scan the lowercase text instead of using re.IGNORECASE, which is several
+times slower on long page texts.
+"""
+import re
+
+# The only characters for which lowercasing and re.IGNORECASE disagree on an
+# ASCII letter ("İ" also lowercases to two characters, shifting positions)
+CASE_SPECIALS = ("İ", "ı", "ſ")
+
+
+def keyword_matcher(keywords):
+    """One compiled pattern matching any of the keywords as a substring (longest first)."""
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+
+def lowercase_view(text):
+    """text.lower() if scanning it finds exactly what re.IGNORECASE finds in text, else None."""
+    if not text.isascii() and any(c in text for c in CASE_SPECIALS):
+        return None
+    return text.lower()
+
+
+class CaselessPattern:
+    """
+    A case-insensitive pattern (written in lowercase) matched against
+    lowercase_view(text); matches are returned from the original text, as
+    re.IGNORECASE would return them. Pass `low` when it is already computed.
+    """
+
+    def __init__(self, pattern):
+        self.lower = re.compile(pattern)
+        self.ignorecase = re.compile(pattern, re.I)
+
+    def search(self, text, low=None):
+        low = lowercase_view(text) if low is None else low
+        if low is None:
+            return self.ignorecase.search(text)
+        found = self.lower.search(low)
+        # same position in the original text: re-match there to get its groups
+        return self.ignorecase.match(text, found.start()) if found else None
+
+    def iter_matches(self, text, low=None):
+        """Whole-match strings from the original text, lazily, in order."""
+        low = lowercase_view(text) if low is None else low
+        if low is None:
+            return (m.group() for m in self.ignorecase.finditer(text))
+        return (text[m.start():m.end()] for m in self.lower.finditer(low))
+
+
+# ---------------- PATTERNS ---------------- #
+
+# "3-6 Lacs P.A.", "Avg. salary - 14.7 LPA", "12 lakhs"
+SALARY_LAKHS = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:[-–]|to)\s*(\d+(?:\.\d+)?))?\s*(?:lacs?|lakhs?|lpa)")
+# "₹ 4,50,000 - 6,00,000 P.A.", "₹25,000 per month"
+SALARY_RUPEES = re.compile(r"₹\s*(\d[\d,]*(?:\.\d+)?)(?:\s*(?:[-–]|to)\s*₹?\s*(\d[\d,]*(?:\.\d+)?))?")
+SALARY_UNIT = re.compile(r"lacs|lpa")
+SALARY_WORD = re.compile(r"lacs|lakhs|lpa|₹")
+SALARY_RANGE_WORD = re.compile(r"\d+\s*[-–]\s*\d+\s*(?:lacs|lakhs|lpa)", re.I)
+PER_MONTH = re.compile(r"per month|p\.m\.|/month|monthly")
+# the lookahead lets the scan skip to the next "₹" or digit
+SALARY_BODY = CaselessPattern(r"(?=[₹\d])(?:₹\s*[\d.,\-]+\s*(?:lacs|lakhs|lpa|p\.a\.)?|\d+\s*[-–]\s*\d+\s*(?:lacs|lakhs|lpa))")
+SALARY_META = CaselessPattern(r"₹\s*[\d.,]+\s*(lacs|lakhs|lpa)?|not disclosed")
+
+# "2 - 5 years", "2 to 5 Yrs", "5+ years", "3 years"
+EXPERIENCE_RANGE = re.compile(r"(\d+)(?:\s*(?:[-–]|to)\s*(\d+)|\s*(\+))?")
+# "2 - 5 years" or "5+ years", factored so the scan only stops at digits
+EXPERIENCE_BODY = CaselessPattern(r"\d+(?:\s*-\s*\d+\s*|\+\s*)years")
+
+COMPANY_META = re.compile(r"Company\s*:\s*(.+)")
+COMPANY_NOISE = re.compile(r"\d+\.\d+\s*\d+\s*Reviews|Reviews|Employees.*choice")
+LOCATION_META = CaselessPattern(
+    r"\b(hyderabad|bengaluru|bangalore|chennai|mumbai|pune|delhi|gurgaon|noida|remote|hybrid)\b"
+)
+POSTED_META = CaselessPattern(r"posted\s*:\s*([^\n|]+)")
+APPLICANTS_META = CaselessPattern(r"applicants\s*:\s*(\d+\+?)")
+
+KEY_SKILLS_MARKER = re.compile(r"key skills|preferred keyskills")
+SKILL_SEPARATOR = re.compile(r"[,\n]+")
+DIGIT = re.compile(r"\d")
+POSTED_AGE = re.compile(r"(\d+)\s*(\+)?\s*(minute|hour|day|week|month)")
+POSTED_TODAY = re.compile(r"just now|today|few (?:minutes|hours)")
+POSTED_UNIT_DAYS = {"minute": 0, "hour": 0, "day": 1, "week": 7, "month": 30}
+ALNUM = re.compile(r"[^\W_]")
+
+
+# ---------------- SALARY ---------------- #
+
+def _amount(text):
+    return float(text.replace(",", ""))
+
+
+def salary_range(text):
+    """
+    (min, max) salary in lakhs per annum, or (None, None).
+
+    Lines that mention years but no salary unit are experience, not salary.
+    Rupee amounts of 1,000 and more are converted to lakhs (monthly ones
+    annualised); a single figure is both min and max.
+    """
+    low = text.lower()
+    if "not disclosed" in low:
+        return None, None
+
+    for line in low.split("\n"):
+        line = line.strip()
+        if "years" in line and not SALARY_UNIT.search(line):
+            continue
+
+        match = SALARY_LAKHS.search(line)
+        if match:
+            low_lpa = float(match.group(1))
+            return low_lpa, float(match.group(2)) if match.group(2) else low_lpa
+
+        match = SALARY_RUPEES.search(line)
+        if match:
+            values = [_amount(v) for v in match.groups() if v]
+            if values[0] >= 1000:
+                scale = 12 / 100_000 if PER_MONTH.search(line) else 1 / 100_000
+                values = [round(v * scale, 2) for v in values]
+            return values[0], values[-1]
+
+    return None, None
+
+
+# ---------------- EXPERIENCE ---------------- #
+
+def experience_range(text):
+    """(min, max) years of experience, or (None, None); "5+ years" has no max."""
+    match = EXPERIENCE_RANGE.search(text)
+    if not match:
+        return None, None
+    low, high, plus = match.groups()
+    if high is not None:
+        return int(low), int(high)
+    if plus is not None:
+        return int(low), None
+    return int(low), int(low)
+
+
+# ---------------- POSTED ---------------- #
+
+def posted_days(text):
+    """
+    Age of a posting in days from its relative posted text, as (days, at_least),
+    or (None, False): "Few hours ago" is (0, False), "3+ weeks ago" (21, True).
+    """
+    low = text.lower()
+    match = POSTED_AGE.search(low)
+    if match:
+        number, plus, unit = match.groups()
+        return int(number) * POSTED_UNIT_DAYS[unit], plus is not None
+    if POSTED_TODAY.search(low):
+        return 0, False
+    if "yesterday" in low:
+        return 1, False
+    return None, False
+
+
+# ---------------- LINES ---------------- #
+
+def lines_before(text, marker):
+    """(original, lowercase) pairs of the non-empty lines before the first match of marker in the lowercase text."""
+    low = text.lower()
+    found = marker.search(low)
+    # the cutoff is a position in the lowercase text, applied to both (as the scraper always did)
+    cutoff = found.start() if found else len(low)
+    lines = text[:cutoff].split("\n")
+
+    if len(low) == len(text):
+        # lowercasing kept every character in place, so the lines line up
+        pairs = zip(lines, low[:cutoff].split("\n"))
+    else:
+        pairs = ((line, line.lower()) for line in lines)
+    return [(line.strip(), line_low.strip()) for line, line_low in pairs if line.strip()]
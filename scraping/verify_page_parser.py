@@ -0,0 +1,68 @@
+"""
+Check that page_parser gives the same record as the Selenium extractors.
+
+    python scraping/verify_page_parser.py
+
+Every fixture page is opened in Chrome (served by the local fixture server),
+the record is built once with the per-field Selenium extractors and once from
+driver.page_source, and any field that differs is printed.
+"""
+import sys
+
+from selenium.webdriver.common.by import By
+
+from fixture_server import serve_fixtures, job_detail_fixtures
+from job_details_scraper import (
+    get_driver, safe_text, expand_job_description_only,
+    extract_company, extract_location, extract_experience, extract_salary,
+    extract_job_description, extract_key_skills, extract_metadata_block,
+)
+from page_parser import parse_job_metadata, parse_job_page
+
+
+def selenium_record(driver, job_url):
+    meta = parse_job_metadata(extract_metadata_block(driver))
+    return {
+        "job_title": safe_text(driver, By.TAG_NAME, "h1"),
+        "company": extract_company(driver) or meta["company"],
+        "location": extract_location(driver) or meta["location"],
+        "experience": extract_experience(driver) or meta["experience"],
+        "salary": extract_salary(driver) or meta["salary"],
+        "posted_time": meta["posted_time"],
+        "applicants": meta["applicants"],
+        "job_description": extract_job_description(driver),
+        "key_skills": extract_key_skills(driver),
+        "job_url": job_url
+    }
+
+
+def verify():
+    server, base_url = serve_fixtures()
+    driver = get_driver()
+    mismatches = 0
+
+    try:
+        for name in job_detail_fixtures():
+            url = f"{base_url}/{name}"
+            driver.get(url)
+            expand_job_description_only(driver)
+
+            expected = selenium_record(driver, url)
+            actual = parse_job_page(driver.page_source, url)
+
+            for field, value in expected.items():
+                if actual[field] != value:
+                    mismatches += 1
+                    print(f"❌ {name} {field}: selenium={value!r} parser={actual[field]!r}")
+            print(f"checked {name}")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    mismatches = verify()
+    print("✅ Parser matches Selenium extractors" if not mismatches else f"{mismatches} mismatching fields")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,93 @@
+"""
+Condition-based waits that record how long they took.
+
+Every wait in the scrapers goes through timed_wait: it returns the moment
+its condition holds (polling every WAIT_POLL seconds instead of
+WebDriverWait's default 0.5 s) and gives up after a short timeout. The
+time each wait took and whether its condition was met are kept in
+WAITS, so the timeouts can be tuned from the p50/p95 of real runs.
+"""
+import threading
+import time
+from collections import Counter, deque
+
+import pandas as pd
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from config import METRICS_WINDOW, WAIT_POLL
+
+
+class WaitStats:
+    """
+    Thread-safe record of (name, seconds, met) for every wait. Quantiles are
+    computed over the last `window` waits; wait and timeout counts cover the
+    whole run.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._counts = Counter()    # (name, met) -> waits
+
+    def record(self, name, seconds, met):
+        with self._lock:
+            self._samples.append((name, seconds, met))
+            self._counts[(name, met)] += 1
+
+    def extend(self, samples, counts=None):
+        """Add samples, and the counts they were drained with, from a worker process."""
+        with self._lock:
+            self._samples.extend(samples)
+            self._counts.update(counts if counts is not None else Counter((n, met) for n, _, met in samples))
+
+    def drain(self):
+        """(samples, counts) recorded so far, removed from the record (to send them from a worker process)."""
+        with self._lock:
+            samples, counts = list(self._samples), self._counts
+            self._samples.clear()
+            self._counts = Counter()
+        return samples, counts
+
+    def to_frame(self):
+        with self._lock:
+            return pd.DataFrame(self._samples, columns=["wait", "seconds", "met"])
+
+    def summary_frame(self):
+        """Waits, timeouts and p50/p95/max milliseconds per wait name."""
+        df = self.to_frame()
+        with self._lock:
+            counts = Counter(self._counts)
+        names = sorted({name for name, _ in counts})
+        frame = pd.DataFrame({
+            "waits": [counts[(name, True)] + counts[(name, False)] for name in names],
+            "timeouts": [counts[(name, False)] for name in names],
+        }, index=pd.Index(names, name="wait"))
+        grouped = (df["seconds"] * 1000).groupby(df["wait"])
+        frame["p50_ms"] = grouped.quantile(0.5).round(1)
+        frame["p95_ms"] = grouped.quantile(0.95).round(1)
+        frame["max_ms"] = grouped.max().round(1)
+        return frame
+
+    def summary(self):
+        with self._lock:
+            if not self._counts:
+                return "Waits: none recorded"
+        return "Waits:\n" + self.summary_frame().to_string()
+
+
+WAITS = WaitStats()
+
+
+def timed_wait(driver, name, timeout, condition, poll=WAIT_POLL, stats=WAITS):
+    """
+    The first truthy value of condition(driver) within `timeout` seconds, or
+    None on timeout. The time taken is recorded under `name` in `stats`.
+    """
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        result = None
+    stats.record(name, time.perf_counter() - start, result is not None)
+    return result